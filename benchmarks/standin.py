@@ -0,0 +1,203 @@
+import time
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Local stand-in for the pyodbc DBAPI, used by the
+benchmarks to run offline. It charges simulated costs
+for round trips, statement preparation and per-row
+transfer, and answers every query through `responder`
+
+Usage:
+    engine = create_engine('splicemachinesa://u:p@localhost:1527/splicedb', module=standin)
+"""
+
+paramstyle = 'qmark'
+apilevel = '2.0'
+threadsafety = 1
+version = '4.0.30'
+SQL_DBMS_VER = 18
+
+# simulated costs (seconds)
+ROUND_TRIP = 0.0002  # every execute() call / executemany() batch
+PREPARE = 0.0003  # executing a statement text the cursor hasn't prepared
+ROW = 0.000002  # every parameter row sent to the server
+
+
+class Error(Exception):
+    pass
+
+
+class Warning(Exception):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class DataError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class InternalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
+
+
+# ODBC SQL type codes used with setinputsizes
+SQL_CHAR, SQL_NUMERIC, SQL_DECIMAL, SQL_INTEGER, SQL_SMALLINT, SQL_FLOAT, SQL_REAL, SQL_DOUBLE = 1, 2, 3, 4, 5, 6, 7, 8
+SQL_VARCHAR, SQL_LONGVARCHAR, SQL_WVARCHAR, SQL_BIGINT, SQL_VARBINARY = 12, -1, -9, -5, -3
+SQL_LONGVARBINARY, SQL_TYPE_DATE, SQL_TYPE_TIME, SQL_TYPE_TIMESTAMP = -4, 91, 92, 93
+
+
+def default_responder(statement, parameters):
+    """
+    Answer every query with a single VARCHAR value
+    :param statement: the SQL statement
+    :param parameters: the bound parameters
+    :returns: (description, rows)
+    """
+    return [('C1', str, None, 128, 128, 0, True)], [('SPLICE',)]
+
+
+responder = default_responder
+stats = {'round_trips': 0, 'prepares': 0, 'rows_sent': 0}
+log = None  # set to a list to record every (statement, parameters, executemany) sent
+
+
+def _spend(seconds):
+    """
+    Busy-wait (sleep is too coarse for microsecond costs)
+    :param seconds: time to spend
+    """
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+class Cursor(object):
+    def __init__(self):
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1
+        self.fast_executemany = False
+        self._prepared = None
+        self._rows = []
+        self._inputsizes = None
+
+    def _round_trip(self, statement, rows):
+        stats['round_trips'] += 1
+        stats['rows_sent'] += rows
+        cost = ROUND_TRIP + ROW * rows
+        if statement != self._prepared:
+            stats['prepares'] += 1
+            cost += PREPARE
+            self._prepared = statement
+        _spend(cost)
+
+    def execute(self, statement, parameters=()):
+        if log is not None:
+            log.append((statement, list(parameters), False))
+        self._round_trip(statement, 1)
+        self.description, rows = responder(statement, parameters)
+        self._rows = list(rows)
+        self.rowcount = len(self._rows) if self.description else 1
+        return self
+
+    def executemany(self, statement, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        if log is not None:
+            log.append((statement, [list(parameters) for parameters in seq_of_parameters], True))
+        if self.fast_executemany:  # parameter array, one round trip
+            self._round_trip(statement, len(seq_of_parameters))
+        else:
+            for _ in seq_of_parameters:
+                self._round_trip(statement, 1)
+        self.description, self._rows = None, []
+        self.rowcount = len(seq_of_parameters)
+
+    def setinputsizes(self, sizes):
+        self._inputsizes = sizes
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        out, self._rows = self._rows[:size], self._rows[size:]
+        return out
+
+    def fetchall(self):
+        out, self._rows = self._rows, []
+        return out
+
+    def close(self):
+        pass
+
+
+class Connection(object):
+    autocommit = False
+
+    def cursor(self):
+        return Cursor()
+
+    def getinfo(self, info_type):
+        return '3.0.0.1958'
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def connect(*args, **kwargs):
+    return Connection()
@@ -83,6 +83,11 @@ setup(
         'sqlalchemy',
         'pyodbc>=4.0.26'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'pandas': ['pandas'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
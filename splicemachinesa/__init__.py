@@ -1,4 +1,7 @@
-from . import splice_machine, pyodbc, base
+from . import splice_machine, pyodbc, base, bulk, dataframe, dml
+from .parallel import reflect_parallel
+from .lazy import LazyTable, reflect_lazy
+from .pagination import paginate
 
 """
 This file is part of Splice Machine.
@@ -1,21 +1,36 @@
 from __future__ import unicode_literals
 
+import collections
+import copy
 import datetime
+import decimal
+import operator
 import re
 import sys
 
+from sqlalchemy import bindparam, event, exc
 from sqlalchemy import schema as sa_schema
 from sqlalchemy import types as sa_types
 from sqlalchemy import util
 from sqlalchemy.engine import default
-from sqlalchemy.sql import operators, compiler
+from sqlalchemy.engine import result as _result
+try:  # SQLAlchemy 1.4+ reads results through cursor fetch strategies instead of ResultProxy subclasses
+    from sqlalchemy.engine import cursor as _cursor
+except ImportError:
+    _cursor = None
+from sqlalchemy.sql import operators, compiler, crud
 from sqlalchemy.types import BLOB, CHAR, CLOB, DATE, DATETIME, INTEGER, \
     SMALLINT, BIGINT, DECIMAL, NUMERIC, REAL, TIME, TIMESTAMP, \
     VARCHAR, FLOAT, TEXT, INT
-from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.elements import BindParameter, ClauseList, Grouping, TextClause
+from sqlalchemy.sql.selectable import Join
 from enum import Enum as PyEnum
 from . import constants
 from . import reflection as sm_reflection
+from .cache import ReflectionCache
+from .routing import ENGINES, EngineRouter, final_froms, route_statement
+from .sequence import SequenceAllocator
+from .snapshot import ReflectionSnapshot
 
 """
 This file is part of Splice Machine.
@@ -47,6 +62,17 @@ and are licensed to you under the GNU Affero General Public License.
 
 IS_PYTHON_3 = sys.version_info[0] >= 3
 
+# SQLAlchemy 1.4+ renders literal_execute binds at execution time, so they don't break the statement cache
+SUPPORTS_LITERAL_EXECUTE = hasattr(BindParameter, 'render_literal_execute')
+
+# statements that change the catalog (for reflection cache invalidation)
+DDL_RX = re.compile(r'\s*(CREATE|ALTER|DROP|RENAME)\b', re.IGNORECASE)
+
+# widest column types an IN list subquery can read from
+MAX_VARCHAR_LENGTH = 32672
+MAX_DECIMAL_PRECISION = 31
+MAX_BIGINT = (1 << 63) - 1
+
 
 ########################################
 #                                      #
@@ -76,6 +102,27 @@ class _SM_Integer(sa_types.Integer):
 
         return process
 
+    def bind_column_processor(self, dialect):
+        """
+        Returns a conversion function for a whole
+        column of bind values (see bind_processor),
+        used by executemany()
+        :param dialect: the current dialect
+            in use
+        :returns: conversion function taking and
+            returning a sequence of values
+        """
+
+        def process(values):
+            types = set(map(type, values))
+            if types == {int}:
+                return values  # nothing to convert
+            if type(None) not in types:
+                return list(map(int, values))
+            return [None if value is None else int(value) for value in values]
+
+        return process
+
 class _SM_Boolean(sa_types.Boolean):
     """
     An overrided boolean class specifically
@@ -116,6 +163,22 @@ class _SM_Boolean(sa_types.Boolean):
 
         return process
 
+    def bind_column_processor(self, dialect):
+        """
+        Return a conversion function for a whole column
+        of bind values (see bind_processor), used by executemany()
+        :param dialect: the current dialect in use
+        :returns: conversion function taking and
+            returning a sequence of values
+        """
+
+        def process(values):
+            if None not in values:
+                return list(map(int, map(bool, values)))
+            return [None if value is None else int(bool(value)) for value in values]
+
+        return process
+
 class _SM_String(sa_types.String):
     """
     Overrided String class for
@@ -149,6 +212,18 @@ class _SM_String(sa_types.String):
         # we use bytes type for python3 backwards compatibility
         return process
 
+    def bind_column_processor(self, dialect):
+        """
+        Return a conversion function for a whole
+        column of bind values (see bind_processor),
+        used by executemany()
+        :param dialect: the current dialect
+            in use
+        :returns: conversion function taking and
+            returning a sequence of values
+        """
+        return _encode_column(self.bind_processor(dialect))
+
 
 class _SM_Date(sa_types.Date):
     """
@@ -197,6 +272,35 @@ class _SM_Date(sa_types.Date):
 
         return process
 
+    def bind_column_processor(self, dialect):
+        """
+        Return a conversion function for a whole column
+        of bind values (see bind_processor), used by executemany()
+        :param dialect: the current dialect in use
+        :returns: conversion function taking and
+            returning a sequence of values
+        """
+        return _encode_column(self.bind_processor(dialect))
+
+
+def _encode_column(process):
+    """
+    Get a conversion function encoding a column of
+    strings to UTF-8 bytes in one pass, which falls back to
+    the per-value processor for columns with other values
+    (None, enums, datetimes)
+    :param process: the per-value bind processor
+    :returns: conversion function
+    """
+    encode = str.encode
+
+    def process_column(values):
+        if set(map(type, values)) == {str}:
+            return list(map(encode, values))
+        return list(map(process, values))
+
+    return process_column
+
 
 # Mapping for our overrided functions to the original ones
 
@@ -605,6 +709,9 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
     (from sqlalchemy.compiler.SQLCompiler)
     to convert to our SQL
     """
+    insert_values_clause = None  # "(?, ?, ...)" of a single-row INSERT
+    _prefetch_sequences = {}  # Sequence -> column, defaults of the INSERT being compiled fired ahead of it
+    upsert_hint = '--splice-properties insertMode=UPSERT\n'
 
     def get_cte_preamble(self, recursive):
         """
@@ -648,8 +755,58 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
         :returns: clause for doing modulo with binary numbers
             on Splice
         """
-        return "mod(%s, %s)" % (self.process(binary.left),
-                                self.process(binary.right))
+        return "mod(%s, %s)" % (self.process(binary.left, **kw),
+                                self.process(binary.right, **kw))
+
+    def visit_in_op_binary(self, binary, operator, **kw):
+        """
+        IN operator. A list of more than in_list_threshold literal values
+        is compiled as one expanding parameter, so it is rewritten into
+        a subquery when the statement executes (see
+        SpliceMachineExecutionContext._expand_in_parameters)
+        :param binary: the binary to extract
+        :param operator: the operation specified
+        :returns: clause for IN
+        """
+        return self._in_list_binary(binary, operator, **kw)
+
+    def visit_notin_op_binary(self, binary, operator, **kw):
+        """
+        NOT IN operator (see visit_in_op_binary)
+        :param binary: the binary to extract
+        :param operator: the operation specified
+        :returns: clause for NOT IN
+        """
+        return self._in_list_binary(binary, operator, **kw)
+
+    def _in_list_binary(self, binary, operator, **kw):
+        """
+        Render [NOT] IN, replacing a long list of literal values
+        with an expanding parameter holding the values
+        :param binary: the binary to extract
+        :param operator: operators.in_op or operators.notin_op
+        :returns: clause for [NOT] IN
+        """
+        threshold = self.dialect.in_list_threshold
+        values = binary.right.element if isinstance(binary.right, Grouping) else None
+        if threshold and not kw.get('literal_binds') and isinstance(values, ClauseList) and \
+                len(values.clauses) > threshold and \
+                all(isinstance(value, BindParameter) and value.callable is None for value in values.clauses):
+            expanding = bindparam('in_list', [value.value for value in values.clauses],
+                                  type_=binary.left.type, expanding=True, unique=True)
+            binary = binary.left.in_(expanding) if operator is operators.in_op else binary.left.notin_(expanding)
+            return self.process(binary, **kw)
+        return self._generate_generic_binary(binary, compiler.OPERATORS[operator], **kw)
+
+    def visit_empty_set_expr(self, element_types):
+        """
+        Render an expanding IN parameter with an empty list
+        as a subquery returning no rows
+        :param element_types: the types of the IN list elements
+        :returns: the subquery
+        """
+        return 'SELECT %s FROM SYSIBM.SYSDUMMY1 WHERE 1 = 0' % ', '.join(
+            'CAST(NULL AS %s)' % self.dialect.type_compiler.process(type_) for type_ in element_types)
 
     def limit_clause(self, select, **kwargs):
         """
@@ -660,38 +817,166 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
         """
         text = ''
         if select._offset_clause is not None:
-            text += ' OFFSET %s ROWS' % select._offset
+            text += ' OFFSET %s ROWS' % self._limit_value(
+                select._offset_clause, lambda: select._offset, **kwargs)
         if select._limit_clause is not None:
-            text += " FETCH FIRST %s ROWS ONLY" % select._limit  # get fetch first
+            text += " FETCH FIRST %s ROWS ONLY" % self._limit_value(
+                select._limit_clause, lambda: select._limit, **kwargs)  # get fetch first
         return text
 
+    def _limit_value(self, clause, value, **kwargs):
+        """
+        Render a LIMIT/OFFSET value. Values are bound, so every page
+        of a paginated query is the same statement (and prepared plan).
+        With bind_limit_offset=False they are rendered inline instead,
+        as literal_execute binds where SQLAlchemy supports them (1.4+)
+        so a cached compilation is still reused for other values
+        :param clause: the limit or offset clause
+        :param value: callable returning its integer value (only
+            evaluated for literals, since non-integer clauses have none)
+        :returns: the parameter, the literal value, or its post-compile placeholder
+        """
+        if self.dialect.bind_limit_offset:
+            return self.process(clause, **kwargs)  # literal when compiled with literal_binds
+        if SUPPORTS_LITERAL_EXECUTE:
+            return self.process(clause, literal_execute=True, **kwargs)
+        return value()
+
     def visit_select(self, select, **kwargs):
         """
         Function for handling the creation of SELECT statements
-        Splice does not support native casting for WHERE IN comparisons, so we need to add an explicit cast if necessary
-        :param select:
-        :param kwargs:
+        :param select: the select query class
+        :param kwargs: compiler arguments
         :return: the SQL select statement to execute
         """
+        # the source query of an upsert INSERT ... SELECT is preceded by the property list
+        upsert_source = False
+        if self.stack:
+            entry = self.stack[-1]
+            source = entry.get('insert_from_select',  # SQLAlchemy 1.4
+                               getattr(self, '_insert_from_select', None))
+            upsert_source = select is source and getattr(entry['selectable'], '_upsert', False)
+        sql = super(SpliceMachineCompiler, self).visit_select(self._move_statement_hints(select), **kwargs)
+        return self.upsert_hint + sql if upsert_source else sql
+
+    def _move_statement_hints(self, select):
+        """
+        Splice Machine reads statement level properties (e.g. useSpark=true)
+        from the property list of the first table in the FROM clause, not
+        from the end of the statement where statement hints are rendered.
+        Get a copy of the select with its statement hints merged into the
+        hint of that table. A select without a FROM clause has no property
+        list, so its statement hints are dropped with a warning
+        :param select: the select query class
+        :returns: the select to compile
+        """
+        hints = [hint for dialect_name, hint in select._statement_hints
+                 if dialect_name in ('*', self.dialect.name)]
+        if not hints:
+            return select
+        froms = final_froms(select)
+        table_hints = dict(select._hints)
+        if froms:
+            first = froms[0]
+            while isinstance(first, Join):  # the leftmost table of a join
+                first = first.left
+            table_hint = table_hints.pop((first, self.dialect.name), None) or table_hints.pop((first, '*'), None)
+            table_hints[(first, self.dialect.name)] = ', '.join(([table_hint] if table_hint else []) + hints)
+        else:
+            util.warn('Ignoring statement hints of a SELECT without a FROM clause: %s' % ', '.join(hints))
+
+        select = select._generate()
+        select._statement_hints = ()
+        select._hints = util.immutabledict(table_hints)
+        return select
+
+    def get_from_hint_text(self, table, text):
+        """
+        Render a table hint (select.with_hint(table, 'index=IX_FOO'),
+        or update()/delete().with_hint(...)) as a Splice Machine property list. The list must end with a
+        newline, since it is a comment running to the end of the line
+        :param table: the table the hint is for
+        :param text: the properties, e.g. "joinStrategy=BROADCAST"
+        :returns: the property list, rendered after the table (and alias)
+        """
+        return '--splice-properties %s\n' % text
+
+    def visit_insert(self, insert_stmt, **kw):
+        """
+        Compile an INSERT statement. With lastrowid_strategy='sequence'
+        autoincrement values are prefetched from the column's Sequence,
+        so a missing value for an autoincrement column without one can't
+        be generated. Some Sequence defaults are prefetched too (see
+        _sequences_to_prefetch). The VALUES tuple of single-row inserts is recorded
+        so executemany() can repeat it for multi-row batches. Upserts
+        (splicemachinesa.dml.insert().on_conflict_upsert()) carry the
+        insertMode=UPSERT property between the column list and the source
+        :param insert_stmt: the insert statement
+        :returns: the SQL insert statement
+        """
+        multi_values = insert_stmt._multi_values if hasattr(insert_stmt, '_multi_values') \
+            else insert_stmt._has_multi_parameters  # SQLAlchemy 1.3
+        self._prefetch_sequences = self._sequences_to_prefetch(insert_stmt, multi_values)
         try:
-            sql = super(SpliceMachineCompiler, self).visit_select(select, **kwargs)
-            col_types = {}
-            if select._columns_plus_names[0][0]:
-                for e in select._columns_plus_names:
-                    col_types[e[1].name] = str(e[1].type).split('.')[-1]
-            return sql
-        except:
-            import traceback
-            traceback.print_exc()
-            raise Exception
-
-    def visit_sequence(self, sequence):
-        """
-        Get the next value clause in a Splice Sequence
+            text = super(SpliceMachineCompiler, self).visit_insert(insert_stmt, **kw)
+        finally:
+            self._prefetch_sequences = {}
+        if not self.dialect.postfetch_lastrowid:
+            seq_column = insert_stmt.table._autoincrement_column
+            if seq_column is not None and seq_column.default is None and \
+                    seq_column in self.insert_prefetch:
+                raise exc.CompileError(
+                    "lastrowid_strategy='sequence' requires a Sequence on autoincrement "
+                    "column %s, or an explicit value for it" % seq_column)
+
+        if insert_stmt.select is None and not multi_values and not self.returning:
+            _, values_keyword, values = text.rpartition(' VALUES ')
+            if values_keyword and values.startswith('(') and values.endswith(')'):
+                self.insert_values_clause = values
+
+        if getattr(insert_stmt, '_upsert', False) and insert_stmt.select is None:
+            head, values_keyword, values = text.partition(' VALUES ')
+            if not values_keyword:
+                raise exc.CompileError('An upsert requires values for the primary key')
+            text = '%s %sVALUES %s' % (head, self.upsert_hint, values)
+        return text
+
+    def _sequences_to_prefetch(self, insert_stmt, multi_values):
+        """
+        Find the Sequence defaults of an INSERT that are fired
+        (fire_sequence) before it runs instead of being rendered inline:
+        the autoincrement column's when its value is read back after
+        the insert, as IDENTITY_VAL_LOCAL() only reports identity columns
+        (SQLAlchemy 1.3 renders it inline), and every Sequence handed
+        out in blocks (sequence_block_size)
+        :param insert_stmt: the insert statement
+        :param multi_values: whether the insert has several VALUES rows
+        :returns: dict of Sequence -> column
+        """
+        if insert_stmt.select is not None or multi_values:
+            return {}
+        pk_column = insert_stmt.table._autoincrement_column
+        read_back = self.dialect.postfetch_lastrowid and not insert_stmt._returning and not self.inline
+        sequences = {}
+        for column in insert_stmt.table.columns:
+            seq = column.default
+            if isinstance(seq, sa_schema.Sequence) and \
+                    ((column is pk_column and read_back) or self.dialect.sequence_block_size_of(seq) > 1):
+                sequences[seq] = column
+        return sequences
+
+    def visit_sequence(self, sequence, **kw):
+        """
+        Get the next value clause in a Splice Sequence, or
+        a bind parameter for a Sequence default prefetched
+        through fire_sequence()
         :param sequence: sequence object to get the next
             value for
         :returns: clause for extracting next value
         """
+        column = self._prefetch_sequences.get(sequence)
+        if column is not None:
+            return crud._create_insert_prefetch_bind_param(self, column)
         return "NEXT VALUE FOR %s" % sequence.name
 
     def default_from(self):
@@ -703,7 +988,7 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
         # DB2 uses SYSIBM.SYSDUMMY1 table for row count
         return " FROM SYSIBM.SYSDUMMY1"  # which we have too!
 
-    def construct_params(self, params=None, _group_number=None, _check=True):
+    def construct_params(self, params=None, _group_number=None, _check=True, **kw):
         """
         Construct parameters for literal binds,
         and convert unicode values to string values
@@ -716,7 +1001,7 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
             literal/non literal binds
         """
         out = super(SpliceMachineCompiler, self).construct_params(
-            params=params, _group_number=_group_number, _check=_check
+            params=params, _group_number=_group_number, _check=_check, **kw
         )
         for param in out:
             # unicode won't be hit in Python3 (short-circuit execution)
@@ -752,7 +1037,7 @@ class SpliceMachineCompiler(compiler.SQLCompiler):
                 sa_types.DECIMAL)):  # call superclass visit cast (special handling)
             return super(SpliceMachineCompiler, self).visit_cast(cast, **kw)
         else:
-            return self.process(cast.clause)  # call generic cast (regular)
+            return self.process(cast.clause, **kw)  # call generic cast (regular)
 
     def get_select_precolumns(self, select, **kwargs):
         """
@@ -1068,17 +1353,360 @@ class SpliceMachineIdentifierPreparer(compiler.IdentifierPreparer):
 #                                      #
 ########################################
 
+if _cursor is None:
+    class SpliceMachineStreamingResultProxy(_result.BufferedRowResultProxy):
+        """
+        Result of a query executed with stream_results=True (or
+        Query.yield_per), read from the cursor fetch_size rows at a
+        time so only one batch of rows is held in memory, however
+        many rows the query returns (SQLAlchemy 1.3)
+        """
+        size_growth = {}  # every batch is fetch_size rows, instead of growing from 1
+
+        def _init_metadata(self):
+            self._bufsize = self.context.get_fetch_size()
+            super(SpliceMachineStreamingResultProxy, self)._init_metadata()
+
+
 class SpliceMachineExecutionContext(default.DefaultExecutionContext):
+    _batch_rowcount = None  # total rowcount of a batched executemany
+
+    if _cursor is None:  # this is SQLAlchemy 1.3's _init_compiled; 1.4 builds the parameter sets itself
+        @classmethod
+        def _init_compiled(cls, dialect, connection, dbapi_connection, compiled, parameters):
+            """
+            Create the context of a compiled statement. For executemany(),
+            the parameter sets are built a column at a time: parameters of
+            Splice Machine types (see bind_column_processor) are converted
+            a whole column per call, instead of calling their bind processor
+            once per value (SQLAlchemy 1.3)
+            """
+            column_processors = cls._column_processors(dialect, compiled) if len(parameters) > 1 else None
+            if not column_processors:
+                return super(SpliceMachineExecutionContext, cls)._init_compiled(
+                    dialect, connection, dbapi_connection, compiled, parameters)
+
+            # compiled objects may be cached: skip building the
+            # parameter sets row by row with a copy without parameters
+            row_compiled = copy.copy(compiled)
+            row_compiled.positiontup = []
+            self = super(SpliceMachineExecutionContext, cls)._init_compiled(
+                dialect, connection, dbapi_connection, row_compiled, parameters)
+            self.compiled = compiled
+
+            processors = compiled._bind_processors
+            columns = []
+            for name in compiled.positiontup:
+                values = list(map(operator.itemgetter(name), self.compiled_parameters))
+                if name in column_processors:
+                    values = column_processors[name](values)
+                elif name in processors:
+                    values = list(map(processors[name], values))
+                columns.append(values)
+            rows = list(zip(*columns))
+            if dialect.execute_sequence_format is not tuple:
+                rows = [dialect.execute_sequence_format(row) for row in rows]
+            self.parameters = dialect.execute_sequence_format(rows)
+            return self
+
+        def _process_executemany_defaults(self):
+            # SQLAlchemy 1.3's, which expects every prefetched default to be a ColumnDefault
+            # while the compiler prefetches Sequences too (see _sequences_to_prefetch)
+            key_getter = self.compiled._key_getters_for_crud_column[2]
+            prefetch = [(c, c.default, self.get_insert_default) for c in self.compiled.insert_prefetch] + \
+                       [(c, c.onupdate, self.get_update_default) for c in self.compiled.update_prefetch]
+            for param in self.compiled_parameters:
+                self.current_parameters = param
+                for c, default, get_default in prefetch:
+                    val = default.arg if getattr(default, 'is_scalar', False) else get_default(c)
+                    if val is not None:
+                        param[key_getter(c)] = val
+            del self.current_parameters
+
+    @staticmethod
+    def _column_processors(dialect, compiled):
+        """
+        Get the column-at-a-time bind processors of a
+        compiled statement's parameters, cached on the compiled
+        object
+        :param dialect: the current dialect in use
+        :param compiled: the compiled statement
+        :returns: dict of parameter name -> column processor
+        """
+        if not dialect.column_bind_processing or not compiled.positional or \
+                compiled.contains_expanding_parameters:
+            return None
+        processors = compiled.__dict__.get('_splice_column_processors')
+        if processors is None:
+            processors = {}
+            bind_processors = compiled._bind_processors
+            for name in compiled.positiontup:
+                type_ = compiled.binds[name].type.dialect_impl(dialect)
+                if name in bind_processors and hasattr(type_, 'bind_column_processor'):
+                    processors[name] = type_.bind_column_processor(dialect)
+            compiled.__dict__['_splice_column_processors'] = processors
+        return processors
+
+    @property
+    def rowcount(self):
+        """
+        Get the number of rows affected. For executemany() inserts
+        sent as multi-row batches, this is the total over every batch
+        """
+        if self._batch_rowcount is not None:
+            return self._batch_rowcount
+        return self.cursor.rowcount
+
+    def pre_exec(self):
+        """
+        Set the fetch size of streamed queries, and reject
+        columnar results where they aren't supported
+        """
+        if self._is_server_side:
+            self._init_streaming()
+        if _cursor is not None and self.execution_options.get('columnar') is not None:
+            raise exc.InvalidRequestError('The columnar execution option requires SQLAlchemy 1.3')
+
+    def _expand_in_parameters(self, compiled, processors):
+        """
+        Rewrite expanding IN parameters with more than in_list_threshold
+        values before they are expanded, so long lists neither render one
+        statement per list length nor exceed the parameter limit:
+        'values' binds them as a subquery over a VALUES table, padded to a
+        power of two rows so lists share a few statements, and 'temp_table'
+        (also used when the values don't fit in a statement) loads them
+        into a temporary table the IN reads from
+        :param compiled: the compiled statement
+        :param processors: bind processors by parameter name
+        :returns: the expanded parameter names, in order
+        """
+        threshold = self.dialect.in_list_threshold
+        if threshold and not self.executemany and self.dialect.supports_unicode_statements:
+            parameters = self.compiled_parameters[0]
+            slot = 0
+            for name in compiled.positiontup:
+                bind = compiled.binds[name]
+                values = parameters.get(name)
+                if not bind.expanding or not values or len(values) <= threshold or \
+                        isinstance(values[0], (tuple, list)) or bind.type._isnull:
+                    continue
+
+                type_ = self._in_list_type(bind.type, values)
+                if type_ is None:  # no column holds the values, so they are bound one by one
+                    continue
+
+                marker = '[EXPANDING_%s]' % name
+                size = 1 << (len(values) - 1).bit_length()
+                if self.dialect.in_list_strategy == 'values' and None not in values and \
+                        size + len(parameters) <= self.dialect.max_insert_parameters:
+                    parameters[name] = list(values) + [values[-1]] * (size - len(values))
+                    subquery = 'SELECT v FROM (VALUES CAST(NULL AS %s), %s) AS in_list(v) WHERE v IS NOT NULL' % (
+                        self.dialect.type_compiler.process(type_), marker)
+                else:
+                    subquery = 'SELECT v FROM ' + self._load_in_list(slot, type_, values, processors.get(name))
+                    parameters[name] = []
+                    slot += 1
+                self.statement = self.statement.replace(marker, subquery)
+        return super(SpliceMachineExecutionContext, self)._expand_in_parameters(compiled, processors)
+
+    def _in_list_type(self, type_, values):
+        """
+        Get the type of the column an IN list is read from. The values
+        are compared with a column of type_, but may be longer or more
+        precise than it holds, so strings and integers are read as the
+        widest VARCHAR/BIGINT and decimals with the precision and scale
+        of the values, rather than being truncated or rounded
+        :param type_: the type of the compared column
+        :param values: the IN list values
+        :returns: the type, or None if no column type holds the values
+        """
+        values = [value for value in values if value is not None]
+        if isinstance(type_, (sa_types.Enum, sa_types.Text)):
+            return type_
+        elif isinstance(type_, sa_types.String):
+            if any(isinstance(value, util.string_types) and len(value) > MAX_VARCHAR_LENGTH for value in values):
+                return None
+            return VARCHAR(MAX_VARCHAR_LENGTH)
+        elif isinstance(type_, sa_types.Integer):
+            if not all(isinstance(value, util.int_types) and -MAX_BIGINT - 1 <= value <= MAX_BIGINT
+                       for value in values):
+                return None  # e.g. 1.5 would compare as 1
+            return BIGINT()
+        elif isinstance(type_, sa_types.Numeric) and not isinstance(type_, sa_types.Float):
+            scale = (type_.scale or 0) if type_.precision else 0
+            digits = (type_.precision or MAX_DECIMAL_PRECISION) - scale  # left of the decimal point
+            for value in values:
+                try:
+                    sign, value_digits, exponent = decimal.Decimal(util.text_type(value)).as_tuple()
+                except (decimal.InvalidOperation, TypeError, ValueError):
+                    return None
+                if not isinstance(exponent, int):  # NaN or Infinity
+                    return None
+                scale = max(scale, -exponent)
+                digits = max(digits, len(value_digits) + exponent)
+            if digits + scale > MAX_DECIMAL_PRECISION:
+                return None
+            return DECIMAL(digits + scale, scale)
+        return type_
+
+    def _load_in_list(self, slot, type_, values, processor):
+        """
+        Load IN list values into a temporary table, created the first
+        time the connection uses it and emptied on every later use
+        :param slot: the number of the IN list in the statement
+        :param type_: the type of the values
+        :param values: the values
+        :param processor: the bind processor of the values, or None
+        :returns: the table name
+        """
+        type_ddl = self.dialect.type_compiler.process(type_)
+        table = sa_schema.Table('splice_in_list_%d_%s' % (slot, re.sub(r'\W', '', type_ddl.lower())),
+                                sa_schema.MetaData(), sa_schema.Column('v', type_), prefixes=['TEMPORARY'])
+        name = self.dialect.identifier_preparer.format_table(table)
+        values = [processor(value) for value in values] if processor else list(values)
+        batch_size = self.dialect.in_list_batch_size
+
+        cursor = self._dbapi_connection.cursor()
+        try:
+            try:
+                cursor.execute('DELETE FROM ' + name)
+            except self.dialect.dbapi.Error:  # not created yet on this connection
+                cursor.close()
+                cursor = self._dbapi_connection.cursor()
+                cursor.execute(util.text_type(sa_schema.CreateTable(table).compile(dialect=self.dialect)))
+
+            insert = 'INSERT INTO %s (v) VALUES ' % name
+            full = len(values) - len(values) % batch_size
+            if full:
+                self.dialect._executemany(cursor, insert + ', '.join(['(?)'] * batch_size),
+                                          [values[i:i + batch_size] for i in range(0, full, batch_size)],
+                                          None, rows_per_set=batch_size)
+            if full < len(values):
+                cursor.execute(insert + ', '.join(['(?)'] * (len(values) - full)), values[full:])
+        finally:
+            cursor.close()
+        return name
+
+    def create_server_side_cursor(self):
+        """
+        Get the cursor of a streamed query (stream_results=True).
+        ODBC cursors already fetch rows as they are read, so this
+        is a plain cursor (its fetch size is set by pre_exec)
+        :returns: DBAPI cursor
+        """
+        return self._dbapi_connection.cursor()
+
+    def _init_streaming(self):
+        """
+        Read the rows of a streamed query fetch_size at a time: the
+        cursor's arraysize is the fetch size, and rows are buffered
+        by SpliceMachineStreamingResultProxy (SQLAlchemy 1.3) or by a
+        cursor fetch strategy of the same size (1.4+)
+        """
+        self.cursor.arraysize = self.get_fetch_size()
+        if _cursor is not None:
+            # an empty initial buffer, since the statement hasn't executed yet
+            self.cursor_fetch_strategy = _cursor.BufferedRowCursorFetchStrategy(
+                self.cursor, {'max_row_buffer': self.cursor.arraysize}, growth_factor=0,
+                initial_buffer=collections.deque())
+
+    def get_fetch_size(self):
+        """
+        Get the number of rows fetched per batch from a streamed
+        query, from the fetch_size execution option, the max_row_buffer
+        execution option (set by Query.yield_per) or the engine option
+        :returns: rows per fetch
+        """
+        fetch_size = self.execution_options.get(
+            'fetch_size', self.execution_options.get('max_row_buffer', self.dialect.fetch_size))
+        if not isinstance(fetch_size, int) or fetch_size < 1:
+            raise exc.ArgumentError("Invalid value '%s' for fetch_size. It must be a positive integer" % fetch_size)
+        return fetch_size
+
+    def get_result_proxy(self):
+        """
+        Get the result of the statement, read in batches
+        of fetch_size rows when its results are streamed, and
+        readable as columns with the columnar execution option
+        :returns: the result proxy
+        """
+        columnar = self.execution_options.get('columnar')
+        if columnar is not None:
+            from .columnar import FORMATS, ColumnarResultProxy
+
+            if columnar not in FORMATS:
+                raise exc.ArgumentError(
+                    "Invalid value '%s' for columnar. Valid formats are %s" % (columnar, ", ".join(FORMATS)))
+            return ColumnarResultProxy(self)
+        if self._is_server_side:  # only called by SQLAlchemy 1.3
+            return SpliceMachineStreamingResultProxy(self)
+        return super(SpliceMachineExecutionContext, self).get_result_proxy()
+
+    def get_insert_batch_size(self):
+        """
+        Get the number of rows to send per multi-row
+        INSERT ... VALUES (...), (...) statement for this
+        executemany(), from the insert_batch_size execution
+        option or engine option. The size is capped so a batch
+        never binds more than dialect.max_insert_parameters
+        :returns: rows per batch (0 or 1 to execute row by row)
+        """
+        if not self.isinsert or self.compiled is None or \
+                self.compiled.insert_values_clause is None or \
+                not self.unicode_statement.endswith(self.compiled.insert_values_clause):
+            return 0
+
+        batch_size = self.execution_options.get('insert_batch_size', self.dialect.insert_batch_size) or 0
+        row_parameters = len(self.compiled.positiontup or ())
+        if row_parameters:
+            batch_size = min(batch_size, self.dialect.max_insert_parameters // row_parameters)
+        return batch_size
+
+    def get_insert_batch_statement(self, rows):
+        """
+        Get the INSERT statement for a multi-row batch
+        :param rows: number of rows in the batch
+        :returns: statement, encoded if the dialect requires it
+        """
+        statement = self.unicode_statement + \
+                    (', ' + self.compiled.insert_values_clause) * (rows - 1)
+        if not self.dialect.supports_unicode_statements:
+            statement = self.dialect._encoder(statement)[0]
+        return statement
+
     def fire_sequence(self, seq, type_):
         """
         Get the next value (increment as well) from a Splice
-        Machine Sequence
+        Machine Sequence. If the sequence (seq.info['splice_block_size'])
+        or the engine (sequence_block_size) has a block size above 1,
+        values are fetched that many at a time and handed out from
+        the dialect's SequenceAllocator
         :param seq: sequence name
         :param type_: the type of the sequence (typically INTEGER)
         """
-        return self._execute_scalar("SELECT NEXTVAL FOR " +
-                                    self.dialect.identifier_preparer.format_sequence(seq) +
-                                    " FROM SYSIBM.SYSDUMMY1", type_)
+        name = self.dialect.identifier_preparer.format_sequence(seq)
+        block_size = self.dialect.sequence_block_size_of(seq)
+        if block_size <= 1:
+            return self._execute_scalar("SELECT NEXTVAL FOR " + name + " FROM SYSIBM.SYSDUMMY1", type_)
+
+        return self.dialect.sequence_allocator.next_value(
+            name, block_size, lambda count: self._fetch_sequence_block(name, count, type_))
+
+    def _fetch_sequence_block(self, name, count, type_):
+        """
+        Get several new values from a sequence in one round trip
+        :param name: the formatted sequence name
+        :param count: the number of values to get
+        :param type_: the type of the sequence (typically INTEGER)
+        :returns: list of values
+        """
+        query = "SELECT NEXT VALUE FOR {seq} FROM (VALUES {rows}) AS B(N)".format(
+            seq=name, rows=', '.join(str(i) for i in range(1, count + 1)))
+        self.root_connection._cursor_execute(self.cursor, query, (), context=self)
+        values = [r[0] for r in self.cursor.fetchall()]
+        proc = type_._cached_result_processor(self.dialect, self.cursor.description[0][1]) \
+            if type_ is not None else None
+        return [proc(v) for v in values] if proc else values
 
 
 ########################################
@@ -1107,15 +1735,26 @@ class _SelectLastRowIDMixin(object):
         or not to use autoincrementation
         for a given column
         """
-        if self.isinsert:
+        super(_SelectLastRowIDMixin, self).pre_exec()
+        if self.isinsert and not self.executemany:
             tbl = self.compiled.statement.table
             seq_column = tbl._autoincrement_column  # is identity?
-            insert_has_sequence = seq_column is not None
+            # a Sequence default is prefetched by the compiler, only an
+            # identity column generates the value server side
+            insert_has_sequence = seq_column is not None and \
+                not isinstance(seq_column.default, sa_schema.Sequence)
 
             self._select_lastrowid = insert_has_sequence and \
+                                     self.dialect.postfetch_lastrowid and \
                                      not self.compiled.returning and \
                                      not self.compiled.inline  # should we get sequence value?
 
+            if self._select_lastrowid:
+                key = self.compiled._key_getters_for_crud_column[2](seq_column)
+                if self.compiled_parameters[0].get(key) is not None:
+                    # value was given explicitly, no identity was generated
+                    self._select_lastrowid = False
+
             if self._select_lastrowid:
                 if tbl.schema:
                     self._last_table = (QuotationUtilities.conditionally_reserved_quote(tbl.schema)
@@ -1131,23 +1770,31 @@ class _SelectLastRowIDMixin(object):
         Utility method to get the last
         sequence value in a table with an
         identity col (parameters configured
-        from pre_exec function)
+        from pre_exec function). With the
+        'identity_val_local' strategy, this is the
+        identity generated by this connection's last
+        insert; with 'max' it is the largest value
+        in the column (slow, and wrong under
+        concurrent inserts)
         :returns: the last id
         """
-        # TODO @amrit this is an extremely inefficient way to get last identity value. fixme
         conn = self.root_connection
-        query = 'SELECT MAX({identity_col}) FROM {table}'.format(
-            identity_col=self._last_column_name, table=self._last_table
-        )
+        if self.dialect.lastrowid_strategy == 'max':
+            query = 'SELECT MAX({identity_col}) FROM {table}'.format(
+                identity_col=self._last_column_name, table=self._last_table
+            )
+        else:
+            query = 'VALUES IDENTITY_VAL_LOCAL()'
         conn._cursor_execute(self.cursor, query, (), self)
         result = self.cursor.fetchall()
-        return int(result[0][0])  # fetch results
+        return int(result[0][0]) if result and result[0][0] is not None else None  # fetch results
 
     def post_exec(self):
         """
         Get the current sequence value
         after executing
         """
+        super(_SelectLastRowIDMixin, self).post_exec()
         if self._select_lastrowid:
             row_id = self._get_last_id()  # get last seq value
             if row_id is not None:
@@ -1163,6 +1810,7 @@ class _SelectLastRowIDMixin(object):
 class SpliceMachineDialect(default.DefaultDialect):
     ##### DATABASE OPTIONS #####
     name = 'splicemachinesa'
+    supports_statement_cache = True  # the compiler renders nothing from bound values
     max_identifier_length = 128
     encoding = 'utf-8'
     default_paramstyle = 'qmark'
@@ -1202,11 +1850,204 @@ class SpliceMachineDialect(default.DefaultDialect):
 
     _reflector_cls = sm_reflection.SMReflector  # get reflectors
 
-    def __init__(self, **kw):
+    lastrowid_strategies = ('identity_val_local', 'sequence', 'max')
+    max_insert_parameters = 32767  # bound values per batched INSERT statement
+    in_list_strategies = ('values', 'temp_table')
+    in_list_batch_size = 1000  # rows per INSERT loading a temp table IN list
+    supports_server_side_cursors = True  # streamed results (stream_results=True, Query.yield_per)
+
+    def __init__(self, reflection_snapshot_dir=None, reflection_cache_size=None,
+                 reflection_cache_ttl=300, existence_probe_ttl=0,
+                 lastrowid_strategy='identity_val_local', sequence_block_size=1,
+                 insert_batch_size=None, splice_engine=None, olap_row_threshold=20000,
+                 table_statistics_ttl=300, bind_limit_offset=True, in_list_threshold=None,
+                 in_list_strategy='values', server_side_cursors=False, fetch_size=1000,
+                 column_bind_processing=True, **kw):
+        """
+        :param reflection_snapshot_dir: if specified, reflection results
+            are persisted to this directory and reused across processes
+            until the catalog changes (see snapshot.ReflectionSnapshot)
+        :param reflection_cache_size: if specified, reflection results are
+            shared across Inspectors in an LRU cache of this many entries
+            (see cache.ReflectionCache)
+        :param reflection_cache_ttl: seconds a shared reflection cache
+            entry stays valid (None for no expiry)
+        :param existence_probe_ttl: if specified, has_table/has_sequence
+            load every table/sequence name of the schema and reuse them on the
+            same connection for this many seconds, so create_all/drop_all
+            (checkfirst=True) make one query per schema, and schemas found
+            missing are remembered for as long. DDL run by other
+            connections in that time isn't seen
+        :param lastrowid_strategy: how the generated id of an inserted row
+            is found-- 'identity_val_local' (IDENTITY_VAL_LOCAL() on the
+            same connection), 'sequence' (prefetch autoincrement values from
+            the column's Sequence before inserting) or 'max' (SELECT MAX of
+            the column, the legacy behavior)
+        :param sequence_block_size: number of values fetched per round
+            trip when a Sequence default fires (see sequence.SequenceAllocator).
+            Overridden per Sequence by seq.info['splice_block_size']. INSERTs
+            fire such Sequences before running instead of rendering
+            NEXT VALUE FOR, except INSERT ... SELECT and multi-row VALUES
+        :param insert_batch_size: if specified, executemany() of an INSERT
+            sends this many rows per INSERT ... VALUES (...), (...) statement
+            (capped at max_insert_parameters bound values). Overridden per
+            execution by the insert_batch_size execution option
+        :param splice_engine: if specified, the engine SELECTs run on--
+            'oltp', 'olap' (Spark) or 'auto' (chosen from table statistics,
+            see routing.EngineRouter). Overridden per execution by the
+            splice_engine execution option
+        :param olap_row_threshold: estimated rows read at which
+            splice_engine='auto' runs a SELECT on OLAP
+        :param table_statistics_ttl: seconds the table row counts used
+            by splice_engine='auto' are reused for
+        :param bind_limit_offset: whether OFFSET/FETCH FIRST values are
+            bound parameters (the default) or rendered inline
+        :param in_list_threshold: if specified, IN lists of more values are
+            read from a subquery instead of being bound one parameter per value.
+            Requires SQLAlchemy 1.3, whose expanding IN parameters it rewrites
+        :param in_list_strategy: the subquery long IN lists are read from--
+            'values' (a VALUES table of bound values) or 'temp_table' (a
+            temporary table loaded with the values). Lists too long for one
+            statement always use a temporary table
+        :param server_side_cursors: whether the results of every SELECT
+            are streamed, as with the stream_results execution option
+        :param fetch_size: rows fetched per batch from streamed results.
+            Overridden per execution by the fetch_size execution option
+        :param column_bind_processing: whether executemany() converts
+            bind values of Splice Machine types a whole column at a time
+            (the default) or one value at a time
+        """
         super(SpliceMachineDialect, self).__init__(**kw)
 
+        if splice_engine is not None and splice_engine not in ENGINES:
+            raise exc.ArgumentError(
+                "Invalid value '%s' for splice_engine. Valid engines are %s" % (splice_engine, ", ".join(ENGINES)))
+        self.splice_engine = splice_engine
+        self.bind_limit_offset = bind_limit_offset
+
+        if in_list_strategy not in self.in_list_strategies:
+            raise exc.ArgumentError(
+                "Invalid value '%s' for in_list_strategy. Valid strategies are %s" %
+                (in_list_strategy, ", ".join(self.in_list_strategies)))
+        if in_list_threshold and _cursor is not None:
+            raise exc.ArgumentError('in_list_threshold requires SQLAlchemy 1.3')
+        self.in_list_threshold = int(in_list_threshold) if in_list_threshold else None
+        self.in_list_strategy = in_list_strategy
+        self.server_side_cursors = server_side_cursors
+        self.fetch_size = int(fetch_size)
+        self.column_bind_processing = column_bind_processing
+        self.engine_router = EngineRouter(self, int(olap_row_threshold), table_statistics_ttl)
+
+        if lastrowid_strategy not in self.lastrowid_strategies:
+            raise exc.ArgumentError(
+                "Invalid value '%s' for lastrowid_strategy. Valid strategies are %s" %
+                (lastrowid_strategy, ", ".join(self.lastrowid_strategies)))
+        self.lastrowid_strategy = lastrowid_strategy
+        if lastrowid_strategy == 'sequence':
+            self.postfetch_lastrowid = False  # autoincrement values are prefetched
+
+        self.existence_probe_ttl = existence_probe_ttl
+        self.reflection_cache = ReflectionCache(int(reflection_cache_size), reflection_cache_ttl) \
+            if reflection_cache_size else None
+        self.reflection_snapshot = ReflectionSnapshot(reflection_snapshot_dir, self.ischema_names) \
+            if reflection_snapshot_dir else None
+        self.sequence_block_size = int(sequence_block_size)
+        self.insert_batch_size = int(insert_batch_size) if insert_batch_size else None
+        self.sequence_allocator = SequenceAllocator()
         self._reflector = self._reflector_cls(self)
 
+    def sequence_block_size_of(self, seq):
+        """
+        Get the number of values fetched per round trip
+        when a Sequence fires
+        :param seq: the Sequence
+        :returns: seq.info['splice_block_size'], else sequence_block_size
+        """
+        return int(seq.info.get('splice_block_size', self.sequence_block_size))
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        """
+        Execute a statement once per parameter set. INSERTs with
+        a batch size (see insert_batch_size) are sent as multi-row
+        INSERT ... VALUES (...), (...) statements: every full batch
+        reuses the same statement in one executemany() call, and the
+        rows left over are sent in one last, shorter statement
+        :param cursor: DBAPI cursor
+        :param statement: SQL Statement to execute
+        :param parameters: list of parameter sets
+        :param context: additional info for query resolving
+        """
+        batch_size = context.get_insert_batch_size() if context is not None else 0
+        if batch_size <= 1 or len(parameters) <= 1:
+            self._executemany(cursor, statement, parameters, context)
+            return
+
+        full = len(parameters) - len(parameters) % batch_size
+        if full:
+            batches = [[value for row in parameters[i:i + batch_size] for value in row]
+                       for i in range(0, full, batch_size)]
+            self._executemany(cursor, context.get_insert_batch_statement(batch_size),
+                              batches, context, rows_per_set=batch_size)
+        if full < len(parameters):
+            rest = parameters[full:]
+            self.do_execute(cursor, context.get_insert_batch_statement(len(rest)),
+                            [value for row in rest for value in row], context)
+        # every row of a VALUES insert is inserted (or the statement fails), while
+        # drivers report the rowcount of the last statement or -1 after executemany
+        context._batch_rowcount = len(parameters)
+
+    @classmethod
+    def engine_created(cls, engine):
+        """
+        Route the engine's SELECTs to the OLTP or OLAP engine, as set by the
+        splice_engine execution option or engine option (see
+        routing.route_statement)
+        :param engine: the new engine
+        """
+        if not event.contains(engine, 'before_execute', route_statement):
+            event.listen(engine, 'before_execute', route_statement, retval=True)
+
+    def do_execute(self, cursor, statement, parameters, context=None):
+        """
+        Execute a statement, then invalidate what the dialect
+        caches about the catalog if it was DDL
+        :param cursor: DBAPI cursor
+        :param statement: SQL Statement to execute
+        :param parameters: parameters for the statement
+        :param context: additional info for query resolving
+        """
+        super(SpliceMachineDialect, self).do_execute(cursor, statement, parameters, context)
+        if context is not None:
+            self._invalidate_after_ddl(context)
+
+    def _invalidate_after_ddl(self, context):
+        """
+        Discard the cached schema ids, existence probes, shared reflection
+        cache and sequence blocks when the statement executed was DDL. This
+        runs from do_execute rather than post_exec, which SQLAlchemy skips
+        for plain string statements (connection.execute("DROP TABLE ..."))
+        :param context: the execution context of the statement
+        """
+        statement = getattr(context, 'unicode_statement', None)
+        if context.isddl or (statement is not None and DDL_RX.match(statement)):
+            self._reflector.invalidate_schema_ids()
+            self._reflector.invalidate_probes(context.root_connection)
+            if self.reflection_cache is not None:
+                self.reflection_cache.invalidate()
+            self.sequence_allocator.invalidate()  # a sequence may have been recreated
+
+    def _executemany(self, cursor, statement, parameters, context, rows_per_set=1):
+        """
+        Hand an executemany() to the DBAPI cursor
+        :param cursor: DBAPI cursor
+        :param statement: SQL Statement to execute
+        :param parameters: list of parameter sets
+        :param context: additional info for query resolving
+        :param rows_per_set: number of rows each parameter set
+            inserts (for multi-row INSERT batches)
+        """
+        cursor.executemany(statement, parameters)
+
     ##### REFLECTOR WRAPPERS ####
     def initialize(self, connection):
         super(SpliceMachineDialect, self).initialize(connection)
@@ -1246,6 +2087,10 @@ class SpliceMachineDialect(default.DefaultDialect):
         return self._reflector.get_columns(
             connection, table_name, schema=schema, **kw)
 
+    def get_multi_columns(self, connection, schema=None, filter_names=None, **kw):
+        return self._reflector.get_multi_columns(
+            connection, schema=schema, filter_names=filter_names, **kw)
+
     def get_indexes(self, connection, table_name, schema=None, **kw):
         return self._reflector.get_indexes(
             connection, table_name, schema=schema, **kw)
@@ -1254,6 +2099,11 @@ class SpliceMachineDialect(default.DefaultDialect):
         return self._reflector.get_primary_keys(
             connection, table_name, schema=schema, **kw)
 
+    def get_pk_constraint(self, connection, table_name, schema=None, **kw):
+        # primary key constraint names aren't reflected
+        return {'constrained_columns': self.get_primary_keys(connection, table_name, schema=schema, **kw),
+                'name': None}
+
     def get_foreign_keys(self, connection, table_name, schema=None, **kw):
         return self._reflector.get_foreign_keys(
             connection, table_name, schema=schema, **kw)
@@ -1262,5 +2112,18 @@ class SpliceMachineDialect(default.DefaultDialect):
         return self._reflector.get_incoming_foreign_keys(
             connection, table_name, schema=schema, **kw)
 
+    def reflecttable(self, connection, table, *args, **kw):
+        """
+        Reflect a Table (autoload, MetaData.reflect), then write
+        what was reflected to the reflection snapshot, if any.
+        Only called by SQLAlchemy 1.3; on 1.4 snapshots are written
+        by reflect_parallel/reflect_lazy and when the process exits
+        """
+        try:
+            return super(SpliceMachineDialect, self).reflecttable(connection, table, *args, **kw)
+        finally:
+            if self.reflection_snapshot is not None:
+                self.reflection_snapshot.flush()
+
 
 dialect = SpliceMachineDialect
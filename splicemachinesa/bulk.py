@@ -0,0 +1,514 @@
+import datetime
+import decimal
+import os
+import random
+import tempfile
+from collections import namedtuple
+
+from sqlalchemy import MetaData, Table, bindparam, text
+from sqlalchemy import types as sa_types
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Bulk loading through Splice Machine's native import
+procedures. Rows are written to a delimited staging
+file in a directory the server can read, then imported
+with a single SYSCS_UTIL.IMPORT_DATA (or, for very large
+loads, SYSCS_UTIL.BULK_IMPORT_HFILE) call.
+
+Usage:
+    result = load(engine, 'orders', rows, staging_dir='/mnt/shared/staging')
+    print(result.rows_imported, result.bad_records)
+"""
+
+# formats of the values written by write_staging_file (Java SimpleDateFormat patterns)
+TIMESTAMP_FORMAT = 'yyyy-MM-dd HH:mm:ss.SSSSSS'
+DATE_FORMAT = 'yyyy-MM-dd'
+TIME_FORMAT = 'HH:mm:ss'
+
+StagingFile = namedtuple('StagingFile', ['path', 'rows', 'one_line_records'])
+LoadResult = namedtuple('LoadResult', ['rows_imported', 'bad_records', 'files', 'bad_record_log'])
+
+
+def rows_and_columns(rows_or_dataframe, columns=None):
+    """
+    Normalize the rows to load into tuples and their column names
+    :param rows_or_dataframe: a pandas DataFrame, an iterable of
+        dicts, or an iterable of tuples (with `columns`)
+    :param columns: the column names of tuple rows
+    :returns: (column names, iterator of tuples)
+    """
+    if hasattr(rows_or_dataframe, 'itertuples') and hasattr(rows_or_dataframe, 'columns'):
+        columns = [str(c) for c in rows_or_dataframe.columns]
+        return columns, rows_or_dataframe.itertuples(index=False, name=None)
+
+    rows = iter(rows_or_dataframe)
+    try:
+        first = next(rows)
+    except StopIteration:
+        return list(columns or ()), iter(())
+
+    def chain(first, rows):
+        yield first
+        for row in rows:
+            yield row
+
+    if isinstance(first, dict):
+        columns = list(columns or first.keys())
+        return columns, (tuple(row.get(c) for c in columns) for row in chain(first, rows))
+    if columns is None:
+        raise ValueError('columns must be given when loading rows that are not dicts')
+    return list(columns), (tuple(row) for row in chain(first, rows))
+
+
+def _format_value(value, quotechar, type_=None):
+    """
+    Convert a value to its field in the staging file. Text is quoted,
+    so empty strings are kept apart from NULLs (empty, unquoted fields),
+    and dates/times match TIMESTAMP_FORMAT, DATE_FORMAT and TIME_FORMAT.
+    Booleans loaded into Boolean (a SMALLINT) or numeric columns are 1/0
+    :param value: the value to write
+    :param quotechar: the character delimiter
+    :param type_: the type of the column loaded, if known
+    :returns: the field
+    """
+    if value is None or (isinstance(value, float) and value != value):  # None, NaN
+        return ''
+    if isinstance(value, bool):
+        if isinstance(type_, (sa_types.Boolean, sa_types.Integer, sa_types.Numeric)):
+            return '1' if value else '0'
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        if value != value:  # pandas NaT
+            return ''
+        value = value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    elif isinstance(value, datetime.date):
+        value = value.isoformat()
+    elif isinstance(value, datetime.time):
+        value = value.strftime('%H:%M:%S')
+    elif isinstance(value, bytes):
+        value = value.decode('utf-8')
+    else:
+        value = str(value)
+    return quotechar + value.replace(quotechar, quotechar * 2) + quotechar
+
+
+def write_staging_file(rows, path, delimiter=',', quotechar='"', sample=None, types=None):
+    """
+    Write rows to a delimited file for SYSCS_UTIL.IMPORT_DATA
+    :param rows: iterable of tuples
+    :param path: the file to write
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param sample: optional ReservoirSample to offer every row to
+    :param types: optional types of the columns loaded, in row order
+    :returns: StagingFile with the number of rows written and whether
+        every record fits on one line
+    """
+    count = 0
+    one_line_records = True
+    types = types or ()
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for row in rows:
+            if sample is not None:
+                sample.add(row)
+            line = delimiter.join(_format_value(v, quotechar, types[i] if i < len(types) else None)
+                                  for i, v in enumerate(row))
+            if one_line_records and ('\n' in line or '\r' in line):
+                one_line_records = False
+            f.write(line + '\n')
+            count += 1
+    return StagingFile(path, count, one_line_records)
+
+
+def import_formats(table, column_names):
+    """
+    Get the date/time formats to import with, for the
+    types of the columns being loaded
+    :param table: the SQLAlchemy Table being loaded
+    :param column_names: names of the columns in the staging file
+    :returns: dict of timestamp_format, date_format and time_format
+        (None for types not being loaded)
+    """
+    types = [table.c[name].type for name in column_names]
+    return {
+        'timestamp_format': TIMESTAMP_FORMAT if any(isinstance(t, sa_types.DateTime) for t in types) else None,
+        'date_format': DATE_FORMAT if any(isinstance(t, sa_types.Date) for t in types) else None,
+        'time_format': TIME_FORMAT if any(isinstance(t, sa_types.Time) for t in types) else None,
+    }
+
+
+def _call_statement(procedure, arguments):
+    """
+    Build a CALL statement with bound arguments
+    :param procedure: the procedure name
+    :param arguments: list of (name, value) tuples. BOOLEAN arguments
+        are rendered inline, since booleans are bound as 0/1
+    :returns: text() clause with bound parameters
+    """
+    placeholders, params = [], []
+    for name, value in arguments:
+        if isinstance(value, bool):
+            placeholders.append('true' if value else 'false')
+        else:
+            placeholders.append(':' + name)
+            params.append(bindparam(name, value, type_=sa_types.Integer() if isinstance(value, int)
+                                    else sa_types.String()))
+    return text('CALL {}({})'.format(procedure, ', '.join(placeholders))).bindparams(*params)
+
+
+def _file_arguments(path, delimiter, quotechar, timestamp_format, date_format, time_format,
+                    bad_records_allowed, bad_record_dir, one_line_records, charset):
+    """
+    Get the file arguments shared by the import and split procedures
+    :returns: list of (name, value) tuples
+    """
+    return [('file_name', path), ('column_delimiter', delimiter), ('character_delimiter', quotechar),
+            ('timestamp_format', timestamp_format), ('date_format', date_format),
+            ('time_format', time_format), ('bad_records_allowed', int(bad_records_allowed)),
+            ('bad_record_directory', bad_record_dir), ('one_line_records', bool(one_line_records)),
+            ('charset', charset)]
+
+
+def import_statement(procedure, schema, table_name, column_names, path, delimiter=',', quotechar='"',
+                     timestamp_format=None, date_format=None, time_format=None, bad_records_allowed=0,
+                     bad_record_dir=None, one_line_records=True, charset=None, bulk_import_dir=None,
+                     skip_sampling=False):
+    """
+    Build the CALL statement for a Splice Machine import
+    procedure that takes the IMPORT_DATA arguments
+    :param procedure: e.g. SYSCS_UTIL.IMPORT_DATA
+    :param schema: the (uppercase) schema of the table
+    :param table_name: the (uppercase) table name
+    :param column_names: the (uppercase) columns in the file, in order
+    :param path: the file or directory, as seen by the server
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param timestamp_format: format of TIMESTAMP values
+    :param date_format: format of DATE values
+    :param time_format: format of TIME values
+    :param bad_records_allowed: bad records tolerated before failing
+    :param bad_record_dir: directory the server writes rejected records to
+    :param one_line_records: whether every record is on one line
+    :param charset: file character set
+    :param bulk_import_dir: server directory for the HFiles generated
+        by SYSCS_UTIL.BULK_IMPORT_HFILE (only for that procedure)
+    :param skip_sampling: whether BULK_IMPORT_HFILE should skip sampling
+        the input because the table was split beforehand
+    :returns: text() clause with bound parameters
+    """
+    arguments = [('schema_name', schema), ('table_name', table_name),
+                 ('insert_columns', ','.join(column_names))]
+    arguments += _file_arguments(path, delimiter, quotechar, timestamp_format, date_format, time_format,
+                                 bad_records_allowed, bad_record_dir, one_line_records, charset)
+    if bulk_import_dir is not None:
+        arguments += [('bulk_import_directory', bulk_import_dir), ('skip_sampling', bool(skip_sampling))]
+    return _call_statement(procedure, arguments)
+
+
+def split_statement(schema, table_name, index_name, column_names, path, delimiter=',', quotechar='"',
+                    timestamp_format=None, date_format=None, time_format=None):
+    """
+    Build the SYSCS_UTIL.SYSCS_SPLIT_TABLE_OR_INDEX call that pre-splits
+    a table (or one of its indexes) at the keys listed in a file
+    :param schema: the (uppercase) schema of the table
+    :param table_name: the (uppercase) table name
+    :param index_name: the (uppercase) index name, or None to split the table
+    :param column_names: the (uppercase) key columns in the file, in order
+    :param path: the split key file, as seen by the server
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param timestamp_format: format of TIMESTAMP values
+    :param date_format: format of DATE values
+    :param time_format: format of TIME values
+    :returns: text() clause with bound parameters
+    """
+    arguments = [('schema_name', schema), ('table_name', table_name), ('index_name', index_name),
+                 ('split_columns', ','.join(column_names))]
+    arguments += _file_arguments(path, delimiter, quotechar, timestamp_format, date_format, time_format,
+                                 0, None, True, None)
+    return _call_statement('SYSCS_UTIL.SYSCS_SPLIT_TABLE_OR_INDEX', arguments)
+
+
+class ReservoirSample(object):
+    """
+    Fixed-size uniform sample of a stream of rows, taken
+    while the rows are written to the staging file
+    """
+
+    def __init__(self, size, seed=None):
+        """
+        :param size: the maximum number of rows to keep
+        :param seed: random seed (for repeatable samples)
+        """
+        self.size = size
+        self.seen = 0
+        self.rows = []
+        self._random = random.Random(seed)
+
+    def add(self, row):
+        """
+        Offer a row to the sample
+        :param row: the row
+        """
+        self.seen += 1
+        if len(self.rows) < self.size:
+            self.rows.append(row)
+        else:
+            i = self._random.randrange(self.seen)
+            if i < self.size:
+                self.rows[i] = row
+
+
+def split_points(keys, regions):
+    """
+    Get the keys that divide sampled keys into
+    regions of (roughly) equal size
+    :param keys: list of sampled key tuples
+    :param regions: the number of regions wanted
+    :returns: sorted list of distinct split keys (at most regions - 1)
+    """
+    keys = sorted(k for k in keys if None not in k)  # NULL keys can't be split at
+    points = []
+    for i in range(1, regions if keys else 0):
+        key = keys[len(keys) * i // regions]
+        if key not in points:
+            points.append(key)
+    return points
+
+
+def load_result(row):
+    """
+    Read the result row of an import procedure
+    :param row: the first row returned by the CALL (or None)
+    :returns: LoadResult
+    """
+    if row is None:
+        return LoadResult(None, None, None, None)
+    values = {key.lower(): value for key, value in getattr(row, '_mapping', row).items()}  # 1.4 rows are tuples
+
+    def first(*keys):
+        for key in keys:
+            if key in values:
+                return values[key]
+        return None
+
+    return LoadResult(first('rowsimported', 'numrowsimported'), first('failedrows', 'badrecords', 'numbadrecords'),
+                      first('files', 'numfiles'), first('failedlog', 'badrecordlog'))
+
+
+def resolve_table(engine, table, schema=None):
+    """
+    Get the Table to load into
+    :param engine: SQLAlchemy engine
+    :param table: a Table, or the name of a table to reflect
+    :param schema: the schema of a table given by name
+    :returns: Table
+    """
+    if isinstance(table, Table):
+        return table
+    return Table(table, MetaData(), schema=schema, autoload_with=engine)
+
+
+def _staging_path(staging_dir, prefix):
+    """
+    Create a new, empty staging file
+    :param staging_dir: the local directory to create the file in
+    :param prefix: file name prefix
+    :returns: the file path
+    """
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix='.csv', dir=os.path.expanduser(staging_dir))
+    os.close(fd)
+    return path
+
+
+def stage(table, rows_or_dataframe, staging_dir, columns=None, delimiter=',', quotechar='"', sample=None):
+    """
+    Write the rows to load to a new staging file
+    :param table: the Table being loaded
+    :param rows_or_dataframe: rows to load (see rows_and_columns)
+    :param staging_dir: the local directory to write the file to
+    :param columns: the column names of tuple rows
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param sample: optional ReservoirSample to offer every row to
+    :returns: (column names, StagingFile)
+    """
+    column_names, rows = rows_and_columns(rows_or_dataframe, columns)
+    unknown = [name for name in column_names if name not in table.c]
+    if unknown:
+        raise ValueError('Columns %s are not in table %s' % (', '.join(unknown), table.fullname))
+
+    path = _staging_path(staging_dir, 'splice_import_')
+    return column_names, write_staging_file(rows, path, delimiter=delimiter, quotechar=quotechar, sample=sample,
+                                            types=[table.c[name].type for name in column_names])
+
+
+def split_targets(table, column_names):
+    """
+    Get the table and indexes that can be pre-split from the loaded
+    columns: the primary key (as reflected through SMReflector when the
+    table was autoloaded) and every index whose columns are all loaded
+    :param table: the Table being loaded
+    :param column_names: names of the columns in the staging file
+    :returns: list of (index name or None for the table, key column names)
+    """
+    targets = []
+    pk_columns = [c.key for c in table.primary_key.columns]
+    if pk_columns and all(c in column_names for c in pk_columns):
+        targets.append((None, pk_columns))
+    for index in sorted(table.indexes, key=lambda i: i.name or ''):
+        index_columns = [c.key for c in index.columns]
+        if index.name and index_columns and all(c in column_names for c in index_columns):
+            targets.append((index.name, index_columns))
+    return targets
+
+
+def presplit(connection, table, schema, column_names, sample, regions, staging_dir, server_dir,
+             delimiter=',', quotechar='"', keep_staging_file=False):
+    """
+    Split a table and its indexes into regions at key values
+    computed from a sample of the rows being loaded
+    :param connection: SQLAlchemy connection
+    :param table: the Table being loaded
+    :param schema: the (uppercase) schema of the table
+    :param column_names: names of the columns in the staging file
+    :param sample: ReservoirSample of the staged rows
+    :param regions: the number of regions to split into
+    :param staging_dir: local directory to write split key files to
+    :param server_dir: the path of staging_dir as seen by the server
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param keep_staging_file: whether to keep the split key files
+    :returns: dict of index name (None for the table) -> number of split points
+    """
+    denormalize = connection.dialect.denormalize_name
+    splits = {}
+    for index_name, key_columns in split_targets(table, column_names):
+        positions = [column_names.index(c) for c in key_columns]
+        points = split_points([tuple(row[i] for i in positions) for row in sample.rows], regions)
+        splits[index_name] = len(points)
+        if not points:
+            continue
+
+        path = _staging_path(staging_dir, 'splice_split_')
+        try:
+            write_staging_file(points, path, delimiter=delimiter, quotechar=quotechar,
+                               types=[table.c[c].type for c in key_columns])
+            connection.execute(split_statement(
+                schema, denormalize(table.name), denormalize(index_name) if index_name else None,
+                [denormalize(table.c[c].name) for c in key_columns],
+                os.path.join(server_dir, os.path.basename(path)), delimiter=delimiter, quotechar=quotechar,
+                **import_formats(table, key_columns)))
+        finally:
+            if not keep_staging_file:
+                os.remove(path)
+    return splits
+
+
+def load(engine, table, rows_or_dataframe, staging_dir, server_dir=None, schema=None, columns=None,
+         delimiter=',', quotechar='"', bad_records_allowed=0, bad_record_dir=None, keep_staging_file=False,
+         hfile=False, bulk_import_dir=None, regions=None, rows_per_region=5000000, sample_size=100000,
+         upsert=False):
+    """
+    Bulk load rows into a table with SYSCS_UTIL.IMPORT_DATA, with
+    SYSCS_UTIL.UPSERT_DATA_FROM_FILE when `upsert` is set, or with
+    SYSCS_UTIL.BULK_IMPORT_HFILE when `hfile` is set. In HFile mode the
+    staged rows are sampled, and the table and its indexes are split at
+    the sampled key values before importing, so the import can skip
+    its own sampling pass. The import runs in a transaction committed
+    once the procedure returns
+    :param engine: SQLAlchemy engine
+    :param table: a Table, or the name of a table to reflect
+    :param rows_or_dataframe: a pandas DataFrame, an iterable of dicts,
+        or an iterable of tuples (with `columns`)
+    :param staging_dir: local directory to write the staging file to. It
+        must be readable by the server (e.g. a shared or HDFS mount)
+    :param server_dir: the path of staging_dir as seen by the server
+        (defaults to staging_dir)
+    :param schema: the schema of a table given by name
+    :param columns: the column names of tuple rows
+    :param delimiter: the column delimiter
+    :param quotechar: the character delimiter
+    :param bad_records_allowed: number of bad records tolerated before
+        the import fails (-1 for no limit)
+    :param bad_record_dir: server directory to write rejected records to
+    :param keep_staging_file: whether to keep the staging file after importing
+    :param hfile: whether to import with SYSCS_UTIL.BULK_IMPORT_HFILE
+    :param bulk_import_dir: server directory for the temporary HFiles
+        (required with hfile)
+    :param regions: number of regions to pre-split into (defaults to
+        the number of staged rows / rows_per_region)
+    :param rows_per_region: rows per region when `regions` isn't given
+    :param sample_size: number of staged rows sampled for split keys
+    :param upsert: whether rows whose primary key already exists update
+        the existing row instead of being rejected
+    :returns: LoadResult with the number of rows imported and bad records
+    """
+    if hfile and not bulk_import_dir:
+        raise ValueError('bulk_import_dir is required for HFile imports')
+    if hfile and upsert:
+        raise ValueError('HFile imports can not upsert')
+
+    table = resolve_table(engine, table, schema=schema)
+    sample = ReservoirSample(sample_size) if hfile else None
+    column_names, staged = stage(table, rows_or_dataframe, staging_dir, columns=columns,
+                                 delimiter=delimiter, quotechar=quotechar, sample=sample)
+    server_dir = server_dir or staging_dir
+    try:
+        if not staged.rows:
+            return LoadResult(0, 0, 0, None)
+
+        with engine.begin() as connection:
+            denormalize = engine.dialect.denormalize_name
+            table_schema = denormalize(table.schema or engine.dialect.default_schema_name)
+            hfile_arguments = {}
+            if hfile:
+                regions = regions or max(1, staged.rows // rows_per_region)
+                splits = presplit(connection, table, table_schema, column_names, sample, regions,
+                                  staging_dir, server_dir, delimiter=delimiter, quotechar=quotechar,
+                                  keep_staging_file=keep_staging_file)
+                # sampling is only skipped when the table was actually split
+                hfile_arguments = {'bulk_import_dir': bulk_import_dir, 'skip_sampling': bool(splits.get(None))}
+
+            if hfile:
+                procedure = 'SYSCS_UTIL.BULK_IMPORT_HFILE'
+            elif upsert:
+                procedure = 'SYSCS_UTIL.UPSERT_DATA_FROM_FILE'
+            else:
+                procedure = 'SYSCS_UTIL.IMPORT_DATA'
+            statement = import_statement(
+                procedure,
+                table_schema, denormalize(table.name),
+                [denormalize(table.c[name].name) for name in column_names],
+                os.path.join(server_dir, os.path.basename(staged.path)),
+                delimiter=delimiter, quotechar=quotechar, bad_records_allowed=bad_records_allowed,
+                bad_record_dir=bad_record_dir, one_line_records=staged.one_line_records,
+                **dict(import_formats(table, column_names), **hfile_arguments))
+            return load_result(connection.execute(statement).first())
+    finally:
+        if not keep_staging_file:
+            os.remove(staged.path)
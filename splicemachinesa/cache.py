@@ -0,0 +1,136 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Dialect-level reflection cache, shared by
+every Inspector (and every autoloaded Table)
+created against the same engine.
+
+Enabled per engine with
+create_engine(url, reflection_cache_size=1024, reflection_cache_ttl=300)
+"""
+
+
+class ReflectionCache(object):
+    """
+    Thread-safe LRU cache with a time-to-live, used to
+    share reflection results across Inspectors. It is
+    invalidated whenever the dialect executes DDL
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        """
+        :param maxsize: maximum number of entries to hold before
+            evicting the least recently used one
+        :param ttl: number of seconds an entry is valid for (None
+            for no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expiry, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a cached value
+        :param key: the cache key
+        :returns: (found, value) tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self._entries.move_to_end(key)  # most recently used
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:  # expired
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least
+        recently used entry if the cache is full
+        :param key: the cache key
+        :param value: the value to store
+        """
+        expiry = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expiry, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Discard every cached entry (e.g. after DDL)
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Get cache statistics
+        :returns: dict with hits, misses and current size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+def shared_cache(fn):
+    """
+    Decorator for SMReflector methods that caches results in the dialect's
+    ReflectionCache (if one is configured). Keys are built the same way as
+    sqlalchemy.engine.reflection.cache-- the method name, the string
+    positional arguments and the keyword arguments (minus info_cache).
+    Values are copied in and out so callers can't mutate shared results
+    :param fn: reflection method
+    :returns: wrapped method
+    """
+
+    def wrapped(self, *args, **kw):
+        cache = self.dialect.reflection_cache
+        if cache is None:
+            return fn(self, *args, **kw)
+
+        key = (
+            fn.__name__,
+            tuple(a for a in args if isinstance(a, str)),
+            tuple((k, v) for k, v in sorted(kw.items()) if k != 'info_cache'),
+        )
+        found, value = cache.get(key)
+        if not found:
+            value = fn(self, *args, **kw)
+            cache.set(key, copy.deepcopy(value))
+            return value
+        return copy.deepcopy(value)
+
+    wrapped.__name__ = fn.__name__
+    wrapped.__doc__ = fn.__doc__
+    return wrapped
@@ -0,0 +1,269 @@
+import datetime
+import decimal
+import operator
+
+from sqlalchemy import types as sa_types
+from sqlalchemy.engine import result as _result
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Column-oriented fetching of query results into NumPy arrays
+or Arrow record batches. Rows are read from the cursor in
+batches and every column of a batch is converted in one call,
+instead of building a row and running result processors per value.
+Requires numpy or pyarrow (pip install splicemachinesa[numpy] / [arrow]),
+and SQLAlchemy 1.3.
+
+Usage:
+    result = connection.execution_options(columnar='numpy').execute(select([orders]))
+    for batch in result.fetch_batches():
+        batch['amount']  # numpy array
+"""
+
+FORMATS = ('numpy', 'arrow')
+
+# kind of a column from the Python type its values are fetched as (cursor.description type code)
+KINDS = {
+    int: 'int',
+    float: 'float',
+    decimal.Decimal: 'decimal',
+    bool: 'bool',
+    datetime.datetime: 'datetime',
+    datetime.date: 'date',
+    datetime.time: 'time',
+    str: 'str',
+    bytes: 'bytes',
+    bytearray: 'bytes',
+}
+
+
+def column_kinds(description, result_types=None):
+    """
+    Get the kind of every column of a result from the cursor
+    description. Booleans (stored as SMALLINT) and DATE columns
+    fetched as timestamps are told apart by the statement's
+    column types, when they are known
+    :param description: the DBAPI cursor description
+    :param result_types: the SQLAlchemy types of the columns, or None
+    :returns: list of kinds ('int', 'float', 'decimal', 'bool', 'datetime',
+        'date', 'time', 'str', 'bytes' or 'object')
+    """
+    kinds = [KINDS.get(column[1], 'object') for column in description]
+    if result_types is not None and len(result_types) == len(kinds):
+        for i, type_ in enumerate(result_types):
+            if isinstance(type_, sa_types.Boolean) and kinds[i] == 'int':
+                kinds[i] = 'bool'
+            elif isinstance(type_, sa_types.Date) and not isinstance(type_, sa_types.DateTime) and \
+                    kinds[i] == 'datetime':
+                kinds[i] = 'date'
+    return kinds
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECONDS = (('hour', 3600000000), ('minute', 60000000), ('second', 1000000), ('microsecond', 1))
+
+
+def _typed_numpy_column(numpy, values, kind):
+    """
+    Convert the values of a column without NULLs to a typed NumPy
+    array. Every conversion is a single pass in C (numpy.fromiter
+    over map()), since numpy parses date and datetime objects one
+    at a time when building datetime64 arrays from them
+    :param numpy: the numpy module
+    :param values: sequence of values
+    :param kind: the kind of the column (see column_kinds)
+    :returns: numpy array, or None if the kind has no typed array
+    :raises TypeError: if there are NULLs
+    """
+    count = len(values)
+    if kind == 'int':
+        return numpy.fromiter(values, dtype=numpy.int64, count=count)
+    if kind in ('float', 'decimal'):
+        return numpy.fromiter(map(float, values), dtype=numpy.float64, count=count)
+    if kind == 'bool':
+        if None in values:
+            raise TypeError('NULL boolean')
+        return numpy.fromiter(values, dtype=numpy.bool_, count=count)
+    if kind in ('date', 'datetime'):
+        days = numpy.fromiter(map(datetime.date.toordinal, values), dtype=numpy.int64, count=count) - EPOCH_ORDINAL
+        if kind == 'date':
+            return days.view('datetime64[D]')
+        microseconds = days * 86400000000
+        for field, unit in MICROSECONDS:
+            microseconds += numpy.fromiter(map(operator.attrgetter(field), values), dtype=numpy.int64,
+                                           count=count) * unit
+        return microseconds.view('datetime64[us]')
+    return None
+
+
+def numpy_column(values, kind):
+    """
+    Convert the values of a column to a NumPy array. Integers are
+    int64 (float64 with NaN when there are NULLs), DECIMAL and floats
+    are float64, dates and timestamps are datetime64 (NaT for NULLs),
+    booleans are bool (object with None when there are NULLs) and
+    everything else is an object array
+    :param values: sequence of values
+    :param kind: the kind of the column (see column_kinds)
+    :returns: numpy array
+    """
+    import numpy
+
+    try:
+        column = _typed_numpy_column(numpy, values, kind)
+        if column is not None:
+            return column
+    except TypeError:  # NULLs
+        if kind in ('int', 'float', 'decimal'):
+            return numpy.array(values, dtype=numpy.float64)
+        if kind in ('date', 'datetime'):
+            nulls = numpy.fromiter((value is None for value in values), dtype=numpy.bool_, count=len(values))
+            column = _typed_numpy_column(numpy, [EPOCH if value is None else value for value in values], kind)
+            column[nulls] = numpy.datetime64('NaT')
+            return column
+    except OverflowError:  # integers beyond int64
+        pass
+
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values if kind != 'bool' else [None if value is None else bool(value) for value in values]
+    return column
+
+
+def arrow_column(values, kind, precision=None, scale=None):
+    """
+    Convert the values of a column to an Arrow array. NULLs are
+    Arrow nulls, and DECIMAL keeps its precision and scale
+    :param values: sequence of values
+    :param kind: the kind of the column (see column_kinds)
+    :param precision: precision of a DECIMAL column
+    :param scale: scale of a DECIMAL column
+    :returns: pyarrow array
+    """
+    import pyarrow
+
+    if kind == 'int':
+        return pyarrow.array(values, type=pyarrow.int64())
+    if kind == 'float':
+        return pyarrow.array(values, type=pyarrow.float64())
+    if kind == 'decimal':
+        if precision and precision <= 38:
+            return pyarrow.array(values, type=pyarrow.decimal128(precision, scale or 0))
+        return pyarrow.array([None if value is None else float(value) for value in values], type=pyarrow.float64())
+    if kind == 'bool':
+        return pyarrow.array(values, type=pyarrow.int8()).cast(pyarrow.bool_())
+    if kind == 'date':  # DATE values may be fetched as timestamps
+        return pyarrow.array(values, type=pyarrow.date32())
+    if kind == 'datetime':
+        return pyarrow.array(values, type=pyarrow.timestamp('us'))
+    if kind == 'time':
+        return pyarrow.array(values, type=pyarrow.time64('us'))
+    if kind == 'str':
+        return pyarrow.array(values, type=pyarrow.string())
+    if kind == 'bytes':
+        return pyarrow.array(values, type=pyarrow.binary())
+    return pyarrow.array(values)
+
+
+def to_columns(rows, names, kinds, description, format='numpy'):
+    """
+    Convert fetched rows to columns
+    :param rows: list of row tuples
+    :param names: the column names
+    :param kinds: the column kinds (see column_kinds)
+    :param description: the DBAPI cursor description
+    :param format: 'numpy' or 'arrow'
+    :returns: dict of column name -> numpy array, or a pyarrow RecordBatch
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    if format == 'arrow':
+        import pyarrow
+
+        return pyarrow.RecordBatch.from_arrays(
+            [arrow_column(values, kind, column[4], column[5])
+             for values, kind, column in zip(columns, kinds, description)], names=names)
+    return dict((name, numpy_column(values, kind)) for name, values, kind in zip(names, columns, kinds))
+
+
+# SQLAlchemy 1.4 builds its own CursorResult, so columnar results are only available on 1.3
+if hasattr(_result, 'ResultProxy'):
+    class ColumnarResultProxy(_result.ResultProxy):
+        """
+        Result of a statement executed with the columnar execution option,
+        which can be read as columns (fetch_batches, fetch_columns) as well
+        as rows
+        """
+
+        @property
+        def columnar_format(self):
+            """
+            The format columns are read as, 'numpy' or 'arrow'
+            """
+            return self.context.execution_options['columnar']
+
+        def _column_layout(self):
+            """
+            Get the names and kinds of the result columns
+            :returns: (names, kinds)
+            """
+            result_columns = self.context.result_column_struct[0] if self.context.compiled is not None else None
+            kinds = column_kinds(self.cursor.description,
+                                 [column[3] for column in result_columns] if result_columns else None)
+            return self.keys(), kinds
+
+        def fetch_batches(self, size=None):
+            """
+            Read the remaining rows as batches of columns
+            :param size: rows per batch (defaults to the fetch size,
+                see SpliceMachineExecutionContext.get_fetch_size)
+            :returns: generator of dicts of column name -> numpy array
+                (columnar='numpy') or of pyarrow RecordBatches (columnar='arrow')
+            """
+            if self._metadata is None:
+                self._non_result(None)
+            size = size or self.context.get_fetch_size()
+            names, kinds = self._column_layout()
+            description = self.cursor.description
+            try:
+                while True:
+                    rows = self.cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield to_columns(rows, names, kinds, description, self.columnar_format)
+            finally:
+                self._soft_close()
+
+        def fetch_columns(self):
+            """
+            Read the remaining rows as one batch of columns
+            :returns: dict of column name -> numpy array (columnar='numpy')
+                or a pyarrow RecordBatch (columnar='arrow')
+            """
+            if self._metadata is None:
+                self._non_result(None)
+            names, kinds = self._column_layout()
+            description = self.cursor.description
+            rows = self.cursor.fetchall()
+            self._soft_close()
+            return to_columns(rows, names, kinds, description, self.columnar_format)
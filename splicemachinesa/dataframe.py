@@ -0,0 +1,313 @@
+from sqlalchemy import Column, MetaData, Table, exc
+from sqlalchemy import types as sa_types
+
+from . import bulk
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Fast writes of pandas DataFrames to Splice Machine tables. Columns
+are converted to bind values a whole column at a time, and rows are
+sent straight to the cursor, without per-value bind processors, in
+the fastest way available for their number: an array-bound
+executemany (pyodbc), multi-row INSERT ... VALUES batches, or a
+bulk import of a staging file (see bulk.load).
+
+Usage:
+    from splicemachinesa import dataframe
+    dataframe.write(engine, df, 'orders', if_exists='append')
+or through pandas:
+    df.to_sql('orders', engine, index=False, method=dataframe.insert_method)
+"""
+
+PATHS = ('executemany', 'values', 'import')
+MAX_VARCHAR_LENGTH = 32672  # longer text columns are created as CLOB
+
+
+def column_type(series):
+    """
+    Get the SQLAlchemy type to create a column of a DataFrame with
+    :param series: the column (pandas Series)
+    :returns: SQLAlchemy type
+    """
+    from pandas.api.types import infer_dtype
+
+    dtype = series.dtype
+    if dtype.kind == 'b':
+        return sa_types.Boolean()
+    if dtype.kind in 'iu':
+        return sa_types.BigInteger() if dtype.itemsize >= 8 or (dtype.kind == 'u' and dtype.itemsize >= 4) \
+            else sa_types.Integer()
+    if dtype.kind == 'f':
+        return sa_types.Float()
+    if dtype.kind == 'M':
+        return sa_types.DateTime()
+
+    inferred = infer_dtype(series, skipna=True)
+    if inferred == 'boolean':
+        return sa_types.Boolean()
+    if inferred == 'integer':
+        return sa_types.BigInteger()
+    if inferred in ('floating', 'mixed-integer-float'):
+        return sa_types.Float()
+    if inferred == 'decimal':
+        values = series.dropna()
+        scale = max([-value.as_tuple().exponent for value in values if value.is_finite()] or [0])
+        return sa_types.Numeric(31, min(max(scale, 0), 31))
+    if inferred in ('datetime', 'datetime64'):
+        return sa_types.DateTime()
+    if inferred == 'date':
+        return sa_types.Date()
+    if inferred == 'time':
+        return sa_types.Time()
+    if inferred == 'bytes':
+        return sa_types.LargeBinary()
+
+    length = series.dropna().astype(str).str.encode('utf-8').str.len().max()
+    length = 1 if length != length else int(length)  # NaN for a column of NULLs
+    return sa_types.String(length) if length <= MAX_VARCHAR_LENGTH else sa_types.Text()
+
+
+def frame_table(frame, name, metadata, schema=None):
+    """
+    Build the Table for a DataFrame, with a column of the
+    type of every DataFrame column (see column_type). Its DDL is
+    rendered by the dialect's SpliceMachineTypeCompiler
+    :param frame: the DataFrame
+    :param name: the table name
+    :param metadata: the MetaData of the table
+    :param schema: the schema of the table
+    :returns: Table
+    """
+    return Table(name, metadata, *[Column(str(column), column_type(frame[column])) for column in frame.columns],
+                 schema=schema)
+
+
+def frame_columns(frame):
+    """
+    Convert the columns of a DataFrame to bind values, a whole
+    column at a time: NULLs (NaN, NaT, NA) become None, numpy scalars
+    Python values, booleans 0/1 and text UTF-8 bytes, as the dialect's
+    bind processors would convert them one value at a time
+    :param frame: the DataFrame
+    :returns: list of lists of values, one per column
+    """
+    from pandas.api.types import infer_dtype
+
+    columns = []
+    for column in frame.columns:
+        series = frame[column]
+        if series.dtype.kind == 'b':
+            series = series.astype('Int8')  # booleans are stored as SMALLINT
+        elif series.dtype.kind == 'O' and infer_dtype(series, skipna=True) == 'string':
+            series = series.str.encode('utf-8')
+        columns.append(series.astype(object).where(series.notna(), None).tolist())
+    return columns
+
+
+def _bind_column(values, type_):
+    """
+    Convert the values of a column of rows to bind values
+    :param values: the values
+    :param type_: the type of the column they are written to
+    :returns: list of values
+    """
+    if isinstance(type_, sa_types.Boolean):
+        return [None if value is None else int(value) for value in values]
+    if isinstance(type_, sa_types.String):
+        return [value.encode('utf-8') if isinstance(value, str) else value for value in values]
+    return list(values)
+
+
+def input_sizes(dialect, columns):
+    """
+    Get the input sizes to array-bind the values of columns with
+    :param dialect: the Splice Machine dialect
+    :param columns: the columns written
+    :returns: list of input sizes, or None if the values can't be array-bound
+    """
+    if not getattr(dialect, 'fast_executemany', False):  # not pyodbc, or not enabled on the engine
+        return None
+    sizes = [dialect._input_size(column.type) for column in columns]
+    return None if any(size is False for size in sizes) else sizes
+
+
+def choose_path(dialect, columns, rows, staging_dir=None, import_threshold=1000000):
+    """
+    Choose how to write rows: a bulk import for at least
+    import_threshold rows when a staging directory is given,
+    else an array-bound executemany when the engine enables it
+    (fast_executemany=True) and the column types support it, else
+    multi-row INSERT ... VALUES batches
+    :param dialect: the Splice Machine dialect
+    :param columns: the columns written
+    :param rows: the number of rows written
+    :param staging_dir: the staging directory for bulk imports, if any
+    :param import_threshold: rows from which a bulk import is used
+    :returns: 'import', 'executemany' or 'values'
+    """
+    if staging_dir is not None and rows >= import_threshold:
+        return 'import'
+    if input_sizes(dialect, columns) is not None:
+        return 'executemany'
+    return 'values'
+
+
+def table_columns(table, keys):
+    """
+    Get the columns of a table written by name, matched
+    case insensitively (reflected names are normalized)
+    :param table: the Table
+    :param keys: the column names
+    :returns: list of Columns
+    """
+    columns = dict((column.name.lower(), column) for column in table.c)
+    missing = [key for key in keys if str(key).lower() not in columns]
+    if missing:
+        raise exc.ArgumentError('%s has no column %s' % (table.fullname, ', '.join(str(key) for key in missing)))
+    return [columns[str(key).lower()] for key in keys]
+
+
+def insert_rows(connection, table, columns, rows, path=None, batch_size=1000, staging_dir=None,
+                import_threshold=1000000):
+    """
+    Write rows of bind values to a table
+    :param connection: SQLAlchemy connection
+    :param table: the Table
+    :param columns: the columns of the values of a row
+    :param rows: list of tuples of bind values
+    :param path: how to write them (defaults to choose_path). 'executemany'
+        falls back to a driver executemany() without array binding when the
+        engine can't array-bind the columns (see input_sizes)
+    :param batch_size: rows per multi-row INSERT statement
+    :param staging_dir: the staging directory for bulk imports
+    :param import_threshold: rows from which a bulk import is used
+    :returns: the number of rows written
+    """
+    dialect = connection.dialect
+    path = path or choose_path(dialect, columns, len(rows), staging_dir, import_threshold)
+    if path not in PATHS:
+        raise exc.ArgumentError("Invalid value '%s' for path. Valid paths are %s" % (path, ", ".join(PATHS)))
+    if not rows:
+        return 0
+    if path == 'import':
+        if staging_dir is None:
+            raise exc.ArgumentError('staging_dir is required to write with a bulk import')
+        return bulk.load(connection, table, rows, staging_dir, columns=[column.name for column in columns]) \
+            .rows_imported
+
+    compiled = table.insert().compile(dialect=dialect, column_keys=[column.key for column in columns])
+
+    def statement(count):
+        text = str(compiled) + (', ' + compiled.insert_values_clause) * (count - 1)
+        return text if dialect.supports_unicode_statements else dialect._encoder(text)[0]
+
+    cursor = connection.connection.cursor()
+    try:
+        if path == 'executemany':
+            sizes = input_sizes(dialect, columns)
+            if sizes is None:
+                dialect._executemany(cursor, statement(1), rows, None)
+            else:
+                dialect._array_executemany(cursor, statement(1), rows, sizes)
+            return len(rows)
+
+        batch_size = max(1, min(batch_size, dialect.max_insert_parameters // len(columns)))
+        full = len(rows) - len(rows) % batch_size
+        if full:
+            dialect._executemany(cursor, statement(batch_size),
+                                 [[value for row in rows[i:i + batch_size] for value in row]
+                                  for i in range(0, full, batch_size)],
+                                 None, rows_per_set=batch_size)
+        if full < len(rows):
+            cursor.execute(statement(len(rows) - full), [value for row in rows[full:] for value in row])
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def insert_method(pd_table, conn, keys, data_iter, path=None, batch_size=1000, staging_dir=None,
+                  import_threshold=1000000):
+    """
+    A DataFrame.to_sql method (method=insert_method). Bind the
+    extra arguments with functools.partial, e.g.
+    method=partial(insert_method, staging_dir='/mnt/shared/staging')
+    :param pd_table: the pandas SQLTable written to
+    :param conn: SQLAlchemy connection
+    :param keys: the column names
+    :param data_iter: iterable of rows
+    :param path: how to write the rows (see choose_path)
+    :param batch_size: rows per multi-row INSERT statement
+    :param staging_dir: the staging directory for bulk imports
+    :param import_threshold: rows from which a bulk import is used
+    :returns: the number of rows written
+    """
+    columns = table_columns(pd_table.table, keys)
+    values = [_bind_column(column_values, column.type) for column_values, column in zip(zip(*data_iter), columns)]
+    return insert_rows(conn, pd_table.table, columns, list(zip(*values)), path=path, batch_size=batch_size,
+                       staging_dir=staging_dir, import_threshold=import_threshold)
+
+
+def write(engine, frame, name, schema=None, if_exists='fail', index=False, path=None, batch_size=1000,
+          staging_dir=None, import_threshold=1000000):
+    """
+    Write a DataFrame to a table, in one transaction
+    :param engine: SQLAlchemy engine or connection
+    :param frame: the DataFrame
+    :param name: the table name
+    :param schema: the schema of the table
+    :param if_exists: what to do when the table exists-- 'fail',
+        'replace' (drop and create it) or 'append'
+    :param index: whether to write the index as columns
+    :param path: how to write the rows (see choose_path)
+    :param batch_size: rows per multi-row INSERT statement
+    :param staging_dir: the staging directory for bulk imports, which
+        the server must be able to read (see bulk.load)
+    :param import_threshold: rows from which a bulk import is used
+    :returns: the number of rows written
+    """
+    if if_exists not in ('fail', 'replace', 'append'):
+        raise exc.ArgumentError("Invalid value '%s' for if_exists. Valid values are fail, replace, append" % if_exists)
+    if index:
+        frame = frame.reset_index()
+
+    connection = engine.connect()
+    try:
+        with connection.begin():
+            exists = connection.dialect.has_table(connection, name, schema=schema)
+            if exists and if_exists == 'fail':
+                raise ValueError("Table '%s' already exists" % name)
+            if exists and if_exists == 'append':
+                table = Table(name, MetaData(), schema=schema, autoload_with=connection)
+            else:
+                table = frame_table(frame, name, MetaData(), schema=schema)
+                if exists:
+                    table.drop(connection)
+                table.create(connection)
+
+            columns = table_columns(table, frame.columns)
+            rows = list(zip(*frame_columns(frame)))
+            return insert_rows(connection, table, columns, rows, path=path, batch_size=batch_size,
+                               staging_dir=staging_dir, import_threshold=import_threshold)
+    finally:
+        connection.close()
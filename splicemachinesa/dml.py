@@ -0,0 +1,71 @@
+from sqlalchemy.sql.base import _generative
+from sqlalchemy.sql.dml import Insert as StandardInsert
+try:  # SQLAlchemy 1.4+ caches compiled statements by the attributes they traverse
+    from sqlalchemy.sql.visitors import InternalTraversal
+except ImportError:
+    InternalTraversal = None
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Splice Machine specific DML constructs.
+
+Usage:
+    from splicemachinesa.dml import insert
+    connection.execute(insert(table).on_conflict_upsert(), rows)
+"""
+
+
+class Insert(StandardInsert):
+    """
+    Splice Machine INSERT, which can be compiled with
+    the insertMode=UPSERT property so rows whose primary
+    key already exists are updated instead of rejected
+    """
+    _upsert = False
+
+    if InternalTraversal is not None:  # upserts and plain inserts must not share a compiled statement
+        _traverse_internals = StandardInsert._traverse_internals + [('_upsert', InternalTraversal.dp_boolean)]
+
+    @_generative
+    def on_conflict_upsert(self):
+        """
+        Update the existing row when an inserted row's primary key
+        is already present (INSERT ... --splice-properties insertMode=UPSERT).
+        The statement still runs as a single INSERT, so executemany()
+        and multi-row batches (insert_batch_size) upsert a whole batch
+        in one round trip
+        :returns: new Insert
+        """
+        self._upsert = True
+
+
+def insert(table, values=None, **kwargs):
+    """
+    Construct a Splice Machine Insert
+    (see sqlalchemy.sql.expression.insert)
+    :param table: the table to insert into
+    :param values: optional values to insert
+    :returns: Insert
+    """
+    return Insert(table, values, **kwargs)
@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy.sql.schema import BLANK_SCHEMA
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Lazy reflection: table stubs that are only
+reflected when they are first used.
+
+Usage:
+    tables = reflect_lazy(engine, 'SPLICE')
+    orders = tables['orders']  # no catalog calls yet
+    engine.execute(select([orders]).where(orders.c.id == 1))  # reflected here
+"""
+
+
+class LazyTable(object):
+    """
+    Stand-in for a Table that reflects its columns, keys and
+    indexes on first use. `name` and `schema` are available
+    without reflecting; any other attribute (e.g. `c`, `columns`,
+    `primary_key`) loads the table and is read from the real
+    Table object, and the stub can be used directly in SQL
+    expressions (select([stub]), stub.insert(), ...)
+    """
+
+    def __init__(self, name, schema, loader):
+        """
+        :param name: the table name
+        :param schema: the schema under which the table is found
+        :param loader: the _LazyLoader that reflects the table
+        """
+        self.name = name
+        self.schema = schema
+        self._loader = loader
+        self._table = None
+
+    @property
+    def loaded(self):
+        """
+        Whether the table has been reflected yet
+        """
+        return self._table is not None
+
+    @property
+    def table(self):
+        """
+        The reflected Table (reflected on first access)
+        """
+        if self._table is None:
+            self._loader.load(self)
+        return self._table
+
+    def __clause_element__(self):
+        return self.table
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):  # don't reflect for protocol lookups (copy, pickle, ...)
+            raise AttributeError(attr)
+        return getattr(self.table, attr)
+
+    def __repr__(self):
+        return 'LazyTable(%r, schema=%r, loaded=%s)' % (self.name, self.schema, self.loaded)
+
+
+class _LazyLoader(object):
+    """
+    Shared state of the stubs returned by one reflect_lazy
+    call: a single Inspector (so the schema-wide column lookup
+    is reused across stubs), the target MetaData and the stubs
+    by MetaData key
+    """
+
+    def __init__(self, bind, schema, metadata):
+        """
+        :param bind: SQLAlchemy engine
+        :param schema: the schema being reflected
+        :param metadata: MetaData that reflected tables are added to
+        """
+        self.bind = bind
+        self.schema = schema
+        self.metadata = metadata
+        self.inspector = inspect(bind)
+        self.stubs = OrderedDict()
+        self._lock = threading.RLock()  # reentrant: loading a table loads its FK targets
+
+    def key(self, name):
+        """
+        Get the MetaData key for a table name
+        :param name: the table name
+        :returns: [schema.]name
+        """
+        return name if self.schema is None else '{}.{}'.format(self.schema, name)
+
+    def load(self, stub):
+        """
+        Reflect the Table behind a stub. Foreign key targets that
+        are stubs of the same schema are loaded as well, so the keys
+        resolve; other targets are autoloaded
+        :param stub: the LazyTable to load
+        """
+        with self._lock:
+            if stub._table is not None:  # loaded by another thread or by a referring table
+                return
+            table = Table(stub.name, self.metadata, schema=self.schema)
+            reflect_table = getattr(self.inspector, 'reflect_table', None) or self.inspector.reflecttable  # renamed in 1.4
+            reflect_table(table, None, resolve_fks=False)
+            stub._table = table
+
+            for fk in table.foreign_keys:
+                referred_key = fk.target_fullname.rsplit('.', 1)[0]  # [schema.]table
+                if referred_key in self.stubs:
+                    self.stubs[referred_key].table
+                elif referred_key not in self.metadata.tables:
+                    referred_schema, _, referred_table = referred_key.rpartition('.')
+                    Table(referred_table, self.metadata, schema=referred_schema or BLANK_SCHEMA,
+                          autoload_with=self.bind)
+
+            if self.bind.dialect.reflection_snapshot is not None:
+                self.bind.dialect.reflection_snapshot.flush()
+
+
+def reflect_lazy(engine, schema=None, metadata=None, views=False):
+    """
+    Get lazy stubs for every table in a schema. Only the table
+    names are read up front; each table is reflected the first
+    time its columns (or any other Table attribute) are used
+    :param engine: SQLAlchemy engine
+    :param schema: the schema to reflect (defaults to the default schema)
+    :param metadata: MetaData that tables are added to as they are
+        loaded (a new one is created if None)
+    :param views: whether to include views as well
+    :returns: OrderedDict of table name -> LazyTable
+    """
+    engine = getattr(engine, 'engine', engine)
+    loader = _LazyLoader(engine, schema, metadata if metadata is not None else MetaData())
+
+    table_names = loader.inspector.get_table_names(schema)
+    if views:
+        table_names = table_names + loader.inspector.get_view_names(schema)
+
+    for table_name in table_names:
+        loader.stubs[loader.key(table_name)] = LazyTable(table_name, schema, loader)
+    return OrderedDict((stub.name, stub) for stub in loader.stubs.values())
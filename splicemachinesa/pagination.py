@@ -0,0 +1,146 @@
+from sqlalchemy import and_, exc, or_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Keyset pagination. Each page is read with a WHERE clause
+on the last key of the previous page instead of an OFFSET,
+so reading a page costs the same however deep it is.
+
+Usage:
+    for page in paginate(connection, select([orders]), page_size=500):
+        ...
+"""
+
+
+def sort_keys(order_by):
+    """
+    Get the columns and directions of an ordering
+    :param order_by: a column, col.desc()/col.asc(), or a list of them
+    :returns: list of (column, descending) tuples
+    """
+    if not isinstance(order_by, (list, tuple)):
+        order_by = [order_by]
+    keys = []
+    for key in order_by:
+        descending = False
+        if isinstance(key, UnaryExpression) and key.modifier in (operators.desc_op, operators.asc_op):
+            descending = key.modifier is operators.desc_op
+            key = key.element
+        keys.append((key, descending))
+    return keys
+
+
+def primary_key_order(connection, select):
+    """
+    Get the primary key ordering of a select over a single table,
+    from the Table's primary key or, for tables declared without
+    one, from the database (SMReflector.get_primary_keys)
+    :param connection: SQLAlchemy connection
+    :param select: the select query class
+    :returns: list of primary key columns
+    """
+    froms = select.froms
+    table = froms[0] if len(froms) == 1 else None
+    if table is None or not hasattr(table, 'primary_key'):
+        raise exc.ArgumentError('order_by is required to paginate a select that does not read a single table')
+    if len(table.primary_key):
+        return list(table.primary_key)
+
+    dialect = connection.dialect
+    names = [dialect.normalize_name(name) for name in
+             dialect.get_primary_keys(connection, table.name, schema=table.schema)]
+    columns = dict((column.name.lower(), column) for column in table.c)
+    if not names or any(name.lower() not in columns for name in names):
+        raise exc.ArgumentError('order_by is required to paginate %s, which has no primary key' % table.fullname)
+    return [columns[name.lower()] for name in names]
+
+
+def after_key(keys, values):
+    """
+    Get the condition for rows that sort after a key,
+    e.g. (a, b) > (1, 2) as a > 1 OR (a = 1 AND b > 2)
+    :param keys: list of (column, descending) tuples
+    :param values: the key values of the last row read
+    :returns: the condition
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        terms = [keys[j][0] == values[j] for j in range(i)]
+        terms.append(column < values[i] if descending else column > values[i])
+        clauses.append(and_(*terms))
+    return or_(*clauses)
+
+
+def page_statement(select, keys, page_size, last=None):
+    """
+    Get the statement reading the page after a key
+    :param select: the select query class
+    :param keys: list of (column, descending) tuples
+    :param page_size: the number of rows per page
+    :param last: the key values of the last row read (None for the first page)
+    :returns: the select for the page
+    """
+    statement = select.order_by(None).order_by(*[column.desc() if descending else column
+                                                 for column, descending in keys]).limit(page_size)
+    if last is not None:
+        statement = statement.where(after_key(keys, last))
+    return statement
+
+
+def paginate(connection, select, order_by=None, page_size=1000):
+    """
+    Read the rows of a select one page at a time, using keyset
+    pagination: every page is read by the same statement, filtered on
+    the key of the last row of the previous page. The ordering must be
+    unique and its columns not nullable (e.g. a primary key)
+    :param connection: SQLAlchemy connection (or engine)
+    :param select: the select query class. It must not have a LIMIT or
+        OFFSET; its ORDER BY is replaced by the keyset ordering. Key
+        columns missing from it are added to its columns
+    :param order_by: the ordering (a column, col.desc(), or a list of them).
+        Defaults to the primary key of the table the select reads
+    :param page_size: the number of rows per page
+    :returns: generator of pages (lists of rows)
+    """
+    if select._limit_clause is not None or select._offset_clause is not None:
+        raise exc.ArgumentError('A select with LIMIT or OFFSET can not be paginated')
+    if order_by is None:
+        order_by = primary_key_order(connection, select)
+    keys = sort_keys(order_by)
+
+    selected = set(select.inner_columns)
+    for column, _ in keys:
+        if column not in selected:
+            select = select.column(column)
+
+    last = None
+    while True:
+        page = connection.execute(page_statement(select, keys, page_size, last)).fetchall()
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last = [page[-1][column] for column, _ in keys]
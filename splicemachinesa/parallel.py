@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy.sql.schema import BLANK_SCHEMA
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Concurrent reflection of every table in a schema.
+
+Usage:
+    metadata = reflect_parallel(engine, 'SPLICE', workers=8)
+"""
+
+
+def _reflect_keys(engine, table_names, schema):
+    """
+    Fetch primary keys, foreign keys and indexes for some tables
+    on a connection of its own (runs in a worker thread)
+    :param engine: SQLAlchemy engine
+    :param table_names: the tables to fetch keys for
+    :param schema: schema under which the tables are found
+    :returns: the Inspector info cache holding the results
+    """
+    with engine.connect() as connection:
+        insp = inspect(connection)
+        for table_name in table_names:
+            insp.get_pk_constraint(table_name, schema)
+            insp.get_foreign_keys(table_name, schema)
+            insp.get_indexes(table_name, schema)
+        return insp.info_cache
+
+
+def reflect_parallel(engine, schema=None, workers=4, metadata=None, only=None, views=False):
+    """
+    Reflect every table in a schema into a MetaData, running the per-table
+    SYSIBM.SQLPRIMARYKEYS/SQLFOREIGNKEYS/SQLSTATISTICS calls concurrently.
+    Columns are read for the whole schema with a single SYSIBM.SQLCOLUMNS
+    call; the key and index calls are split across `workers` threads, each
+    using its own pooled connection, so `workers` should not exceed the
+    engine's pool size (pool_size + max_overflow)
+    :param engine: SQLAlchemy engine
+    :param schema: the schema to reflect (defaults to the default schema)
+    :param workers: maximum number of concurrent catalog connections
+    :param metadata: MetaData to reflect into (a new one is created if None).
+        Tables already present in it are left untouched
+    :param only: optional list of table names to reflect
+    :param views: whether to reflect views as well
+    :returns: the MetaData
+    """
+    engine = getattr(engine, 'engine', engine)  # connections share the engine's pool
+    if metadata is None:
+        metadata = MetaData()
+
+    insp = inspect(engine)
+    table_names = insp.get_table_names(schema)
+    if views:
+        table_names = table_names + insp.get_view_names(schema)
+    if only is not None:
+        only = set(only)
+        table_names = [name for name in table_names if name in only]
+
+    def key(name):
+        return name if schema is None else '{}.{}'.format(schema, name)
+
+    table_names = [name for name in table_names if key(name) not in metadata.tables]
+    if not table_names:
+        return metadata
+
+    for table_name in table_names:  # the first call loads the whole schema
+        insp.get_columns(table_name, schema)
+
+    workers = max(1, min(int(workers), len(table_names)))
+    chunks = [table_names[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_reflect_keys, engine, chunk, schema) for chunk in chunks]
+        for future in futures:
+            insp.info_cache.update(future.result())  # re-raises worker errors
+
+    # every lookup below is answered from the merged info cache
+    tables = []
+    for table_name in table_names:
+        table = Table(table_name, metadata, schema=schema)
+        reflect_table = getattr(insp, 'reflect_table', None) or insp.reflecttable  # renamed in 1.4
+        reflect_table(table, None, resolve_fks=False)
+        tables.append(table)
+
+    # autoload foreign key targets that weren't part of the reflected set
+    for table in tables:
+        for fk in table.foreign_keys:
+            referred_key = fk.target_fullname.rsplit('.', 1)[0]  # [schema.]table
+            if referred_key not in metadata.tables:
+                referred_schema, _, referred_table = referred_key.rpartition('.')
+                Table(referred_table, metadata, schema=referred_schema or BLANK_SCHEMA,
+                      autoload_with=engine)
+
+    if engine.dialect.reflection_snapshot is not None:
+        engine.dialect.reflection_snapshot.flush()
+    return metadata
@@ -1,7 +1,8 @@
 from sqlalchemy.connectors.pyodbc import PyODBCConnector, util
 from pyodbc import connect as odbc_connect
 from platform import system
-from .base import _SelectLastRowIDMixin, SpliceMachineExecutionContext, SpliceMachineDialect
+from sqlalchemy import types as sa_types
+from .base import _SelectLastRowIDMixin, SpliceMachineExecutionContext, SpliceMachineDialect, LONGVARCHAR
 import os
 import re
 
@@ -79,12 +80,16 @@ class SpliceMachineDialect_pyodbc(PyODBCConnector, SpliceMachineDialect):
     """
     ODBC dialect for Splice Machine SQLAlchemy Driver
     """
+    supports_statement_cache = True
     supports_unicode_statements = True
     supports_char_length = True
     supports_native_decimal = False
 
     execution_ctx_cls = SpliceMachineExecutionContext_pyodbc
 
+    # types bound as LOBs, which can't be array-bound with fast_executemany
+    _lob_types = (sa_types.Text, sa_types.LargeBinary, LONGVARCHAR)
+
     # check for overridden ODBC driver name
 
     if os.environ.get('SPLICE_ODBC_DRIVER_NAME'):
@@ -92,6 +97,101 @@ class SpliceMachineDialect_pyodbc(PyODBCConnector, SpliceMachineDialect):
     else:
         pyodbc_driver_name = "SpliceODBCDriver"
 
+    def __init__(self, fast_executemany=False, **kw):
+        """
+        :param fast_executemany: if True, executemany() sends all of
+            the parameter sets in one array-bound call (pyodbc's
+            fast_executemany), with input sizes taken from the compiled
+            statement's bind types. Statements binding LOB types
+            (CLOB, BLOB, LONG VARCHAR) are executed row by row
+        """
+        super(SpliceMachineDialect_pyodbc, self).__init__(**kw)
+        self.fast_executemany = fast_executemany
+
+    def _input_size(self, type_):
+        """
+        Get the ODBC input size for a bind type
+        :param type_: SQLAlchemy type of the bind parameter
+        :returns: (sql type, column size, decimal digits) tuple, None to
+            let the driver decide, or False if the type can't be array-bound
+        """
+        if isinstance(type_, sa_types.TypeDecorator):
+            type_ = type_.impl
+        if isinstance(type_, self._lob_types):
+            return False
+        if isinstance(type_, sa_types.String):  # bound as UTF-8, which takes up to 4 bytes a character
+            return (self.dbapi.SQL_VARCHAR, type_.length * 4, 0) if type_.length else None
+        if isinstance(type_, sa_types.Numeric) and not isinstance(type_, sa_types.Float):
+            if type_.precision is None:
+                return None
+            return self.dbapi.SQL_DECIMAL, type_.precision, type_.scale or 0
+        if isinstance(type_, sa_types.Float):
+            return self.dbapi.SQL_DOUBLE, 0, 0
+        if isinstance(type_, sa_types.BigInteger):
+            return self.dbapi.SQL_BIGINT, 0, 0
+        if isinstance(type_, sa_types.SmallInteger):
+            return self.dbapi.SQL_SMALLINT, 0, 0
+        if isinstance(type_, sa_types.Integer):
+            return self.dbapi.SQL_INTEGER, 0, 0
+        if isinstance(type_, sa_types.Boolean):  # bound as 0/1
+            return self.dbapi.SQL_SMALLINT, 0, 0
+        if isinstance(type_, sa_types.DateTime):  # with microseconds, which 0 digits would drop
+            return self.dbapi.SQL_TYPE_TIMESTAMP, 26, 6
+        if isinstance(type_, sa_types.Time):
+            return self.dbapi.SQL_TYPE_TIME, 0, 0
+        return None  # e.g. Date, which is bound as a string
+
+    def _get_input_sizes(self, context):
+        """
+        Get the input sizes for every positional bind
+        of a compiled statement
+        :param context: the execution context
+        :returns: list of input sizes, or None if some
+            bind can't be array-bound
+        """
+        compiled = context.compiled if context is not None else None
+        if compiled is None or not compiled.positiontup:
+            return None
+
+        sizes = []
+        for name in compiled.positiontup:
+            size = self._input_size(compiled.binds[name].type)
+            if size is False:
+                return None
+            sizes.append(size)
+        return sizes
+
+    def _executemany(self, cursor, statement, parameters, context, rows_per_set=1):
+        """
+        Hand an executemany() to pyodbc, in a single
+        array-bound call when fast_executemany is enabled
+        :param cursor: ODBC cursor object (pyODBC)
+        :param statement: SQL Statement to execute
+        :param parameters: list of parameter sets
+        :param context: additional info for query resolving
+        :param rows_per_set: number of rows each parameter set
+            inserts (for multi-row INSERT batches)
+        """
+        if self.fast_executemany:
+            sizes = self._get_input_sizes(context)
+            if sizes is not None and len(sizes) * rows_per_set == len(parameters[0]):
+                self._array_executemany(cursor, statement, parameters, sizes * rows_per_set)
+                return
+        cursor.executemany(statement, parameters)
+
+    def _array_executemany(self, cursor, statement, parameters, sizes):
+        """
+        Hand an executemany() to pyodbc in a single array-bound call
+        :param cursor: ODBC cursor object (pyODBC)
+        :param statement: SQL Statement to execute
+        :param parameters: list of parameter sets
+        :param sizes: the input size of every parameter of a set
+            (see _input_size)
+        """
+        cursor.fast_executemany = True
+        cursor.setinputsizes(sizes)
+        cursor.executemany(statement, parameters)
+
     def create_connect_args(self, url):
         opts = url.translate_connect_args(username="user")
         opts.update(url.query)
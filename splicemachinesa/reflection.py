@@ -1,7 +1,13 @@
+import threading
+import time
+import weakref
+
 from sqlalchemy import types as sa_types
 from sqlalchemy import util
 from sqlalchemy import MetaData
 from sqlalchemy.engine import reflection
+from .cache import shared_cache
+from .snapshot import snapshot_cache
 
 """
 This file is part of Splice Machine.
@@ -76,6 +82,34 @@ class BaseReflector(object):
         """
         return self.dialect.default_schema_name
 
+    def _execute_catalog(self, connection, query, params=()):
+        """
+        Execute a catalog query with bound parameters and fetch its rows.
+        Catalog queries are fixed statements, so one DBAPI cursor is kept
+        per statement on the pooled connection-- the driver prepares each
+        statement once per connection and reuses the plan afterwards
+        :param connection: SQLAlchemy connection (or engine)
+        :param query: the SQL statement, with ? placeholders
+        :param params: values for the placeholders
+        :returns: list of rows
+        """
+        if not hasattr(connection, 'connection'):  # engine
+            with connection.connect() as conn:
+                return self._execute_catalog(conn, query, params)
+
+        dbapi_connection = connection.connection
+        # the pool clears info when the DBAPI connection is replaced
+        cursors = dbapi_connection.info.setdefault('splice_catalog_cursors', {})
+        cursor = cursors.get(query)
+        if cursor is None:
+            cursor = cursors[query] = dbapi_connection.cursor()
+        try:
+            connection._cursor_execute(cursor, query, tuple(params))
+            return cursor.fetchall()
+        except Exception:
+            cursors.pop(query, None)  # cursor is closed when execution fails
+            raise
+
 
 class SMReflector(BaseReflector):
     ischema = MetaData()
@@ -87,27 +121,56 @@ class SMReflector(BaseReflector):
     SYS_TABLE = 'SYS.SYSTABLES'
     SYS_VIEWS = 'SYS.SYSVIEWS'
     SYS_SEQUENCES = 'SYS.SYSSEQUENCES'
+    SYS_CONGLOMERATES = 'SYS.SYSCONGLOMERATES'
+    SYS_COLUMNS = 'SYS.SYSCOLUMNS'
+
+    def __init__(self, dialect):
+        """
+        :param dialect: current SQL Dialect (splice sql)
+        """
+        super(SMReflector, self).__init__(dialect)
+        self._schema_ids = None  # schema name -> schema id, shared by the engine's pool
+        self._missing_schemas = {}  # schema name -> time until which it's known not to exist
+        self._schema_ids_lock = threading.Lock()
+        self._probes = weakref.WeakKeyDictionary()  # connection -> {(kind, schema): (expiry, names)}
+        self._probes_lock = threading.Lock()
+
+    def invalidate_schema_ids(self):
+        """
+        Discard the schema name -> id map (e.g. after
+        a schema is created or dropped)
+        """
+        with self._schema_ids_lock:
+            self._schema_ids = None
+            self._missing_schemas = {}
 
     def get_schema_id(self, schemaName, connection):
         """
         Returns the schema id associated with a specified
-        schema from Splice Machine DB
+        schema from Splice Machine DB. The ids for every schema
+        are loaded with a single query and kept for the lifetime
+        of the engine; the map is reloaded when a schema
+        isn't found in it. Schemas still missing after the reload
+        are remembered as missing for existence_probe_ttl seconds
+        (not at all without it), or until the map is invalidated
         :param schemaName: the name of the schema to get the id for
         :param connection: ODBC connection to database
         :returns: schema id if schema exists, else none
         """
-        # TODO @amrit: turn this into SQL (saves time)
-        query = """
-        SELECT SCHEMAID FROM
-        {systable} WHERE
-        SCHEMANAME = '{schema}'
-        """.format(systable=self.SYS_SCHEMA, schema=self.capitalize(schemaName))
-        # SQL Query
-        out = connection.execute(query).first()
-        if out:
-            return out[0]  # exists
-        else:
-            return None  # doesn't exist
+        schemaName = self.capitalize(schemaName)
+        with self._schema_ids_lock:
+            now = time.monotonic()
+            if self._schema_ids is None or (schemaName not in self._schema_ids and
+                                            self._missing_schemas.get(schemaName, now) <= now):
+                query = """
+                SELECT SCHEMANAME, SCHEMAID FROM {systable}
+                """.format(systable=self.SYS_SCHEMA)
+                self._schema_ids = {r[0]: r[1] for r in self._execute_catalog(connection, query)}
+                self._missing_schemas = {name: expiry for name, expiry in self._missing_schemas.items()
+                                         if expiry > now and name not in self._schema_ids}
+                if schemaName not in self._schema_ids:
+                    self._missing_schemas[schemaName] = now + (self.dialect.existence_probe_ttl or 0)
+            return self._schema_ids.get(schemaName)  # None if doesn't exist
 
     def get_schema_id_or_default(self, schemaName, connection):
         """
@@ -124,6 +187,71 @@ class SMReflector(BaseReflector):
             schema = self.default_schema_name  # == null
         return self.get_schema_id(schema, connection)  # get schema id
 
+    def get_existing_tables(self, connection, schema):
+        """
+        Get the names of every table (or view) under a schema
+        with a single query
+        :param connection: ODBC cnxn
+        :param schema: the (uppercase) schema
+        :returns: set of existing (uppercase) table names
+        """
+        query = """
+        SELECT TABLENAME FROM 
+        {systable} WHERE
+        SCHEMANAME = ?
+        """.format(systable=self.SYS_TABLEVIEW)
+
+        return {r[0] for r in self._execute_catalog(connection, query, (schema,))}
+
+    def get_existing_sequences(self, connection, schema):
+        """
+        Get the names of every sequence under a schema
+        with a single query
+        :param connection: ODBC cnxn
+        :param schema: the (uppercase) schema
+        :returns: set of existing (uppercase) sequence names
+        """
+        query = """
+        SELECT SEQUENCENAME FROM 
+        {systable} WHERE SCHEMAID = ?
+        """.format(systable=self.SYS_SEQUENCES)
+
+        schema_id = self.get_schema_id(schema, connection)
+        return {r[0] for r in self._execute_catalog(connection, query, (schema_id,))}
+
+    def _probe(self, connection, kind, schema):
+        """
+        Get the names of every table or sequence under a schema, reusing
+        the result for the same SQLAlchemy connection for
+        existence_probe_ttl seconds. MetaData.create_all/drop_all(checkfirst=True)
+        call has_table (and has_sequence) for every table before emitting
+        any DDL, so this turns those probes into one query per schema.
+        Probes are discarded when the connection executes DDL, but not
+        when another connection does
+        :param connection: SQLAlchemy connection
+        :param kind: 'tables' or 'sequences'
+        :param schema: the (uppercase) schema
+        :returns: set of existing (uppercase) names
+        """
+        ttl = self.dialect.existence_probe_ttl
+        with self._probes_lock:
+            probes = self._probes.setdefault(connection, {})
+            expiry, names = probes.get((kind, schema), (0, None))
+        if expiry < time.monotonic():
+            lookup = self.get_existing_tables if kind == 'tables' else self.get_existing_sequences
+            names = lookup(connection, schema)
+            with self._probes_lock:
+                probes[(kind, schema)] = (time.monotonic() + ttl, names)
+        return names
+
+    def invalidate_probes(self, connection):
+        """
+        Discard the table/sequence existence probes for a connection
+        :param connection: SQLAlchemy connection
+        """
+        with self._probes_lock:
+            self._probes.pop(connection, None)
+
     def has_table(self, connection, table_name, schema=None):
         """
         Return if table exists in DB
@@ -136,19 +264,16 @@ class SMReflector(BaseReflector):
         current_schema = self.capitalize(
             schema or self.default_schema_name)  # get uppercase for tables
         table_name = self.capitalize(table_name)
+        if self.dialect.existence_probe_ttl:
+            return table_name in self._probe(connection, 'tables', current_schema)
 
         query = """
         SELECT TABLENAME FROM 
         {systable} WHERE
-        SCHEMANAME = '{schema}' AND
-        TABLENAME = '{table}'
-        """.format(systable=self.SYS_TABLEVIEW, schema=current_schema,
-                   table=table_name)
-        c = connection.execute(query)
-        # execute sql over odbc
-        out = c.first() is not None
-
-        return out
+        SCHEMANAME = ? AND
+        TABLENAME = ?
+        """.format(systable=self.SYS_TABLEVIEW)
+        return bool(self._execute_catalog(connection, query, (current_schema, table_name)))
 
     def has_sequence(self, connection, sequence_name, schema=None):
         """
@@ -158,19 +283,18 @@ class SMReflector(BaseReflector):
         :param schema: the schema of the sequence
         :returns: wehter or not schema exists
         """
-        schema_id = self.get_schema_id_or_default(schema, connection)
-        # get schema id for the sequence
+        current_schema = self.capitalize(schema or self.default_schema_name)
         sequence_name = self.capitalize(sequence_name)
+        if self.dialect.existence_probe_ttl:
+            return sequence_name in self._probe(connection, 'sequences', current_schema)
 
         query = """
         SELECT SEQUENCENAME FROM 
-        {systable} WHERE SEQUENCESSCHEMAID='{schemaid}'
-        AND SEQUENCENAME='{sequencename}'
-        """.format(schemaid=schema_id, sequencename=sequence_name,
-                   systable=self.SYS_SEQUENCES)
-
-        c = connection.execute(query)
-        return c.first() is not None
+        {systable} WHERE SCHEMAID = ?
+        AND SEQUENCENAME = ?
+        """.format(systable=self.SYS_SEQUENCES)
+        schema_id = self.get_schema_id(current_schema, connection)
+        return bool(self._execute_catalog(connection, query, (schema_id, sequence_name)))
 
     def get_schema_names(self, connection, **kw):
         """
@@ -183,7 +307,7 @@ class SMReflector(BaseReflector):
         ORDER BY SCHEMANAME
         """.format(systable=self.capitalize(self.SYS_SCHEMA))
 
-        out = [r[0].lower() for r in connection.execute(query)]
+        out = [r[0].lower() for r in self._execute_catalog(connection, query)]
         return out
 
     @reflection.cache
@@ -205,10 +329,10 @@ class SMReflector(BaseReflector):
         query = """
         SELECT TABLENAME FROM {systable}
         WHERE (TABLETYPE='T' OR TABLETYPE='E') AND 
-        SCHEMAID='{schemaid}'
-        """.format(systable=self.capitalize(self.SYS_TABLE), schemaid=schema_id)
+        SCHEMAID = ?
+        """.format(systable=self.capitalize(self.SYS_TABLE))
 
-        tables = [r[0] for r in connection.execute(query)]
+        tables = [r[0] for r in self._execute_catalog(connection, query, (schema_id,))]
         return [table.lower() for table in tables] if lowercase else tables
 
     def get_table_name(self, connection, tableid):
@@ -220,15 +344,16 @@ class SMReflector(BaseReflector):
         """
         query = """
         SELECT TABLENAME FROM {systable}
-        WHERE TABLEID='{tableid}'
-        """.format(systable=self.capitalize(self.SYS_TABLE), tableid=tableid)
+        WHERE TABLEID = ?
+        """.format(systable=self.capitalize(self.SYS_TABLE))
 
-        result = connection.execute(query).first().upper()  # execute SQL
+        result = self._execute_catalog(connection, query, (tableid,))  # execute SQL
 
         if result:
-            return result[0]
+            return result[0][0].upper()
         return None
 
+    @shared_cache
     def get_table_id(self, connection, tablename, schemaid=None, only_views=False):
         """
         Get ID of table given its name
@@ -238,18 +363,19 @@ class SMReflector(BaseReflector):
         """
         query = """
         SELECT TABLEID FROM 
-        {sys_table} WHERE TABLENAME='{table}'
-        """.format(sys_table=self.SYS_TABLEVIEW,
-                   table=self.capitalize(tablename))
+        {sys_table} WHERE TABLENAME = ?
+        """.format(sys_table=self.SYS_TABLEVIEW)
+        params = [self.capitalize(tablename)]
         if schemaid:
-            query += "AND SCHEMAID='{schemaid}'\n".format(schemaid=schemaid)
+            query += "AND SCHEMAID = ?\n"
+            params.append(schemaid)
         if only_views:
             query += "AND TABLETYPE='V'"
 
         # select to get table id
-        result = connection.execute(query).first()  # execute SQL
+        result = self._execute_catalog(connection, query, params)  # execute SQL
         if result:
-            return result[0]
+            return result[0][0]
         return None
 
     @reflection.cache
@@ -266,11 +392,11 @@ class SMReflector(BaseReflector):
         query = """
         SELECT TABLENAME FROM 
         {systable} WHERE
-        SCHEMANAME = '{schema}'
+        SCHEMANAME = ?
         AND  TABLETYPE = 'V'
-        """.format(systable=self.SYS_TABLEVIEW, schema=current_schema)
+        """.format(systable=self.SYS_TABLEVIEW)
 
-        tables = [r[0] for r in connection.execute(query)]
+        tables = [r[0] for r in self._execute_catalog(connection, query, (current_schema,))]
         return [table.lower() for table in tables] if lowercase else tables
 
     @reflection.cache
@@ -282,81 +408,160 @@ class SMReflector(BaseReflector):
         :param schema: the name of the schema for view retrieval
         :returns: definition of the view
         """
-        schemaid = self.get_schema_id_or_default(schema, connection)
-        # get schema id
+        current_schema = self.capitalize(schema or self.default_schema_name)
         viewname = self.capitalize(viewname)
-        tableid = self.get_table_id(connection, viewname, schemaid=schemaid, only_views=True)
 
         query = """
-        SELECT VIEWDEFINITION FROM 
-        {systable} WHERE TABLEID='{tableid}'
-        """.format(systable=self.SYS_VIEWS,
-                   tableid=tableid)
+        SELECT V.VIEWDEFINITION FROM
+        {sysviews} V JOIN {systable} T ON V.TABLEID = T.TABLEID
+        JOIN {sysschema} S ON T.SCHEMAID = S.SCHEMAID
+        WHERE S.SCHEMANAME = ? AND T.TABLENAME = ?
+        """.format(sysviews=self.SYS_VIEWS, systable=self.SYS_TABLE,
+                   sysschema=self.SYS_SCHEMA)
 
         # get view definition
-        return connection.execute(query).scalar()
+        result = self._execute_catalog(connection, query, (current_schema, viewname))
+        return result[0][0] if result else None
+
+    @reflection.cache
+    def get_catalog_fingerprints(self, connection, schema=None, **kw):
+        """
+        Get a cheap fingerprint for every table under a schema, used
+        to tell whether a stored reflection snapshot is still valid.
+        Table ids change when a table is recreated, conglomerates
+        when it is altered or indexed and the column count when
+        columns are added or dropped
+        :param connection: ODBC cnxn
+        :param schema: the schema to fingerprint
+        :returns: dict of (uppercase) table name -> fingerprint tuple
+        """
+        current_schema = self.capitalize(schema or self.default_schema_name)
 
-    def get_columns_from_db(self, connection, schema, table, col_indices=[]):
+        query = """
+        SELECT T.TABLENAME, T.TABLEID, C.MAXCONGLOMERATE, C.NUMCONGLOMERATES, L.NUMCOLUMNS
+        FROM {systable} T
+        JOIN {sysschema} S ON T.SCHEMAID = S.SCHEMAID
+        LEFT OUTER JOIN (
+            SELECT TABLEID, MAX(CONGLOMERATENUMBER) AS MAXCONGLOMERATE, COUNT(*) AS NUMCONGLOMERATES
+            FROM {sysconglomerates} GROUP BY TABLEID
+        ) C ON T.TABLEID = C.TABLEID
+        LEFT OUTER JOIN (
+            SELECT REFERENCEID, COUNT(*) AS NUMCOLUMNS
+            FROM {syscolumns} GROUP BY REFERENCEID
+        ) L ON T.TABLEID = L.REFERENCEID
+        WHERE S.SCHEMANAME = ?
+        """.format(systable=self.SYS_TABLE, sysschema=self.SYS_SCHEMA,
+                   sysconglomerates=self.SYS_CONGLOMERATES, syscolumns=self.SYS_COLUMNS)
+
+        return {r[0]: tuple(r[1:]) for r in self._execute_catalog(connection, query, (current_schema,))}
+
+    def get_columns_from_db(self, connection, schema, table=None, col_indices=[]):
         """
         Utility func to call stored procedure to get columns list 
         :param connection: ODBC cnxn
         :param schema: table schema for cols
-        :param table: table which has the columns to extract
+        :param table: table which has the columns to extract. If None,
+            the columns of every table under the schema are returned
         :param col_indices: the indexes of the response 
             to extract, serially
         """
-        query = "CALL SYSIBM.SQLCOLUMNS(null, '{schema}','{table}', null, 'DATATYPE'='ODBC')".format(
-            schema=schema, table=table
-        )
+        query = "CALL SYSIBM.SQLCOLUMNS(null, ?, ?, null, 'DATATYPE'='ODBC')"
         results = []
-        for res in connection.execute(query):  # get all value @ indices in col_indices order
+        for res in self._execute_catalog(connection, query, (schema, table)):
+            # get all value @ indices in col_indices order
             results.append([res[ci] for ci in col_indices])
 
         return results
 
+    def _parse_column(self, r):
+        """
+        Convert a row from SYSIBM.SQLCOLUMNS into a SQLAlchemy column dict
+        :param r: the row values (name, type, default, nullable, precision,
+            scale, autoincrement)
+        :returns: column dict
+        """
+        coltype = self.capitalize(r[1])  # extract column type
+        if coltype in ['DECIMAL', 'NUMERIC']:
+            coltype = self.ischema_names.get(coltype)(int(r[4]), int(r[5]))  # extract
+            # full name of two argument types e.g. DECIMAL(3,1)
+        elif coltype in ['CHARACTER', 'CHAR', 'VARCHAR']:
+            coltype = self.ischema_names.get(coltype)(int(r[4]))
+            # one var types: e.g. VARCHAR(100)
+        else:
+            try:
+                coltype = self.ischema_names[coltype]
+            except KeyError:
+                util.warn("Did not recognize type '%s' of column '%s'" %
+                          (coltype, r[0]))
+                coltype = sa_types.NULLTYPE  # assign no type if not understood
+
+        return {
+            'name': r[0].lower(),
+            'type': coltype,
+            'nullable': r[3] == 'YES',
+            'default': r[2] or None,
+            'autoincrement': (r[6] == 'YES'),
+        }
+
+    @reflection.cache
+    @shared_cache
+    def get_schema_columns(self, connection, schema=None, **kw):
+        """
+        Get the columns of every table under a schema with a
+        single SYSIBM.SQLCOLUMNS call (null table pattern), rather
+        than one call per table
+        :param connection: ODBC cnxn
+        :param schema: the schema to reflect
+        :returns: dict of (uppercase) table name -> list of columns
+        """
+        current_schema = self.capitalize(schema or self.default_schema_name)
+
+        INDICES = [2, 3, 5, 12, 17, 6, 8, 22, 23]  # table name, followed by the
+        # same column indices used by get_columns
+        column_data = self.get_columns_from_db(connection, current_schema,
+                                               col_indices=INDICES)  # call SYSIBM.SQLCOLUMNS
+
+        tables = {}
+        for r in column_data:  # rows are ordered by table, then column position
+            tables.setdefault(r[0], []).append(self._parse_column(r[1:]))
+        return tables
+
+    def get_multi_columns(self, connection, schema=None, filter_names=None, **kw):
+        """
+        Get the columns for many tables at once (SQLAlchemy's
+        multi-table reflection hook), served from the bulk
+        schema-wide column lookup
+        :param connection: ODBC cnxn
+        :param schema: the schema for the tables
+        :param filter_names: optional list of table names to return.
+            If None, every table in the schema is returned
+        :returns: list of ((schema, table_name), columns) tuples
+        """
+        kw.pop('scope', None)  # tables and views are both returned by SQLCOLUMNS
+        kw.pop('kind', None)
+        tables = self.get_schema_columns(connection, schema=schema, **kw)
+
+        if filter_names is None:
+            names = list(tables)
+        else:
+            names = [self.capitalize(name) for name in filter_names]
+        return [((schema, name.lower()), tables[name]) for name in names if name in tables]
+
     @reflection.cache
+    @shared_cache
+    @snapshot_cache
     def get_columns(self, connection, table_name, schema=None, lowercase=True, **kw):
         """
-        Get all columns for a given table
+        Get all columns for a given table. Columns are read from
+        the schema-wide lookup, so reflecting many tables under the
+        same Inspector only calls SYSIBM.SQLCOLUMNS once per schema
         :param connection: ODBC cnxn
         :param table_name: the name of the table which has columns
         :param schema: the schema for the table
         :returns: list of columns from db with associated metadata
         """
-        current_schema = self.capitalize(schema or self.default_schema_name)
         table = self.capitalize(table_name)
-
-        INDICES = [3, 5, 12, 17, 6, 8, 22, 23]  # these are the indexes in our table
-        # which correspond to the ones in IBM DB2
-        # name, type, default, nullable, precision, scale, autoincrement 
-        column_data = self.get_columns_from_db(connection, current_schema, table,
-                                               col_indices=INDICES)  # call SYSIBM.SQLCOLUMNS
-
-        sa_columns = []
-        for r in column_data:
-            coltype = self.capitalize(r[1])  # extract column type
-            if coltype in ['DECIMAL', 'NUMERIC']:
-                coltype = self.ischema_names.get(coltype)(int(r[4]), int(r[5]))  # extract
-                # full name of two argument types e.g. DECIMAL(3,1)
-            elif coltype in ['CHARACTER', 'CHAR', 'VARCHAR']:
-                coltype = self.ischema_names.get(coltype)(int(r[4]))
-                # one var types: e.g. VARCHAR(100)
-            else:
-                try:
-                    coltype = self.ischema_names[coltype]
-                except KeyError:
-                    util.warn("Did not recognize type '%s' of column '%s'" %
-                              (coltype, r[0]))
-                    coltype = coltype = sa_types.NULLTYPE  # assign no type if not understood
-
-            sa_columns.append({  # add column data to array
-                'name': r[0].lower(),
-                'type': coltype,
-                'nullable': r[3] == 'YES',
-                'default': r[2] or None,
-                'autoincrement': (r[6] == 'YES'),
-            })
-        return sa_columns
+        return self.get_schema_columns(connection, schema=schema, **kw).get(table, [])
 
     def get_primary_keys_from_table(self, connection, schema, table):
         """
@@ -366,14 +571,14 @@ class SMReflector(BaseReflector):
         :param table: table which you want to find primary keys under
         :returns: primary key columns
         """
-        query = "CALL SYSIBM.SQLPRIMARYKEYS(null,'{schema}','{table}',null)".format(
-            schema=schema, table=table
-        )
+        query = "CALL SYSIBM.SQLPRIMARYKEYS(null, ?, ?, null)"
         # stored procedure to get primary keys
-        results = [i[3] for i in list(connection.execute(query))]  # get primary keys
+        results = [i[3] for i in self._execute_catalog(connection, query, (schema, table))]  # get primary keys
         return results
 
     @reflection.cache
+    @shared_cache
+    @snapshot_cache
     def get_primary_keys(self, connection, table_name, schema=None, **kw):
         """
         Get a list of primary keys from a table
@@ -387,7 +592,8 @@ class SMReflector(BaseReflector):
 
         primary_keys = self.get_primary_keys_from_table(connection, current_schema, table)
 
-        return primary_keys
+        # column names are reflected lower case (see get_schema_columns)
+        return [key.lower() for key in primary_keys]
 
     def get_foreign_keys_from_db(self, connection, schema, table, imported=True):
         """
@@ -400,13 +606,15 @@ class SMReflector(BaseReflector):
         :returns: list of foreing keys
         """
         if imported:
-            query = "CALL SYSIBM.SQLFOREIGNKEYS('',null,'','','{schema}','{table}','IMPORTEDKEY=1')"
+            query = "CALL SYSIBM.SQLFOREIGNKEYS('', null, '', '', ?, ?, 'IMPORTEDKEY=1')"
         else:
-            query = "CALL SYSIBM.SQLFOREIGNKEYS('','{schema}','{table}','',null,'','EXPORTEDKEY=1')"
-        out = list(connection.execute(query.format(schema=schema, table=table)))
+            query = "CALL SYSIBM.SQLFOREIGNKEYS('', ?, ?, '', null, '', 'EXPORTEDKEY=1')"
+        out = self._execute_catalog(connection, query, (schema, table))
         return out
 
     @reflection.cache
+    @shared_cache
+    @snapshot_cache
     def get_foreign_keys(self, connection, table_name, schema=None, **kw):
         """
         Get outgoing foreign keys from a table
@@ -432,13 +640,13 @@ class SMReflector(BaseReflector):
 
                 fschema[r[12]] = {
                     'name': r[12],
-                    'constrained_columns': [r[7]],
+                    'constrained_columns': [r[7].lower()],
                     'referred_schema': referred_schema,
-                    'referred_table': r[2],
-                    'referred_columns': [r[3]]}
+                    'referred_table': r[2].lower(),
+                    'referred_columns': [r[3].lower()]}
             else:
-                fschema[r[12]]['constrained_columns'].append(r[7])
-                fschema[r[12]]['referred_columns'].append(r[3])
+                fschema[r[12]]['constrained_columns'].append(r[7].lower())
+                fschema[r[12]]['referred_columns'].append(r[3].lower())
         return [value for key, value in fschema.items()]
 
     @reflection.cache
@@ -565,6 +773,8 @@ class SMReflector(BaseReflector):
 
 
     @reflection.cache
+    @shared_cache
+    @snapshot_cache
     def get_indexes(self, connection, table_name, schema=None, **kw):
         """
         Return information about indexes in `table_name`.
@@ -584,9 +794,9 @@ class SMReflector(BaseReflector):
         """
         current_schema = self.capitalize(schema or self.default_schema_name)
         table_name = self.capitalize(table_name)
-        query = "CALL SYSIBM.SQLSTATISTICS(null,'{current_schema}','{table_name}', 1, 1, null)"
-        res = connection.execute(query.format(current_schema=current_schema, table_name=table_name))
-        cols = res.keys()
-        indexes = [dict(zip(cols, i)) for i in res.fetchall()]
+        query = "CALL SYSIBM.SQLSTATISTICS(null, ?, ?, 1, 1, null)"
+        rows = self._execute_catalog(connection, query, (current_schema, table_name))
+        cols = [d[0].upper() for d in rows[0].cursor_description] if rows else []
+        indexes = [dict(zip(cols, i)) for i in rows]
         merged = self._merge_list_of_dicts(indexes)
         return merged
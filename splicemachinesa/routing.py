@@ -0,0 +1,201 @@
+import logging
+
+from sqlalchemy import exc
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList, ColumnClause
+from sqlalchemy.sql.selectable import Select
+from sqlalchemy.sql.util import find_tables
+
+from .cache import ReflectionCache
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Routing of SELECT statements to Splice Machine's OLTP (HBase)
+or OLAP (Spark) engine, through the useSpark property.
+
+Enabled per engine with
+create_engine(url, splice_engine='auto', olap_row_threshold=20000)
+or per execution with
+connection.execution_options(splice_engine='olap')
+
+Decisions made in 'auto' mode are logged to the
+splicemachinesa.routing logger at INFO level.
+"""
+
+log = logging.getLogger(__name__)
+
+ENGINES = ('auto', 'oltp', 'olap')
+
+TABLE_ROW_COUNT_QUERY = """
+SELECT MAX(TOTAL_ROW_COUNT) FROM SYS.SYSTABLESTATISTICS
+WHERE SCHEMANAME = ? AND TABLENAME = ?
+"""
+
+
+def point_lookup_tables(select):
+    """
+    Get the tables a select reads by primary key, i.e. every
+    primary key column is compared to a value in the WHERE clause
+    (e.g. WHERE id = ? AND ...)
+    :param select: the select query class
+    :returns: set of tables
+    """
+    whereclause = select._whereclause
+    if whereclause is None:
+        return set()
+    terms = whereclause.clauses if isinstance(whereclause, BooleanClauseList) and \
+        whereclause.operator is operators.and_ else [whereclause]
+
+    bound = set()
+    for term in terms:
+        if not isinstance(term, BinaryExpression) or term.operator is not operators.eq:
+            continue
+        for column, value in ((term.left, term.right), (term.right, term.left)):
+            if isinstance(column, ColumnClause) and isinstance(value, BindParameter):
+                bound.add(column)
+    return set(column.table for column in bound
+               if column.table is not None and len(column.table.primary_key) and
+               all(pk in bound for pk in column.table.primary_key))
+
+
+class EngineRouter(object):
+    """
+    Chooses the engine a SELECT runs on in 'auto' mode, from the
+    number of rows it is estimated to read: the row counts of its
+    tables in SYS.SYSTABLESTATISTICS, except tables read by
+    primary key, which count as one row. Row counts are cached
+    """
+
+    def __init__(self, dialect, row_threshold=20000, statistics_ttl=300):
+        """
+        :param dialect: the Splice Machine dialect
+        :param row_threshold: estimated rows read at which a
+            statement runs on OLAP
+        :param statistics_ttl: seconds a table's row count is reused for
+        """
+        self.dialect = dialect
+        self.row_threshold = row_threshold
+        self._row_counts = ReflectionCache(maxsize=1024, ttl=statistics_ttl)
+
+    def row_count(self, connection, table):
+        """
+        Get the number of rows of a table, from its statistics
+        :param connection: SQLAlchemy connection
+        :param table: the Table
+        :returns: the row count, or None if the table has no statistics
+        """
+        schema = self.dialect.denormalize_name(table.schema or self.dialect.default_schema_name)
+        table_name = self.dialect.denormalize_name(table.name)
+        found, count = self._row_counts.get((schema, table_name))
+        if not found:
+            rows = self.dialect._reflector._execute_catalog(connection, TABLE_ROW_COUNT_QUERY,
+                                                            (schema, table_name))
+            count = int(rows[0][0]) if rows and rows[0][0] is not None else None
+            self._row_counts.set((schema, table_name), count)
+        return count
+
+    def estimate_rows(self, connection, select):
+        """
+        Estimate the number of rows a select reads
+        :param connection: SQLAlchemy connection
+        :param select: the select query class
+        :returns: (estimated rows, dict of table name -> rows counted)
+        """
+        point_lookups = point_lookup_tables(select)
+        counted = {}
+        for table in find_tables(select):
+            if table in point_lookups:
+                counted[table.fullname] = 1
+            else:
+                counted[table.fullname] = self.row_count(connection, table)
+        return sum(count or 0 for count in counted.values()), counted
+
+    def choose(self, connection, select):
+        """
+        Choose the engine for a select, and log the decision
+        :param connection: SQLAlchemy connection
+        :param select: the select query class
+        :returns: 'olap' or 'oltp'
+        """
+        rows, counted = self.estimate_rows(connection, select)
+        engine = 'olap' if rows >= self.row_threshold else 'oltp'
+        log.info('splice_engine=auto chose %s: ~%d rows read (threshold %d) from %s', engine, rows,
+                 self.row_threshold, ', '.join('%s=%s' % (name, 'no statistics' if count is None else count)
+                                               for name, count in sorted(counted.items())))
+        return engine
+
+
+def final_froms(select):
+    """
+    Get the FROM clause elements of a select
+    :param select: the select query class
+    :returns: list of FROM clause elements
+    """
+    if hasattr(select, 'get_final_froms'):  # SQLAlchemy 1.4.23+, where froms is deprecated
+        return select.get_final_froms()
+    return select.froms
+
+
+def route_statement(conn, clauseelement, multiparams, params, execution_options=None):
+    """
+    before_execute listener (retval=True) of every Splice Machine
+    engine: a SELECT executed with a splice_engine (execution option,
+    or engine option) is replaced with a copy carrying the useSpark
+    property as a statement hint, which the compiler renders into the
+    property list of its first table. A splice_engine set on the
+    statement wins over the connection's. Statements that set useSpark
+    or useOLAP themselves, and SELECTs without a FROM clause (which
+    have no property list), are left alone
+    :param conn: SQLAlchemy connection
+    :param clauseelement: the statement being executed
+    :param multiparams: positional parameters of the execution
+    :param params: keyword parameters of the execution
+    :param execution_options: the execution options (SQLAlchemy 1.4+;
+        read from the connection on 1.3)
+    :returns: (statement, multiparams, params)
+    """
+    if not isinstance(clauseelement, Select) or not final_froms(clauseelement):
+        return clauseelement, multiparams, params
+    engine = clauseelement.get_execution_options().get('splice_engine')
+    if engine is None:
+        if execution_options is None:
+            execution_options = conn.get_execution_options()
+        engine = execution_options.get('splice_engine', conn.dialect.splice_engine)
+    if engine is None:
+        return clauseelement, multiparams, params
+    if engine not in ENGINES:
+        raise exc.ArgumentError(
+            "Invalid value '%s' for splice_engine. Valid engines are %s" % (engine, ", ".join(ENGINES)))
+
+    if any('useSpark' in hint or 'useOLAP' in hint for hint in
+           [hint for _, hint in clauseelement._statement_hints] + list(clauseelement._hints.values())):
+        return clauseelement, multiparams, params  # the statement chose its engine itself
+    if engine == 'auto':
+        engine = conn.dialect.engine_router.choose(conn, clauseelement)
+
+    # the same routed copy every time, so compiled caches keyed by statement still hit
+    routed = clauseelement.__dict__.setdefault('_splice_routed', {})
+    if engine not in routed:
+        routed[engine] = clauseelement.with_statement_hint('useSpark=' + ('true' if engine == 'olap' else 'false'))
+    return routed[engine], multiparams, params
@@ -0,0 +1,89 @@
+import threading
+from collections import deque
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Client-side sequence block allocation, so firing
+a Sequence default doesn't cost a round trip per row.
+
+Enabled per engine with
+create_engine(url, sequence_block_size=100)
+or per Sequence with
+Sequence('my_seq').info['splice_block_size'] = 100
+"""
+
+
+class SequenceAllocator(object):
+    """
+    Thread-safe allocator that fetches sequence values in blocks
+    and hands them out locally. Values are taken from the database
+    sequence, so they stay unique across processes; values left in
+    a block when the process exits are never used (gaps)
+    """
+
+    def __init__(self):
+        self._blocks = {}  # sequence name -> deque of unused values
+        self._locks = {}  # sequence name -> lock held while refilling its block
+        self._lock = threading.Lock()
+
+    def _sequence_lock(self, name):
+        """
+        Get the lock for one sequence, so sequences
+        are refilled independently of each other
+        :param name: the (formatted) sequence name
+        :returns: lock
+        """
+        with self._lock:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.Lock()
+                self._blocks[name] = deque()
+            return lock
+
+    def next_value(self, name, block_size, fetch):
+        """
+        Get the next value of a sequence, fetching a new
+        block from the database when the current one is used up
+        :param name: the (formatted) sequence name
+        :param block_size: number of values to fetch per round trip
+        :param fetch: function taking a count and returning that
+            many new values from the database
+        :returns: the next value
+        """
+        with self._sequence_lock(name):
+            block = self._blocks[name]
+            if not block:
+                block.extend(fetch(block_size))
+            return block.popleft()
+
+    def invalidate(self):
+        """
+        Discard every unused value (e.g. after a
+        sequence is dropped or recreated)
+        """
+        with self._lock:
+            names = list(self._locks)
+        for name in names:
+            with self._locks[name]:
+                self._blocks[name].clear()
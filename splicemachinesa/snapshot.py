@@ -0,0 +1,247 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from sqlalchemy import types as sa_types
+from sqlalchemy import util
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Persistent on-disk snapshot of reflection
+results, so that processes reflecting the same
+tables on startup don't repeat the catalog calls.
+
+Enabled per engine with
+create_engine(url, reflection_snapshot_dir='/path/to/dir')
+"""
+
+
+class ReflectionSnapshot(object):
+    """
+    Stores reflection results (columns, keys, indexes) in one
+    file per database URL + schema. Every table entry is tagged
+    with a catalog fingerprint (table id, conglomerate numbers and
+    column count) so only tables that changed are reflected again.
+
+    Changes that touch neither the table's conglomerates nor its
+    column count (e.g. changing a column's nullability) are not
+    detected -- call invalidate() after such DDL
+
+    Files are JSON, with column types stored by their catalog name
+    (see encode_type), so reading a snapshot never runs code from it
+    """
+
+    def __init__(self, directory, ischema_names):
+        """
+        :param directory: directory to write snapshot files to
+            (created, readable by the owner only, if it doesn't exist)
+        :param ischema_names: dict of catalog type name -> SQLAlchemy type
+            class, the types column types are stored as
+        """
+        self.directory = os.path.expanduser(directory)
+        self.ischema_names = ischema_names
+        self._type_names = {}  # type class -> catalog name
+        for name, type_ in ischema_names.items():
+            self._type_names.setdefault(type_, name)
+        self._states = {}  # (url key, schema) -> {table: entry}
+        self._dirty = set()  # keys of states not yet written
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def url_key(connection):
+        """
+        Get a file-system safe key for the database a connection points to
+        :param connection: SQLAlchemy connection
+        :returns: hex digest of the URL (password hidden)
+        """
+        return hashlib.sha1(repr(connection.engine.url).encode('utf-8')).hexdigest()[:16]
+
+    def _path(self, key):
+        """
+        Get the snapshot file path for a key
+        :param key: (url key, schema) tuple
+        :returns: file path
+        """
+        return os.path.join(self.directory, '{}_{}.json'.format(*key))
+
+    def encode_type(self, value):
+        """
+        Convert a column type (class or instance) to JSON
+        :param value: the object json couldn't serialize
+        :returns: {'__type__': catalog name, 'args': type arguments}
+        """
+        if value is sa_types.NULLTYPE:
+            return {'__type__': None, 'args': None}
+        type_ = value if isinstance(value, type) else type(value)
+        name = self._type_names.get(type_)
+        if name is None:
+            raise TypeError('Cannot store %r in a reflection snapshot' % (value,))
+        if value is type_:
+            args = None
+        elif isinstance(value, sa_types.Float):
+            args = [value.precision]
+        elif isinstance(value, sa_types.Numeric):
+            args = [value.precision, value.scale]
+        elif isinstance(value, sa_types.String):
+            args = [value.length]
+        else:
+            args = []
+        return {'__type__': name, 'args': args}
+
+    def decode_type(self, value):
+        """
+        Convert a JSON object back, if it is a column type (see encode_type)
+        :param value: the decoded JSON object
+        :returns: the column type, or the object itself
+        """
+        if '__type__' not in value:
+            return value
+        if value['__type__'] is None:
+            return sa_types.NULLTYPE
+        type_ = self.ischema_names[value['__type__']]
+        return type_ if value['args'] is None else type_(*value['args'])
+
+    def _state(self, key):
+        """
+        Get the in-memory state for a key, loading it
+        from disk the first time it is requested
+        :param key: (url key, schema) tuple
+        :returns: dict of table name -> entry
+        """
+        if key not in self._states:
+            state = {}
+            try:
+                with open(self._path(key)) as f:
+                    state = json.load(f, object_hook=self.decode_type)
+            except FileNotFoundError:
+                pass
+            except Exception as e:  # corrupt or incompatible snapshot, start over
+                util.warn('Ignoring unreadable reflection snapshot %s: %s' % (self._path(key), e))
+            self._states[key] = state
+        return self._states[key]
+
+    def get(self, key, table, kind, fingerprint):
+        """
+        Get a stored reflection result
+        :param key: (url key, schema) tuple
+        :param table: the (uppercase) table name
+        :param kind: the reflection method name (e.g. get_columns)
+        :param fingerprint: the current catalog fingerprint for the table
+        :returns: (found, value) tuple
+        """
+        with self._lock:
+            entry = self._state(key).get(table)
+            if entry is None or entry['fingerprint'] != list(fingerprint) or kind not in entry:
+                return False, None
+            return True, entry[kind]
+
+    def put(self, key, table, kind, fingerprint, value):
+        """
+        Store a reflection result. Entries stored under
+        an older fingerprint for the table are discarded
+        :param key: (url key, schema) tuple
+        :param table: the (uppercase) table name
+        :param kind: the reflection method name (e.g. get_columns)
+        :param fingerprint: the current catalog fingerprint for the table
+        :param value: the reflection result
+        """
+        with self._lock:
+            state = self._state(key)
+            entry = state.get(table)
+            if entry is None or entry['fingerprint'] != list(fingerprint):
+                entry = state[table] = {'fingerprint': list(fingerprint)}  # as read back from JSON
+            entry[kind] = value
+            self._dirty.add(key)
+
+    def invalidate(self):
+        """
+        Discard every stored snapshot, both in memory and on disk
+        """
+        with self._lock:
+            for key in list(self._states) + list(self._dirty):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._states.clear()
+            self._dirty.clear()
+
+    def flush(self):
+        """
+        Write modified snapshots to disk. Files are replaced
+        atomically so concurrent readers never see partial writes.
+        Called after reflecting tables, and when the process exits
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            for key in self._dirty:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')  # owner only
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(self._states[key], f, default=self.encode_type)
+                except TypeError as e:  # a reflection result of an unknown type
+                    os.remove(tmp_path)
+                    util.warn('Not writing reflection snapshot %s: %s' % (self._path(key), e))
+                    continue
+                os.replace(tmp_path, self._path(key))
+            self._dirty.clear()
+
+
+def snapshot_cache(fn):
+    """
+    Decorator for per-table reflection methods on SMReflector. When the
+    dialect has a reflection snapshot configured, results are served from
+    it as long as the table's catalog fingerprint hasn't changed
+    :param fn: reflection method taking (connection, table_name, schema)
+    :returns: wrapped method
+    """
+
+    def wrapped(self, connection, table_name, schema=None, **kw):
+        snapshot = self.dialect.reflection_snapshot
+        if snapshot is None:
+            return fn(self, connection, table_name, schema=schema, **kw)
+
+        current_schema = self.capitalize(schema or self.default_schema_name)
+        table = self.capitalize(table_name)
+        fingerprint = self.get_catalog_fingerprints(
+            connection, schema=schema, info_cache=kw.get('info_cache')).get(table)
+        if fingerprint is None:  # not a table we can fingerprint
+            return fn(self, connection, table_name, schema=schema, **kw)
+
+        key = (snapshot.url_key(connection), current_schema)
+        found, value = snapshot.get(key, table, fn.__name__, fingerprint)
+        if not found:
+            value = fn(self, connection, table_name, schema=schema, **kw)
+            snapshot.put(key, table, fn.__name__, fingerprint, value)
+        return value
+
+    wrapped.__name__ = fn.__name__
+    wrapped.__doc__ = fn.__doc__
+    return wrapped
@@ -71,6 +71,7 @@ class SpliceMachineExecutionContext_sm(SpliceMachineExecutionContext):
         """
         ff a single execute, check for outparams
         """
+        super(SpliceMachineExecutionContext_sm, self).pre_exec()
         if len(self.compiled_parameters) == 1:
             for bindparam in self.compiled.binds.values():
                 if bindparam.isoutparam:
@@ -99,11 +100,12 @@ class SpliceMachineExecutionContext_sm(SpliceMachineExecutionContext):
             if SA_Version < [0, 8]:
                 result = base.ResultProxy(self)
             else:
-                result = _result.ResultProxy(self)
+                result = super(SpliceMachineExecutionContext_sm, self).get_result_proxy()  # may be streamed
             return result
 
 
 class SpliceMachineDialect_sm(SpliceMachineDialect):
+    supports_statement_cache = True
     driver = 'splicemachinesa'
     supports_unicode_statements = False
     supports_unicode_binds = False
@@ -135,7 +137,7 @@ class SpliceMachineDialect_sm(SpliceMachineDialect):
             statement = statement.split('(', 1)[0].split()[1]
             context._callproc_result = cursor.callproc(statement, parameters)
         else:
-            cursor.execute(statement, parameters)
+            super(SpliceMachineDialect_sm, self).do_execute(cursor, statement, parameters, context)
 
     def _get_server_version_info(self, connection):
         """
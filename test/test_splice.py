@@ -0,0 +1,1398 @@
+import datetime
+import decimal
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, \
+    Numeric, Sequence, String, Table, Text, Unicode, bindparam, create_engine, delete, event, exc, func, inspect, literal, \
+    select, text
+from sqlalchemy.testing import fixtures, skip_if
+from sqlalchemy.testing.assertions import AssertsCompiledSQL, assert_raises, eq_, expect_warnings
+
+from splicemachinesa import base, bulk, columnar, dataframe, lazy, pagination, parallel, pyodbc, routing, snapshot
+from splicemachinesa.dml import insert
+from splicemachinesa.sequence import SequenceAllocator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'benchmarks'))
+import standin  # the benchmarks' offline stand-in for pyodbc
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+"""
+This file is part of Splice Machine.
+Splice Machine is free software: you can redistribute it and/or modify it under the terms of the
+GNU Affero General Public License as published by the Free Software Foundation, either
+version 3, or (at your option) any later version.
+Splice Machine is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU Affero General Public License for more details.
+You should have received a copy of the GNU Affero General Public License along with Splice Machine.
+If not, see <http://www.gnu.org/licenses/>.
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+All such Splice Machine modifications are Copyright 2012 - 2020 Splice Machine, Inc.,
+and are licensed to you under the GNU Affero General Public License.
+"""
+
+
+
+"""
+Splice Machine specific test cases
+that run without a database
+"""
+
+
+def sqlalchemy_14():
+    return base._cursor is not None
+
+
+def _compile(statement):
+    # assert_compile drops newlines, which end every --splice-properties list
+    return str(statement.compile(dialect=base.dialect()))
+
+
+class StandinTest(fixtures.TestBase):
+    """
+    Executes statements against the stand-in DBAPI (benchmarks/standin.py),
+    without its simulated costs. Queries are answered by respond()
+    """
+    URL = 'splicemachinesa://u:p@localhost:1527/splicedb'
+
+    def setup(self):
+        self._costs = standin.ROUND_TRIP, standin.PREPARE, standin.ROW
+        standin.ROUND_TRIP = standin.PREPARE = standin.ROW = 0
+        standin.responder = self.respond
+        self.executed = []  # (statement, parameters, executemany) sent through the engine
+        self._engines = []
+
+    def teardown(self):
+        standin.ROUND_TRIP, standin.PREPARE, standin.ROW = self._costs
+        standin.responder = standin.default_responder
+        for engine in self._engines:
+            engine.dispose()
+
+    def engine(self, **kw):
+        engine = create_engine(self.URL, module=standin, **kw)
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, many:
+                     self.executed.append((statement, parameters, many)))
+        self._engines.append(engine)
+        return engine
+
+    def respond(self, statement, parameters):
+        return standin.default_responder(statement, parameters)
+
+
+class ReflectionSnapshotTest(fixtures.TestBase):
+    KEY = ('0123456789abcdef', 'SPLICE')
+    FINGERPRINT = ('t-1', 1601, 2, 3)
+
+    def setup(self):
+        self.parent = tempfile.mkdtemp()
+        self.directory = os.path.join(self.parent, 'snapshots')
+
+    def teardown(self):
+        shutil.rmtree(self.parent)
+
+    def _snapshot(self):
+        return snapshot.ReflectionSnapshot(self.directory, base.ischema_names)
+
+    def test_round_trip(self):
+        from sqlalchemy.types import DECIMAL, FLOAT, INTEGER, NULLTYPE, VARCHAR
+        columns = [{'name': 'id', 'type': INTEGER, 'nullable': False, 'default': None, 'autoincrement': True},
+                   {'name': 'amount', 'type': DECIMAL(10, 2), 'nullable': True, 'default': '0', 'autoincrement': False},
+                   {'name': 'name', 'type': VARCHAR(20), 'nullable': True, 'default': None, 'autoincrement': False},
+                   {'name': 'ratio', 'type': FLOAT, 'nullable': True, 'default': None, 'autoincrement': False},
+                   {'name': 'other', 'type': NULLTYPE, 'nullable': True, 'default': None, 'autoincrement': False}]
+        stored = self._snapshot()
+        stored.put(self.KEY, 'T', 'get_columns', self.FINGERPRINT, columns)
+        stored.put(self.KEY, 'T', 'get_primary_keys', self.FINGERPRINT, ['ID'])
+        stored.flush()
+
+        eq_(stat.S_IMODE(os.stat(self.directory).st_mode), 0o700)
+        loaded = self._snapshot()
+        found, value = loaded.get(self.KEY, 'T', 'get_columns', self.FINGERPRINT)
+        eq_((found, repr(value)), (True, repr(columns)))
+        eq_(loaded.get(self.KEY, 'T', 'get_primary_keys', self.FINGERPRINT), (True, ['ID']))
+        eq_(loaded.get(self.KEY, 'T', 'get_columns', ('t-1', 1601, 2, 4)), (False, None))
+
+    def test_unreadable(self):
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, '{}_{}.json'.format(*self.KEY)), 'w') as f:
+            f.write('not json')
+        with expect_warnings('Ignoring unreadable reflection snapshot'):
+            eq_(self._snapshot().get(self.KEY, 'T', 'get_columns', self.FINGERPRINT), (False, None))
+
+
+class BulkStagingTest(fixtures.TestBase):
+    def _write(self, rows, types=None):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            staged = bulk.write_staging_file(rows, path, types=types)
+            with open(path) as f:
+                return staged, f.read()
+        finally:
+            os.remove(path)
+
+    def test_write_staging_file(self):
+        staged, content = self._write([
+            (1, 'a,"b"', datetime.datetime(2020, 1, 2, 3, 4, 5, 6), datetime.date(2020, 1, 2), True),
+            (2, '', None, None, None),
+        ])
+        eq_(staged.rows, 2)
+        eq_(staged.one_line_records, True)
+        eq_(content, '1,"a,""b""","2020-01-02 03:04:05.000006","2020-01-02",true\n'
+                     '2,"",,,\n')
+
+    def test_column_types(self):
+        _, content = self._write([(True, True, False, True)], types=[Boolean(), Integer(), Boolean(), String()])
+        eq_(content, '1,1,0,true\n')
+
+    def test_multiline_records(self):
+        staged, _ = self._write([(1, 'two\nlines')])
+        eq_(staged.one_line_records, False)
+
+    def test_rows_and_columns(self):
+        columns, rows = bulk.rows_and_columns([{'a': 1, 'b': 2}, {'b': 3}])
+        eq_(columns, ['a', 'b'])
+        eq_(list(rows), [(1, 2), (None, 3)])
+
+    def test_import_statement(self):
+        table = Table('t', MetaData(), Column('id', Integer), Column('name', String(10)),
+                      Column('created', DateTime), Column('day', Date))
+        formats = bulk.import_formats(table, ['id', 'created'])
+        eq_(formats, {'timestamp_format': bulk.TIMESTAMP_FORMAT, 'date_format': None, 'time_format': None})
+
+        statement = bulk.import_statement('SYSCS_UTIL.IMPORT_DATA', 'SPLICE', 'T', ['ID', 'CREATED'],
+                                          '/staging/t.csv', bad_records_allowed=5, **formats)
+        eq_(str(statement), 'CALL SYSCS_UTIL.IMPORT_DATA(:schema_name, :table_name, :insert_columns, '
+                            ':file_name, :column_delimiter, :character_delimiter, :timestamp_format, '
+                            ':date_format, :time_format, :bad_records_allowed, :bad_record_directory, '
+                            'true, :charset)')
+        params = statement.compile().params
+        eq_(params['insert_columns'], 'ID,CREATED')
+        eq_(params['bad_records_allowed'], 5)
+
+    def test_load_result(self):
+        result = bulk.load_result({'rowsImported': 10, 'failedRows': 2, 'files': 1, 'failedLog': '/bad'})
+        eq_(result, bulk.LoadResult(10, 2, 1, '/bad'))
+
+    def test_hfile_import_statement(self):
+        statement = bulk.import_statement('SYSCS_UTIL.BULK_IMPORT_HFILE', 'SPLICE', 'T', ['ID'], '/staging/t.csv',
+                                          bulk_import_dir='/tmp/hfiles', skip_sampling=True)
+        eq_(str(statement), 'CALL SYSCS_UTIL.BULK_IMPORT_HFILE(:schema_name, :table_name, :insert_columns, '
+                            ':file_name, :column_delimiter, :character_delimiter, :timestamp_format, '
+                            ':date_format, :time_format, :bad_records_allowed, :bad_record_directory, '
+                            'true, :charset, :bulk_import_directory, true)')
+        eq_(statement.compile().params['bulk_import_directory'], '/tmp/hfiles')
+
+    def test_split_statement(self):
+        statement = bulk.split_statement('SPLICE', 'T', None, ['ID'], '/staging/split.csv')
+        eq_(str(statement), 'CALL SYSCS_UTIL.SYSCS_SPLIT_TABLE_OR_INDEX(:schema_name, :table_name, '
+                            ':index_name, :split_columns, :file_name, :column_delimiter, :character_delimiter, '
+                            ':timestamp_format, :date_format, :time_format, :bad_records_allowed, '
+                            ':bad_record_directory, true, :charset)')
+        eq_(statement.compile().params['index_name'], None)
+
+    def test_reservoir_sample(self):
+        sample = bulk.ReservoirSample(10, seed=1)
+        for i in range(1000):
+            sample.add((i,))
+        eq_(sample.seen, 1000)
+        eq_(len(sample.rows), 10)
+        eq_(len(set(sample.rows)), 10)
+
+    def test_split_points(self):
+        keys = [(i,) for i in range(100)]
+        eq_(bulk.split_points(keys, 4), [(25,), (50,), (75,)])
+        eq_(bulk.split_points([(1,)] * 10, 4), [(1,)])
+        eq_(bulk.split_points([(None,), (2,), (1,), (None,)], 2), [(2,)])
+        eq_(bulk.split_points([], 4), [])
+
+    def test_split_targets(self):
+        metadata = MetaData()
+        table = Table('t', metadata, Column('id', Integer, primary_key=True), Column('name', String(10)),
+                      Column('day', Date))
+        Index('ix_name', table.c.name)
+        Index('ix_day', table.c.day)
+        eq_(bulk.split_targets(table, ['id', 'name']), [(None, ['id']), ('ix_name', ['name'])])
+        eq_(bulk.split_targets(table, ['name']), [('ix_name', ['name'])])
+
+
+class BulkLoadTest(StandinTest):
+    def setup(self):
+        super(BulkLoadTest, self).setup()
+        self.staging_dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.staging_dir)
+        super(BulkLoadTest, self).teardown()
+
+    def respond(self, statement, parameters):
+        if statement.startswith('CALL SYSCS_UTIL.IMPORT_DATA'):
+            return [('rowsImported', int, None, 10, 10, 0, True), ('failedRows', int, None, 10, 10, 0, True)], \
+                [(2, 0)]
+        return super(BulkLoadTest, self).respond(statement, parameters)
+
+    def test_load(self):
+        engine = self.engine()
+        transactions = []
+        event.listen(engine, 'begin', lambda conn: transactions.append('begin'))
+        event.listen(engine, 'commit', lambda conn: transactions.append('commit'))
+        table = Table('t', MetaData(), Column('id', Integer), Column('flag', Boolean))
+        result = bulk.load(engine, table, [(1, True), (2, False)], self.staging_dir, columns=['id', 'flag'])
+        eq_((result.rows_imported, result.bad_records), (2, 0))
+        eq_(transactions, ['begin', 'commit'])
+        eq_([statement.split('(')[0] for statement, _, _ in self.executed], ['CALL SYSCS_UTIL.IMPORT_DATA'])
+        eq_(os.listdir(self.staging_dir), [])
+
+
+class UpsertCompileTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = base.dialect()
+
+    def setup(self):
+        metadata = MetaData()
+        self.table = Table('t', metadata, Column('id', Integer, primary_key=True), Column('name', String(10)))
+        self.source = Table('s', metadata, Column('id', Integer), Column('name', String(10)))
+
+    def test_upsert_values(self):
+        eq_(_compile(insert(self.table).values(id=1, name='a').on_conflict_upsert()),
+            'INSERT INTO t (id, name) --splice-properties insertMode=UPSERT\nVALUES (?, ?)')
+
+    def test_upsert_multiple_values(self):
+        eq_(_compile(insert(self.table).values([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}])
+                          .on_conflict_upsert()),
+            'INSERT INTO t (id, name) --splice-properties insertMode=UPSERT\nVALUES (?, ?), (?, ?)')
+
+    def test_upsert_from_select(self):
+        eq_(_compile(insert(self.table).from_select(['id', 'name'], select([self.source]))
+                          .on_conflict_upsert()),
+            'INSERT INTO t (id, name) --splice-properties insertMode=UPSERT\nSELECT s.id, s.name \nFROM s')
+
+    def test_plain_insert(self):
+        self.assert_compile(insert(self.table).values(id=1, name='a'), 'INSERT INTO t (id, name) VALUES (?, ?)')
+
+
+class UpsertExecutionTest(StandinTest):
+    def test_statement_cache(self):
+        table = Table('t', MetaData(), Column('id', Integer, primary_key=True), Column('name', String(10)))
+        with self.engine().connect() as conn:
+            del self.executed[:]
+            for upsert in (False, True, False):
+                statement = insert(table).values(id=1, name='a')
+                conn.execute(statement.on_conflict_upsert() if upsert else statement)
+        eq_([statement for statement, _, _ in self.executed],
+            ['INSERT INTO t (id, name) VALUES (?, ?)',
+             'INSERT INTO t (id, name) --splice-properties insertMode=UPSERT\nVALUES (?, ?)',
+             'INSERT INTO t (id, name) VALUES (?, ?)'])
+
+
+class HintCompileTest(fixtures.TestBase):
+    def setup(self):
+        metadata = MetaData()
+        self.a = Table('a', metadata, Column('id', Integer, primary_key=True))
+        self.b = Table('b', metadata, Column('id', Integer), Column('a_id', Integer, ForeignKey('a.id')))
+
+    def test_table_hint(self):
+        eq_(_compile(select([self.a]).with_hint(self.a, 'index=IX_FOO')),
+            'SELECT a.id \nFROM a --splice-properties index=IX_FOO\n')
+
+    def test_alias_hint(self):
+        alias = self.a.alias('x')
+        eq_(_compile(select([alias]).with_hint(alias, 'index=null')),
+            'SELECT x.id \nFROM a AS x --splice-properties index=null\n')
+
+    def test_join_strategy_hint(self):
+        statement = select([self.a.c.id]).select_from(self.a.join(self.b)) \
+            .with_hint(self.b, 'joinStrategy=BROADCAST', 'splicemachinesa')
+        eq_(_compile(statement),
+            'SELECT a.id \nFROM a INNER JOIN b --splice-properties joinStrategy=BROADCAST\n ON a.id = b.a_id')
+
+    def test_statement_hint(self):
+        statement = select([self.a.c.id]).select_from(self.a.join(self.b)) \
+            .with_hint(self.a, 'index=null').with_statement_hint('useSpark=true').where(self.a.c.id == 5)
+        eq_(_compile(statement),
+            'SELECT a.id \nFROM a --splice-properties index=null, useSpark=true\n '
+            'INNER JOIN b ON a.id = b.a_id \nWHERE a.id = ?')
+
+    def test_subquery_statement_hint(self):
+        subquery = select([self.b.c.a_id]).with_statement_hint('useSpark=true')
+        eq_(_compile(select([self.a]).where(self.a.c.id.in_(subquery))),
+            'SELECT a.id \nFROM a \nWHERE a.id IN (SELECT b.a_id \nFROM b --splice-properties useSpark=true\n)')
+
+    def test_statement_hint_without_from(self):
+        with expect_warnings('Ignoring statement hints of a SELECT without a FROM clause: useSpark=true'):
+            eq_(_compile(select([literal(1)]).with_statement_hint('useSpark=true')),
+                'SELECT ? AS anon_1 FROM SYSIBM.SYSDUMMY1')
+
+    def test_delete_hint(self):
+        eq_(_compile(delete(self.a).with_hint("bulkDeleteDirectory='/tmp'")),
+            "DELETE FROM a --splice-properties bulkDeleteDirectory='/tmp'\n")
+
+
+class RoutingTest(fixtures.TestBase):
+    def setup(self):
+        metadata = MetaData()
+        self.a = Table('a', metadata, Column('id', Integer, primary_key=True), Column('name', String(10)))
+        self.b = Table('b', metadata, Column('x', Integer, primary_key=True), Column('y', Integer, primary_key=True))
+
+    def test_point_lookup(self):
+        eq_(routing.point_lookup_tables(select([self.a]).where(self.a.c.id == 5)), {self.a})
+        eq_(routing.point_lookup_tables(select([self.a]).where((self.a.c.id == 5) & (self.a.c.name == 'n'))),
+            {self.a})
+
+    def test_partial_key(self):
+        eq_(routing.point_lookup_tables(select([self.b]).where(self.b.c.x == 1)), set())
+        eq_(routing.point_lookup_tables(select([self.b]).where((self.b.c.x == 1) & (self.b.c.y == 2))), {self.b})
+
+    def test_scan(self):
+        eq_(routing.point_lookup_tables(select([self.a])), set())
+        eq_(routing.point_lookup_tables(select([self.a]).where(self.a.c.id > 5)), set())
+        eq_(routing.point_lookup_tables(select([self.a]).where((self.a.c.id == 5) | (self.a.c.name == 'n'))),
+            set())
+
+
+class LimitOffsetCompileTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = base.dialect()
+
+    def setup(self):
+        self.a = Table('a', MetaData(), Column('id', Integer, primary_key=True))
+
+    def test_bound_limit_offset(self):
+        self.assert_compile(select([self.a]).limit(20).offset(40),
+                            'SELECT a.id FROM a OFFSET ? ROWS FETCH FIRST ? ROWS ONLY',
+                            checkparams={'param_1': 40, 'param_2': 20})
+
+    def test_limit_bindparam(self):
+        self.assert_compile(select([self.a]).limit(bindparam('size', 10)),
+                            'SELECT a.id FROM a FETCH FIRST ? ROWS ONLY', checkpositional=(10,))
+
+    def test_literal_binds(self):
+        self.assert_compile(select([self.a]).limit(20).offset(40),
+                            'SELECT a.id FROM a OFFSET 40 ROWS FETCH FIRST 20 ROWS ONLY', literal_binds=True)
+
+
+class LimitOffsetTest(StandinTest):
+    def _execute(self, **options):
+        a = Table('a', MetaData(), Column('id', Integer, primary_key=True))
+        with self.engine(**options).connect() as conn:
+            del self.executed[:]
+            conn.execute(select([a]).limit(20).offset(40)).fetchall()
+        return [(statement, list(parameters)) for statement, parameters, _ in self.executed]
+
+    def test_bound_limit_offset(self):
+        eq_(self._execute(), [('SELECT a.id \nFROM a OFFSET ? ROWS FETCH FIRST ? ROWS ONLY', [40, 20])])
+
+    def test_inline_limit_offset(self):
+        # compiled with post-compile placeholders on SQLAlchemy 1.4, rendered when executed
+        eq_(self._execute(bind_limit_offset=False),
+            [('SELECT a.id \nFROM a OFFSET 40 ROWS FETCH FIRST 20 ROWS ONLY', [])])
+
+
+class KeysetPaginationTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = base.dialect()
+
+    def setup(self):
+        self.t = Table('t', MetaData(), Column('a', Integer, primary_key=True), Column('b', Integer, primary_key=True),
+                       Column('name', String(10)))
+
+    def test_first_page(self):
+        keys = pagination.sort_keys(list(self.t.primary_key))
+        self.assert_compile(pagination.page_statement(select([self.t]), keys, 10),
+                            'SELECT t.a, t.b, t.name FROM t ORDER BY t.a, t.b FETCH FIRST ? ROWS ONLY',
+                            checkpositional=(10,))
+
+    def test_next_page(self):
+        keys = pagination.sort_keys(list(self.t.primary_key))
+        self.assert_compile(pagination.page_statement(select([self.t]), keys, 10, last=[1, 2]),
+                            'SELECT t.a, t.b, t.name FROM t WHERE t.a > ? OR t.a = ? AND t.b > ? '
+                            'ORDER BY t.a, t.b FETCH FIRST ? ROWS ONLY',
+                            checkpositional=(1, 1, 2, 10))
+
+    def test_descending(self):
+        keys = pagination.sort_keys(self.t.c.name.desc())
+        eq_(keys, [(self.t.c.name, True)])
+        self.assert_compile(pagination.page_statement(select([self.t]).order_by(self.t.c.a), keys, 5, last=['x']),
+                            'SELECT t.a, t.b, t.name FROM t WHERE t.name < ? '
+                            'ORDER BY t.name DESC FETCH FIRST ? ROWS ONLY',
+                            checkpositional=('x', 5))
+
+
+class InListCompileTest(fixtures.TestBase, AssertsCompiledSQL):
+    __skip_if__ = (sqlalchemy_14,)
+
+    def setup(self):
+        self.__dialect__ = base.dialect(in_list_threshold=3)
+        self.t = Table('t', MetaData(), Column('id', Integer, primary_key=True))
+
+    def test_short_list(self):
+        self.assert_compile(select([self.t]).where(self.t.c.id.in_([1, 2, 3])),
+                            'SELECT t.id FROM t WHERE t.id IN (?, ?, ?)', checkpositional=(1, 2, 3))
+
+    def test_long_list(self):
+        self.assert_compile(select([self.t]).where(self.t.c.id.in_([1, 2, 3, 4])),
+                            'SELECT t.id FROM t WHERE t.id IN ([EXPANDING_in_list_1])',
+                            checkparams={'in_list_1': [1, 2, 3, 4]})
+
+    def test_long_not_in_list(self):
+        self.assert_compile(select([self.t]).where(self.t.c.id.notin_([1, 2, 3, 4])),
+                            'SELECT t.id FROM t WHERE t.id NOT IN ([EXPANDING_in_list_1])',
+                            checkparams={'in_list_1': [1, 2, 3, 4]})
+
+    def test_literal_binds(self):
+        self.assert_compile(select([self.t]).where(self.t.c.id.in_([1, 2, 3, 4])),
+                            'SELECT t.id FROM t WHERE t.id IN (1, 2, 3, 4)', literal_binds=True)
+
+    def test_empty_set(self):
+        compiled = select([self.t]).compile(dialect=self.__dialect__)
+        eq_(compiled.visit_empty_set_expr([Integer(), String(5)]),
+            'SELECT CAST(NULL AS INT), CAST(NULL AS VARCHAR(5)) FROM SYSIBM.SYSDUMMY1 WHERE 1 = 0')
+
+
+class RoutingExecutionTest(StandinTest):
+    ROW_COUNT = 10
+
+    def setup(self):
+        super(RoutingExecutionTest, self).setup()
+        self.t = Table('t', MetaData(), Column('id', Integer, primary_key=True), Column('x', Integer))
+
+    def respond(self, statement, parameters):
+        if 'SYS.SYSTABLESTATISTICS' in statement:
+            return [('C1', int, None, 10, 10, 0, True)], [(self.ROW_COUNT,)]
+        return super(RoutingExecutionTest, self).respond(statement, parameters)
+
+    def _selects(self, engine, *statements, **options):
+        del self.executed[:]
+        with engine.connect() as conn:
+            for statement in statements:
+                conn.execution_options(**options).execute(statement).fetchall()
+        return [statement for statement, _, _ in self.executed if statement.startswith('SELECT t.')]
+
+    def test_engine_option(self):
+        eq_(self._selects(self.engine(splice_engine='olap'), select([self.t.c.id])),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=true\n'])
+
+    def test_execution_option(self):
+        engine = self.engine(splice_engine='olap')
+        eq_(self._selects(engine, select([self.t.c.id]).where(self.t.c.x == 1), splice_engine='oltp'),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=false\n \nWHERE t.x = ?'])
+        eq_(self._selects(engine, select([self.t.c.id]).execution_options(splice_engine='oltp')),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=false\n'])
+        eq_(self._selects(self.engine(), select([self.t.c.id])), ['SELECT t.id \nFROM t'])
+
+    def test_statement_option_wins(self):
+        statement = select([self.t.c.id]).execution_options(splice_engine='oltp')
+        eq_(self._selects(self.engine(), statement, splice_engine='olap'),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=false\n'])
+
+    def test_no_from(self):
+        with self.engine(splice_engine='olap').connect() as conn:
+            for statement in (select([literal(1)]), select([func.current_timestamp()]),
+                              select([Sequence('s').next_value()])):
+                conn.execute(statement).fetchall()
+        eq_([statement for statement, _, _ in self.executed[-3:]],
+            ['SELECT ? AS anon_1 FROM SYSIBM.SYSDUMMY1',
+             'SELECT CURRENT_TIMESTAMP AS current_timestamp_1 FROM SYSIBM.SYSDUMMY1',
+             'SELECT NEXT VALUE FOR s AS next_value_1 FROM SYSIBM.SYSDUMMY1'])
+
+    def test_own_hint(self):
+        statement = select([self.t.c.id]).with_hint(self.t, 'useSpark=false')
+        eq_(self._selects(self.engine(splice_engine='olap'), statement),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=false\n'])
+
+    def test_invalid(self):
+        with self.engine().connect() as conn:
+            assert_raises(exc.ArgumentError, conn.execution_options(splice_engine='spark').execute,
+                          select([self.t.c.id]))
+
+    def test_expanding_in(self):
+        statement = select([self.t.c.id]).where(self.t.c.x.in_(bindparam('xs', expanding=True)))
+        with self.engine(splice_engine='olap').connect() as conn:
+            conn.execute(statement, xs=[1, 2, 3]).fetchall()
+        eq_(self.executed[-1][:2],
+            ('SELECT t.id \nFROM t --splice-properties useSpark=true\n \nWHERE t.x IN (?, ?, ?)', (1, 2, 3)))
+
+    def test_auto(self):
+        engine = self.engine(splice_engine='auto', olap_row_threshold=100)
+        statements = [select([self.t.c.id]).where(self.t.c.id == 1), select([self.t.c.id])]
+        eq_(self._selects(engine, *statements),
+            ['SELECT t.id \nFROM t --splice-properties useSpark=false\n \nWHERE t.id = ?',
+             'SELECT t.id \nFROM t --splice-properties useSpark=false\n'])
+        self.ROW_COUNT = 1000
+        engine = self.engine(splice_engine='auto', olap_row_threshold=100)
+        eq_(self._selects(engine, *statements)[1], 'SELECT t.id \nFROM t --splice-properties useSpark=true\n')
+
+    def test_compiled_cache(self):
+        cache = {}
+        statement = select([self.t.c.id])
+        self._selects(self.engine(splice_engine='olap'), statement, statement, compiled_cache=cache)
+        eq_(len(cache), 1)
+
+    def test_compiled_cache_engines(self):
+        cache = {}
+        statement = select([self.t.c.id]).where(self.t.c.x == 1)
+        del self.executed[:]
+        with self.engine().connect() as conn:
+            conn = conn.execution_options(compiled_cache=cache)
+            for engine in ('olap', 'oltp', None, 'olap'):
+                options = {} if engine is None else {'splice_engine': engine}
+                conn.execution_options(**options).execute(statement).fetchall()
+        eq_([statement for statement, _, _ in self.executed],
+            ['SELECT t.id \nFROM t --splice-properties useSpark=true\n \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t --splice-properties useSpark=false\n \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t --splice-properties useSpark=true\n \nWHERE t.x = ?'])
+        eq_(len(cache), 3)  # the second olap execution reused the first one's compilation
+
+    def test_compiled_cache_hints(self):
+        del self.executed[:]
+        with self.engine().connect() as conn:
+            conn = conn.execution_options(compiled_cache={})
+            for index in ('IX_A', 'IX_B', None, 'IX_A'):
+                statement = select([self.t.c.id]).where(self.t.c.x == 1)
+                if index is not None:
+                    statement = statement.with_hint(self.t, 'index=' + index)
+                conn.execute(statement).fetchall()
+        eq_([statement for statement, _, _ in self.executed],
+            ['SELECT t.id \nFROM t --splice-properties index=IX_A\n \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t --splice-properties index=IX_B\n \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t \nWHERE t.x = ?',
+             'SELECT t.id \nFROM t --splice-properties index=IX_A\n \nWHERE t.x = ?'])
+
+
+class InListTest(StandinTest):
+    __skip_if__ = (sqlalchemy_14,)
+
+    def setup(self):
+        super(InListTest, self).setup()
+        self.t = Table('t', MetaData(), Column('id', Integer), Column('name', String(3)), Column('amount', Numeric(5, 2)))
+        self.sent = standin.log = []
+        self.created = set()
+
+    def teardown(self):
+        standin.log = None
+        super(InListTest, self).teardown()
+
+    def respond(self, statement, parameters):
+        if statement.startswith('DELETE FROM splice_in_list') and statement not in self.created:
+            self.created.add(statement)
+            raise standin.ProgrammingError('no such table')
+        return super(InListTest, self).respond(statement, parameters)
+
+    def _execute(self, strategy, *clauses, **parameters):
+        engine = self.engine(in_list_threshold=3, in_list_strategy=strategy)
+        with engine.connect() as conn:
+            del self.sent[:]  # connection setup
+            for clause in clauses:
+                conn.execute(select([self.t.c.id]).where(clause), **parameters).fetchall()
+        return [(' '.join(statement.split()), parameters) for statement, parameters, _ in self.sent]
+
+    def test_values(self):
+        eq_(self._execute('values', self.t.c.name.in_(['a', 'b', 'c', 'longer', 'e'])), [
+            ('SELECT t.id FROM t WHERE t.name IN (SELECT v FROM (VALUES CAST(NULL AS VARCHAR(32672)), '
+             '?, ?, ?, ?, ?, ?, ?, ?) AS in_list(v) WHERE v IS NOT NULL)',
+             [b'a', b'b', b'c', b'longer', b'e', b'e', b'e', b'e'])])
+
+    def test_values_precision(self):
+        eq_(self._execute('values', self.t.c.amount.in_([1, 2, 3, decimal.Decimal('1.5')]),
+                          self.t.c.amount.in_([1, 2, 3, decimal.Decimal('12345.678')])), [
+            ('SELECT t.id FROM t WHERE t.amount IN (SELECT v FROM (VALUES CAST(NULL AS DECIMAL(5, 2)), '
+             '?, ?, ?, ?) AS in_list(v) WHERE v IS NOT NULL)', [1, 2, 3, 1.5]),
+            ('SELECT t.id FROM t WHERE t.amount IN (SELECT v FROM (VALUES CAST(NULL AS DECIMAL(8, 3)), '
+             '?, ?, ?, ?) AS in_list(v) WHERE v IS NOT NULL)', [1, 2, 3, 12345.678])])
+
+    def test_temp_table(self):
+        eq_(self._execute('temp_table', self.t.c.id.in_([1, 2, 3, 2 ** 40]), self.t.c.id.in_([4, 5, 6, 7])), [
+            ('DELETE FROM splice_in_list_0_bigint', []),
+            ('CREATE GLOBAL TEMPORARY TABLE splice_in_list_0_bigint ( v BIGINT )', []),
+            ('INSERT INTO splice_in_list_0_bigint (v) VALUES (?), (?), (?), (?)', [1, 2, 3, 2 ** 40]),
+            ('SELECT t.id FROM t WHERE t.id IN (SELECT v FROM splice_in_list_0_bigint)', []),
+            ('DELETE FROM splice_in_list_0_bigint', []),
+            ('INSERT INTO splice_in_list_0_bigint (v) VALUES (?), (?), (?), (?)', [4, 5, 6, 7]),
+            ('SELECT t.id FROM t WHERE t.id IN (SELECT v FROM splice_in_list_0_bigint)', [])])
+
+    def test_not_in_null(self):
+        eq_(self._execute('values', self.t.c.name.notin_(bindparam('names', expanding=True)),
+                          names=['a', 'b', None, 'd']), [
+            ('DELETE FROM splice_in_list_0_varchar32672', []),
+            ('CREATE GLOBAL TEMPORARY TABLE splice_in_list_0_varchar32672 ( v VARCHAR(32672) )', []),
+            ('INSERT INTO splice_in_list_0_varchar32672 (v) VALUES (?), (?), (?), (?)', [b'a', b'b', None, b'd']),
+            ('SELECT t.id FROM t WHERE t.name NOT IN (SELECT v FROM splice_in_list_0_varchar32672)', [])])
+
+    def test_unrepresentable(self):
+        eq_(self._execute('values', self.t.c.amount.in_([1, 2, 3, decimal.Decimal('1E+40')])), [
+            ('SELECT t.id FROM t WHERE t.amount IN (?, ?, ?, ?)', [1, 2, 3, 1e+40])])
+
+
+class InputSizeTest(fixtures.TestBase):
+    def test_input_sizes(self):
+        dialect = pyodbc.SpliceMachineDialect_pyodbc(fast_executemany=True, dbapi=standin)
+        eq_(dialect._input_size(DateTime()), (standin.SQL_TYPE_TIMESTAMP, 26, 6))
+        eq_(dialect._input_size(Integer()), (standin.SQL_INTEGER, 0, 0))
+        eq_(dialect._input_size(Numeric(10, 2)), (standin.SQL_DECIMAL, 10, 2))
+        eq_(dialect._input_size(String(5)), (standin.SQL_VARCHAR, 20, 0))
+        eq_(dialect._input_size(Unicode(5)), (standin.SQL_VARCHAR, 20, 0))
+        eq_(dialect._input_size(String()), None)
+        eq_(dialect._input_size(Date()), None)
+
+
+class BindColumnProcessorTest(fixtures.TestBase):
+    COLUMNS = [
+        (Integer(), [1, 2, 3], [1, '2', True, None]),
+        (Boolean(), [True, False], [True, 0, 2, None]),
+        (String(10), ['a', 'b'], ['a', None, 'é']),
+        (Date(), ['2020-01-01'], ['2020-01-01', None]),
+    ]
+
+    def test_same_values(self):
+        dialect = base.dialect()
+        for type_, *columns in self.COLUMNS:
+            impl = type_.dialect_impl(dialect)
+            process, process_column = impl.bind_processor(dialect), impl.bind_column_processor(dialect)
+            for values in columns:
+                eq_(list(process_column(values)), [process(value) for value in values])
+
+
+class ColumnBindProcessingTest(StandinTest):
+    ROWS = [{'id': 1, 'name': 'a', 'paid': True, 'day': '2020-01-01'},
+            {'id': 2, 'name': None, 'paid': None, 'day': None},
+            {'id': 3, 'name': 'é', 'paid': False, 'day': '2020-01-03'}]
+
+    def _executed(self, column_bind_processing):
+        t = Table('t', MetaData(), Column('id', Integer), Column('name', String(10)), Column('paid', Boolean),
+                  Column('day', Date), Column('kind', String(5), default='x'))
+        del self.executed[:]
+        with self.engine(column_bind_processing=column_bind_processing).connect() as conn:
+            conn.execute(t.insert(), self.ROWS)
+            conn.execute(t.update().where(t.c.id == bindparam('key')).values(name=bindparam('new')),
+                         [{'key': 1, 'new': 'b'}, {'key': 2, 'new': None}])
+        return [(statement, parameters) for statement, parameters, _ in self.executed
+                if statement.startswith(('INSERT', 'UPDATE'))]
+
+    def test_same_parameters(self):
+        executed = self._executed(True)
+        eq_(executed, self._executed(False))
+        eq_([parameters for _, parameters in executed], [
+            ((1, b'a', 1, b'2020-01-01', b'x'), (2, None, None, None, b'x'),
+             (3, 'é'.encode('utf-8'), 0, b'2020-01-03', b'x')),
+            ((b'b', 1), (None, 2))])
+
+
+class InsertBatchTest(StandinTest):
+    def setup(self):
+        super(InsertBatchTest, self).setup()
+        self.t = Table('t', MetaData(), Column('id', Integer), Column('name', String(10)))
+        self.sent = standin.log = []
+
+    def teardown(self):
+        standin.log = None
+        super(InsertBatchTest, self).teardown()
+
+    def _insert(self, rows, **options):
+        with self.engine(**options).connect() as conn:
+            del self.sent[:]  # connection setup
+            rowcount = conn.execute(self.t.insert(), [{'id': i, 'name': 'n'} for i in range(rows)]).rowcount
+        return rowcount, [(statement, len(parameters), many) for statement, parameters, many in self.sent]
+
+    def test_batches(self):
+        rows = 'INSERT INTO t (id, name) VALUES (?, ?), (?, ?), (?, ?)'
+        eq_(self._insert(7, insert_batch_size=3),
+            (7, [(rows, 2, True), ('INSERT INTO t (id, name) VALUES (?, ?)', 2, False)]))
+        eq_(self._insert(6, insert_batch_size=3), (6, [(rows, 2, True)]))
+
+    def test_row_by_row(self):
+        eq_(self._insert(3)[1], [('INSERT INTO t (id, name) VALUES (?, ?)', 3, True)])
+
+
+class LastRowIdTest(StandinTest):
+    NEXTVAL = 'SELECT NEXTVAL FOR sq FROM SYSIBM.SYSDUMMY1'
+
+    def setup(self):
+        super(LastRowIdTest, self).setup()
+        self.next_value = 100
+        metadata = MetaData()
+        self.identity = Table('ti', metadata, Column('id', Integer, primary_key=True), Column('x', Integer))
+        self.sequence = Table('ts', metadata, Column('id', Integer, Sequence('sq'), primary_key=True),
+                              Column('x', Integer))
+
+    def respond(self, statement, parameters):
+        if statement.startswith('SELECT NEXT VALUE FOR'):
+            count = statement.count(',') + 1
+            self.next_value += count
+            return [('1', int, None, 10, 10, 0, True)], [(i,) for i in range(self.next_value - count, self.next_value)]
+        for query, value in (('NEXTVAL FOR', 41), ('IDENTITY_VAL_LOCAL', 7), ('MAX(', 9)):
+            if query in statement:
+                return [('1', int, None, 10, 10, 0, True)], [(value,)]
+        return super(LastRowIdTest, self).respond(statement, parameters)
+
+    def _insert(self, table, **options):
+        with self.engine(**options).connect() as conn:
+            del self.executed[:]  # connection setup
+            key = list(conn.execute(table.insert().values(x=1)).inserted_primary_key)
+        return key, [statement for statement, _, _ in self.executed]
+
+    def test_identity_val_local(self):
+        eq_(self._insert(self.identity),
+            ([7], ['INSERT INTO ti (x) VALUES (?)', 'VALUES IDENTITY_VAL_LOCAL()']))
+
+    def test_max(self):
+        eq_(self._insert(self.identity, lastrowid_strategy='max'),
+            ([9], ['INSERT INTO ti (x) VALUES (?)', 'SELECT MAX(id) FROM ti']))
+
+    def test_sequence_column(self):
+        for strategy in base.SpliceMachineDialect.lastrowid_strategies:
+            eq_(self._insert(self.sequence, lastrowid_strategy=strategy),
+                ([41], [self.NEXTVAL, 'INSERT INTO ts (id, x) VALUES (?, ?)']))
+
+    def test_sequence_block(self):
+        block = 'SELECT NEXT VALUE FOR sq FROM (VALUES 1, 2, 3) AS B(N)'
+        with self.engine(sequence_block_size=3).connect() as conn:
+            del self.executed[:]
+            conn.execute(self.sequence.insert(), [{'x': x} for x in range(4)])
+            eq_(list(conn.execute(self.sequence.insert().values(x=1)).inserted_primary_key), [104])
+        eq_([(statement, list(parameters)) for statement, parameters, _ in self.executed],
+            [(block, []), (block, []),
+             ('INSERT INTO ts (id, x) VALUES (?, ?)', [(100, 0), (101, 1), (102, 2), (103, 3)]),
+             ('INSERT INTO ts (id, x) VALUES (?, ?)', [104, 1])])
+
+
+class SequenceAllocatorTest(fixtures.TestBase):
+    def setup(self):
+        self.allocator = SequenceAllocator()
+        self.fetched = []  # block sizes asked for
+        self.last = 0
+
+    def _fetch(self, count):
+        self.fetched.append(count)
+        values = list(range(self.last + 1, self.last + count + 1))
+        self.last += count
+        return values
+
+    def test_refill(self):
+        eq_([self.allocator.next_value('A', 3, self._fetch) for _ in range(7)], [1, 2, 3, 4, 5, 6, 7])
+        eq_(self.fetched, [3, 3, 3])
+        eq_(self.allocator.next_value('B', 3, self._fetch), 10)  # blocks are per sequence
+        eq_(self.allocator.next_value('A', 3, self._fetch), 8)
+        self.allocator.invalidate()
+        eq_(self.allocator.next_value('A', 3, self._fetch), 13)
+
+    def test_threads(self):
+        values = []
+
+        def take():
+            for _ in range(200):
+                values.append(self.allocator.next_value('A', 7, self._fetch))
+
+        threads = [threading.Thread(target=take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        eq_(sorted(values), list(range(1, 1601)))
+        eq_(len(self.fetched), 229)  # ceil(1600 / 7)
+
+
+class StreamingTest(StandinTest):
+    ROWS = [(i,) for i in range(5)]
+
+    def setup(self):
+        super(StreamingTest, self).setup()
+        self.t = Table('t', MetaData(), Column('id', Integer))
+
+    def respond(self, statement, parameters):
+        if statement.startswith('SELECT t.id'):
+            return [('ID', int, None, 10, 10, 0, True)], self.ROWS
+        return super(StreamingTest, self).respond(statement, parameters)
+
+    def _stream(self, engine, **options):
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, **options).execute(select([self.t]))
+            return result.context.get_fetch_size(), result.cursor.arraysize, [row[0] for row in result]
+
+    def test_fetch_size_precedence(self):
+        engine = self.engine(fetch_size=3)
+        eq_(self._stream(engine), (3, 3, [0, 1, 2, 3, 4]))
+        eq_(self._stream(engine, max_row_buffer=2), (2, 2, [0, 1, 2, 3, 4]))
+        eq_(self._stream(engine, max_row_buffer=2, fetch_size=4), (4, 4, [0, 1, 2, 3, 4]))
+        eq_(self._stream(self.engine()), (1000, 1000, [0, 1, 2, 3, 4]))
+
+    def test_invalid_fetch_size(self):
+        engine = self.engine()
+        for value in (0, -1, '10', None):
+            assert_raises(exc.ArgumentError, self._stream, engine, fetch_size=value)
+
+    def test_server_side_cursors(self):
+        engine = self.engine(server_side_cursors=True, fetch_size=2)
+        with engine.connect() as conn:
+            result = conn.execute(select([self.t]))
+            eq_((result.context._is_server_side, result.cursor.arraysize), (True, 2))
+            eq_([row[0] for row in result], [0, 1, 2, 3, 4])
+            eq_(conn.execute(self.t.insert(), id=1).context._is_server_side, False)
+            eq_(conn.execution_options(stream_results=False).execute(select([self.t])).context._is_server_side,
+                False)
+
+
+class CatalogTest(StandinTest):
+    TABLES = [('A',), ('B',)]
+
+    def respond(self, statement, parameters):
+        if 'SYS.SYSSCHEMAS' in statement:
+            return [('SCHEMANAME', str, None, 128, 128, 0, False), ('SCHEMAID', str, None, 36, 36, 0, False)], \
+                   [('SPLICE', 's-1')]
+        if 'SYSVW.SYSTABLESVIEW' in statement:
+            tables = [row for row in self.TABLES if len(parameters) < 2 or row[0] == parameters[1]]
+            return [('TABLENAME', str, None, 128, 128, 0, False)], tables
+        if 'SYS.SYSSEQUENCES' in statement:
+            return [('SEQUENCENAME', str, None, 128, 128, 0, False)], [('SEQ',)]
+        return super(CatalogTest, self).respond(statement, parameters)
+
+
+class ExistenceProbeTest(CatalogTest):
+    def _catalog_queries(self):
+        return [(' '.join(statement.split()), tuple(parameters)) for statement, parameters, _ in self.executed
+                if 'SYSTABLESVIEW' in statement or 'SYSSEQUENCES' in statement]
+
+    def test_point_queries(self):
+        engine = self.engine()
+        with engine.connect() as conn:
+            eq_([engine.dialect.has_table(conn, name) for name in ('a', 'b', 'c')], [True, True, False])
+            eq_(engine.dialect.has_sequence(conn, 'seq'), True)
+        eq_(self._catalog_queries(), [
+            ('SELECT TABLENAME FROM SYSVW.SYSTABLESVIEW WHERE SCHEMANAME = ? AND TABLENAME = ?', ('SPLICE', 'A')),
+            ('SELECT TABLENAME FROM SYSVW.SYSTABLESVIEW WHERE SCHEMANAME = ? AND TABLENAME = ?', ('SPLICE', 'B')),
+            ('SELECT TABLENAME FROM SYSVW.SYSTABLESVIEW WHERE SCHEMANAME = ? AND TABLENAME = ?', ('SPLICE', 'C')),
+            ('SELECT SEQUENCENAME FROM SYS.SYSSEQUENCES WHERE SCHEMAID = ? AND SEQUENCENAME = ?', ('s-1', 'SEQ')),
+        ])
+
+    def test_probes(self):
+        engine = self.engine(existence_probe_ttl=60)
+        with engine.connect() as conn:
+            eq_([engine.dialect.has_table(conn, name) for name in ('a', 'b', 'c')], [True, True, False])
+            eq_([engine.dialect.has_sequence(conn, name) for name in ('seq', 'other')], [True, False])
+            conn.execute(text('CREATE TABLE c (id INT)'))
+            engine.dialect.has_table(conn, 'c')
+        eq_(self._catalog_queries(), [
+            ('SELECT TABLENAME FROM SYSVW.SYSTABLESVIEW WHERE SCHEMANAME = ?', ('SPLICE',)),
+            ('SELECT SEQUENCENAME FROM SYS.SYSSEQUENCES WHERE SCHEMAID = ?', ('s-1',)),
+            ('SELECT TABLENAME FROM SYSVW.SYSTABLESVIEW WHERE SCHEMANAME = ?', ('SPLICE',)),
+        ])
+
+
+class SchemaIdTest(CatalogTest):
+    def _lookups(self):
+        return len([statement for statement, _, _ in self.executed if 'SYS.SYSSCHEMAS' in statement])
+
+    def test_missing_schema(self):
+        engine = self.engine(existence_probe_ttl=60)
+        reflector = engine.dialect._reflector
+        with engine.connect() as conn:
+            eq_([reflector.get_schema_id(name, conn) for name in ('splice', 'nope', 'nope', 'other', 'nope')],
+                ['s-1', None, None, None, None])
+            eq_(self._lookups(), 3)  # 'nope' and 'other' each reload once
+            reflector._missing_schemas['NOPE'] = 0  # expired
+            eq_(reflector.get_schema_id('nope', conn), None)
+            eq_(reflector.get_schema_id('other', conn), None)
+            eq_(self._lookups(), 4)
+            reflector.invalidate_schema_ids()
+            eq_(reflector.get_schema_id('nope', conn), None)
+            eq_(self._lookups(), 5)
+
+    def test_missing_schema_without_ttl(self):
+        engine = self.engine()
+        reflector = engine.dialect._reflector
+        with engine.connect() as conn:
+            eq_([reflector.get_schema_id(name, conn) for name in ('splice', 'nope', 'nope', 'splice')],
+                ['s-1', None, None, 's-1'])
+            eq_(self._lookups(), 3)
+
+
+class DDLInvalidationTest(CatalogTest):
+    def _cache(self, engine, conn):
+        dialect = engine.dialect
+        dialect.has_table(conn, 'a')
+        dialect._reflector.get_schema_id('splice', conn)
+        dialect.reflection_cache.set('key', 'value')
+        dialect.sequence_allocator.next_value('SEQ', 10, lambda count: list(range(count)))
+        return dialect
+
+    def _cached(self, dialect, conn):
+        return (conn in dialect._reflector._probes, dialect._reflector._schema_ids is not None,
+                dialect.reflection_cache.get('key')[0], bool(dialect.sequence_allocator._blocks['SEQ']))
+
+    def test_text_ddl(self):
+        engine = self.engine(existence_probe_ttl=60, reflection_cache_size=10)
+        with engine.connect() as conn:
+            dialect = self._cache(engine, conn)
+            conn.execute('SELECT 1 FROM SYSIBM.SYSDUMMY1')
+            eq_(self._cached(dialect, conn), (True, True, True, True))
+            conn.execute('  drop TABLE a')
+            eq_(self._cached(dialect, conn), (False, False, False, False))
+
+    def test_compiled_ddl(self):
+        engine = self.engine(existence_probe_ttl=60, reflection_cache_size=10)
+        with engine.connect() as conn:
+            dialect = self._cache(engine, conn)
+            Table('a', MetaData(), Column('id', Integer)).drop(conn)
+            eq_(self._cached(dialect, conn), (False, False, False, False))
+
+
+class CatalogCursorTest(CatalogTest):
+    def setup(self):
+        super(CatalogCursorTest, self).setup()
+        self.fail = False
+        self.cursors = []  # (statement, DBAPI cursor) of every query
+
+    def respond(self, statement, parameters):
+        if self.fail:
+            self.fail = False
+            raise standin.ProgrammingError('catalog query failed')
+        return super(CatalogCursorTest, self).respond(statement, parameters)
+
+    def engine(self, **kw):
+        engine = super(CatalogCursorTest, self).engine(**kw)
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, many:
+                     self.cursors.append((statement, cursor)))
+        return engine
+
+    def _cursors(self, table):
+        return [cursor for statement, cursor in self.cursors if table in statement]
+
+    def test_reuse(self):
+        engine = self.engine()
+        reflector = engine.dialect._reflector
+        with engine.connect() as conn:
+            eq_(reflector.get_existing_tables(conn, 'SPLICE'), {'A', 'B'})
+            eq_(reflector.get_existing_tables(conn, 'SPLICE'), {'A', 'B'})
+            reflector.get_existing_sequences(conn, 'SPLICE')
+        first, again = self._cursors('SYSVW.SYSTABLESVIEW')
+        assert first is again
+        assert self._cursors('SYS.SYSSEQUENCES')[0] is not first
+
+    def test_execution_error(self):
+        engine = self.engine()
+        reflector = engine.dialect._reflector
+        with engine.connect() as conn:
+            reflector.get_existing_tables(conn, 'SPLICE')
+            self.fail = True
+            assert_raises(exc.DBAPIError, reflector.get_existing_tables, conn, 'SPLICE')
+            eq_(reflector.get_existing_tables(conn, 'SPLICE'), {'A', 'B'})
+        first, failed, retried = self._cursors('SYSVW.SYSTABLESVIEW')
+        assert failed is first
+        assert retried is not failed  # the failed cursor is dropped
+
+    def test_invalidated_connection(self):
+        engine = self.engine()
+        reflector = engine.dialect._reflector
+        with engine.connect() as conn:
+            reflector.get_existing_tables(conn, 'SPLICE')
+            conn.invalidate()
+            eq_(reflector.get_existing_tables(conn, 'SPLICE'), {'A', 'B'})
+            reflector.get_existing_tables(conn, 'SPLICE')
+        before, after, again = self._cursors('SYSVW.SYSTABLESVIEW')
+        assert after is not before  # the new DBAPI connection starts without cursors
+        assert again is after
+
+
+class ColumnReflectionTest(CatalogTest):
+    COLUMNS = [('A', 'ID', 'INTEGER'), ('A', 'NAME', 'VARCHAR'), ('B', 'ID', 'BIGINT')]
+
+    def respond(self, statement, parameters):
+        if 'SYSIBM.SQLCOLUMNS' in statement:
+            rows = []
+            for table, name, type_name in self.COLUMNS:
+                if parameters[1] in (None, table):
+                    row = [None] * 24
+                    row[2], row[3], row[5], row[6], row[8], row[17] = table, name, type_name, 10, 0, 'YES'
+                    rows.append(tuple(row))
+            return [('C%d' % i, str, None, 128, 128, 0, True) for i in range(24)], rows
+        return super(ColumnReflectionTest, self).respond(statement, parameters)
+
+    def _column_calls(self):
+        return [list(parameters) for statement, parameters, _ in self.executed if 'SYSIBM.SQLCOLUMNS' in statement]
+
+    def test_one_call_per_schema(self):
+        engine = self.engine()
+        with engine.connect() as conn:
+            del self.executed[:]
+            inspector = inspect(conn)
+            eq_([column['name'] for column in inspector.get_columns('a')], ['id', 'name'])
+            eq_([column['name'] for column in inspector.get_columns('b')], ['id'])
+            eq_(inspector.get_columns('missing'), [])
+        eq_(self._column_calls(), [['SPLICE', None]])
+
+    def test_multi_columns(self):
+        engine = self.engine()
+        with engine.connect() as conn:
+            del self.executed[:]
+            columns = engine.dialect.get_multi_columns(conn, schema='splice', filter_names=['b', 'a', 'missing'],
+                                                       info_cache={})
+            eq_([(key, [column['name'] for column in table]) for key, table in columns],
+                [(('splice', 'b'), ['id']), (('splice', 'a'), ['id', 'name'])])
+            eq_([key for key, _ in engine.dialect.get_multi_columns(conn, info_cache={})],
+                [(None, 'a'), (None, 'b')])
+        eq_(self._column_calls(), [['SPLICE', None], ['SPLICE', None]])
+
+
+class SchemaReflectionTest(CatalogTest):
+    """
+    Answers the catalog calls reflecting tables A, B (referred to by A) and C
+    """
+    COLUMNS = [('A', 'ID', 'INTEGER'), ('A', 'B_ID', 'INTEGER'), ('B', 'ID', 'INTEGER'), ('C', 'ID', 'BIGINT'),
+               ('C', 'NAME', 'VARCHAR')]
+
+    def setup(self):
+        super(SchemaReflectionTest, self).setup()
+        self.catalog_calls = []  # (procedure, table, DBAPI connection)
+
+    def engine(self, **kw):
+        engine = super(SchemaReflectionTest, self).engine(**kw)
+        event.listen(engine, 'before_cursor_execute', self._record)
+        return engine
+
+    def _record(self, conn, cursor, statement, parameters, context, many):
+        if statement.startswith('CALL SYSIBM.'):
+            procedure = statement[len('CALL SYSIBM.'):statement.index('(')]
+            table = parameters[1] if len(parameters) > 1 else None
+            self.catalog_calls.append((procedure, table, conn.connection.connection))
+
+    def calls(self, procedure):
+        return [table for called, table, _ in self.catalog_calls if called == procedure]
+
+    def respond(self, statement, parameters):
+        rows = None
+        if 'FROM SYS.SYSTABLES' in statement:
+            return [('TABLENAME', str, None, 128, 128, 0, False)], [('A',), ('B',), ('C',)]
+        if 'SYSIBM.SQLCOLUMNS' in statement:
+            rows = []
+            for table, name, type_name in self.COLUMNS:
+                row = [None] * 24
+                row[2], row[3], row[5], row[6], row[8], row[17] = table, name, type_name, 10, 0, 'YES'
+                rows.append(row)
+        elif 'SYSIBM.SQLPRIMARYKEYS' in statement:
+            rows = [[None, 'SPLICE', parameters[1], 'ID']] if parameters[1] in ('A', 'B', 'C') else []
+        elif 'SYSIBM.SQLFOREIGNKEYS' in statement:
+            rows = [[None, 'SPLICE', 'B', 'ID', None, 'SPLICE', 'A', 'B_ID', 1, None, None, None, 'FK_A_B']] \
+                if parameters[1] == 'A' else []
+        elif statement.startswith('CALL SYSIBM.'):  # indexes
+            rows = []
+        if rows is not None:
+            return [('C%d' % i, str, None, 128, 128, 0, True) for i in range(24)], \
+                [tuple(row + [None] * (24 - len(row))) for row in rows]
+        return super(SchemaReflectionTest, self).respond(statement, parameters)
+
+    def describe(self, metadata):
+        return dict((table.name, ([(column.name, str(column.type), column.nullable) for column in table.c],
+                                  [column.name for column in table.primary_key],
+                                  sorted((fk.parent.name, fk.target_fullname) for fk in table.foreign_keys)))
+                    for table in metadata.tables.values())
+
+
+class ParallelReflectionTest(SchemaReflectionTest):
+    def setup(self):
+        super(ParallelReflectionTest, self).setup()
+        self.barrier = threading.Barrier(3, timeout=10)
+
+    def respond(self, statement, parameters):
+        if 'SYSIBM.SQLPRIMARYKEYS' in statement and self.barrier is not None:
+            self.barrier.wait()  # every worker holds its connection until all have started
+        return super(ParallelReflectionTest, self).respond(statement, parameters)
+
+    def test_workers(self):
+        engine = self.engine()
+        metadata = parallel.reflect_parallel(engine, workers=3)
+        eq_(sorted(self.calls('SQLPRIMARYKEYS')), ['A', 'B', 'C'])
+        eq_(self.calls('SQLCOLUMNS'), [None])
+        eq_(len(set(connection for procedure, _, connection in self.catalog_calls
+                    if procedure == 'SQLPRIMARYKEYS')), 3)
+
+        self.barrier = None
+        serial = MetaData()
+        serial.reflect(engine)
+        eq_(self.describe(metadata), self.describe(serial))
+        columns, primary_key, foreign_keys = self.describe(metadata)['a']
+        eq_([(name, type_) for name, type_, _ in columns], [('id', 'INTEGER'), ('b_id', 'INTEGER')])
+        eq_(primary_key, ['id'])
+        eq_(foreign_keys, [('b_id', 'b.id')])
+
+
+class LazyReflectionTest(SchemaReflectionTest):
+    def setup(self):
+        super(LazyReflectionTest, self).setup()
+        self.started = None
+
+    def respond(self, statement, parameters):
+        if 'SYSIBM.SQLPRIMARYKEYS' in statement and self.started is not None:
+            self.started.wait(10)  # the first load holds the lock until every thread has started
+        return super(LazyReflectionTest, self).respond(statement, parameters)
+
+    def test_load_on_first_access(self):
+        stubs = lazy.reflect_lazy(self.engine())
+        eq_(list(stubs), ['a', 'b', 'c'])
+        eq_(self.catalog_calls, [])
+        assert not stubs['c'].loaded
+
+        eq_([column.name for column in stubs['c'].c], ['id', 'name'])
+        assert stubs['c'].loaded
+        eq_(self.calls('SQLCOLUMNS'), [None])
+        eq_(self.calls('SQLPRIMARYKEYS'), ['C'])
+
+        calls = len(self.catalog_calls)
+        eq_([column.name for column in stubs['c'].primary_key], ['id'])
+        eq_([column.name for column in stubs['c'].c], ['id', 'name'])
+        eq_(len(self.catalog_calls), calls)
+        assert not stubs['a'].loaded
+
+    def test_foreign_key_target(self):
+        stubs = lazy.reflect_lazy(self.engine())
+        eq_([fk.target_fullname for fk in stubs['a'].foreign_keys], ['b.id'])
+        assert stubs['b'].loaded
+        assert not stubs['c'].loaded
+        eq_(sorted(self.calls('SQLPRIMARYKEYS')), ['A', 'B'])
+        eq_(self.calls('SQLCOLUMNS'), [None])
+
+    def test_concurrent_access(self):
+        stubs = lazy.reflect_lazy(self.engine())
+        self.started = threading.Event()
+        threads = [threading.Thread(target=lambda: stubs['c'].c) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.started.set()
+        for thread in threads:
+            thread.join()
+        assert stubs['c'].loaded
+        eq_(self.calls('SQLPRIMARYKEYS'), ['C'])
+
+
+class ColumnarTest(StandinTest):
+    DESCRIPTION = [('ID', int, None, 10, 10, 0, False), ('AMOUNT', decimal.Decimal, None, 10, 10, 2, True),
+                   ('PAID', int, None, 5, 5, 0, True), ('DAY', datetime.datetime, None, 26, 26, 6, True)]
+    ROWS = [(1, decimal.Decimal('1.25'), 1, datetime.datetime(2020, 1, 2)),
+            (2, None, 0, None),
+            (3, decimal.Decimal('3.50'), None, datetime.datetime(2020, 1, 4)),
+            (4, decimal.Decimal('4.00'), 1, datetime.datetime(2020, 1, 5)),
+            (5, decimal.Decimal('5.75'), 0, datetime.datetime(2020, 1, 6))]
+
+    def setup(self):
+        super(ColumnarTest, self).setup()
+        # the pyodbc dialect warns about Decimal results, which the test plugin raises
+        self.t = Table('t', MetaData(), Column('id', Integer), Column('amount', Numeric(10, 2, asdecimal=False)),
+                       Column('paid', Boolean), Column('day', Date))
+
+    def respond(self, statement, parameters):
+        if statement.startswith('SELECT t.id'):
+            return self.DESCRIPTION, self.ROWS
+        return super(ColumnarTest, self).respond(statement, parameters)
+
+    def _read(self, columnar, read, **kw):
+        with self.engine(**kw).connect() as conn:
+            return read(conn.execution_options(columnar=columnar).execute(select([self.t])))
+
+    def test_column_kinds(self):
+        description = [('ID', int, None, 10, 10, 0, False), ('NAME', str, None, 10, 10, 0, True),
+                       ('PAID', int, None, 5, 5, 0, True), ('ORDERED', datetime.datetime, None, 26, 26, 6, True)]
+        eq_(columnar.column_kinds(description), ['int', 'str', 'int', 'datetime'])
+        eq_(columnar.column_kinds(description, [Integer(), String(10), Boolean(), Date()]),
+            ['int', 'str', 'bool', 'date'])
+        eq_(columnar.column_kinds(description, [Integer(), String(10), Integer(), DateTime()]),
+            ['int', 'str', 'int', 'datetime'])
+
+    @skip_if(lambda: numpy is None, 'numpy is not installed')
+    def test_numpy_column(self):
+        column = columnar.numpy_column([1, 2, 3], 'int')
+        eq_((column.dtype, column.tolist()), (numpy.int64, [1, 2, 3]))
+        column = columnar.numpy_column([1, None, 3], 'int')
+        eq_(column.dtype, numpy.float64)
+        eq_(numpy.isnan(column).tolist(), [False, True, False])
+        column = columnar.numpy_column([2 ** 70, 1], 'int')  # beyond int64
+        eq_((column.dtype, column.tolist()), (object, [2 ** 70, 1]))
+        column = columnar.numpy_column([decimal.Decimal('1.25'), None], 'decimal')
+        eq_((column.dtype, column[0]), (numpy.float64, 1.25))
+        assert numpy.isnan(column[1])
+        eq_(columnar.numpy_column([1, 0, None], 'bool').tolist(), [True, False, None])
+        eq_(columnar.numpy_column([1, 0], 'bool').dtype, numpy.bool_)
+        eq_(columnar.numpy_column(['a', None], 'str').tolist(), ['a', None])
+
+    @skip_if(lambda: numpy is None, 'numpy is not installed')
+    def test_numpy_dates(self):
+        column = columnar.numpy_column([datetime.datetime(2020, 1, 2, 3, 4, 5, 6), None], 'datetime')
+        eq_(column.dtype, numpy.dtype('datetime64[us]'))
+        eq_(column[0], numpy.datetime64('2020-01-02T03:04:05.000006'))
+        assert numpy.isnat(column[1])
+        column = columnar.numpy_column([datetime.date(1969, 12, 31), None], 'date')
+        eq_(column.dtype, numpy.dtype('datetime64[D]'))
+        eq_(column[0], numpy.datetime64('1969-12-31'))
+        assert numpy.isnat(column[1])
+
+    @skip_if(lambda: pyarrow is None, 'pyarrow is not installed')
+    def test_arrow_column(self):
+        column = columnar.arrow_column([decimal.Decimal('1.25'), None], 'decimal', 10, 2)
+        eq_((column.type, column.to_pylist()), (pyarrow.decimal128(10, 2), [decimal.Decimal('1.25'), None]))
+        column = columnar.arrow_column([decimal.Decimal('1.25'), None], 'decimal')  # unknown precision
+        eq_((column.type, column.to_pylist()), (pyarrow.float64(), [1.25, None]))
+        column = columnar.arrow_column([datetime.datetime(2020, 1, 2, 3, 4), None], 'date')
+        eq_((column.type, column.to_pylist()), (pyarrow.date32(), [datetime.date(2020, 1, 2), None]))
+        column = columnar.arrow_column([1, 0, None], 'bool')
+        eq_((column.type, column.to_pylist()), (pyarrow.bool_(), [True, False, None]))
+        eq_(columnar.arrow_column([1, None], 'int').type, pyarrow.int64())
+
+    @skip_if(lambda: numpy is None or base._cursor is not None, 'requires numpy and SQLAlchemy 1.3')
+    def test_fetch_batches(self):
+        batches = self._read('numpy', lambda result: list(result.fetch_batches()), fetch_size=2)
+        eq_([batch['id'].tolist() for batch in batches], [[1, 2], [3, 4], [5]])
+        eq_(batches[0]['amount'].dtype, numpy.float64)
+        eq_(batches[1]['paid'].tolist(), [None, True])
+        eq_(batches[0]['day'].dtype, numpy.dtype('datetime64[D]'))  # DATE column fetched as timestamps
+        assert numpy.isnat(batches[0]['day'][1])
+
+    @skip_if(lambda: pyarrow is None or base._cursor is not None, 'requires pyarrow and SQLAlchemy 1.3')
+    def test_fetch_columns(self):
+        batch = self._read('arrow', lambda result: result.fetch_columns())
+        eq_(batch.schema.names, ['id', 'amount', 'paid', 'day'])
+        eq_([field.type for field in batch.schema],
+            [pyarrow.int64(), pyarrow.decimal128(10, 2), pyarrow.bool_(), pyarrow.date32()])
+        eq_(batch.column(0).to_pylist(), [1, 2, 3, 4, 5])
+        eq_(batch.column(1).to_pylist()[:2], [decimal.Decimal('1.25'), None])
+
+    @skip_if(lambda: base._cursor is not None, 'requires SQLAlchemy 1.3')
+    def test_rows(self):
+        eq_(self._read('numpy', lambda result: result.fetchall()[0]),
+            (1, 1.25, True, datetime.date(2020, 1, 2)))
+        assert_raises(exc.ArgumentError, self._read, 'csv', list)
+
+
+class DataFrameWriterTest(StandinTest):
+    exists = False
+
+    def setup(self):
+        super(DataFrameWriterTest, self).setup()
+        self.t = Table('t', MetaData(), Column('id', Integer), Column('name', String(10)), Column('paid', Boolean))
+        self.sent = standin.log = []  # statements sent to the cursor, including raw DBAPI executions
+
+    def teardown(self):
+        standin.log = None
+        super(DataFrameWriterTest, self).teardown()
+
+    def respond(self, statement, parameters):
+        if 'SYSVW.SYSTABLESVIEW' in statement:
+            return [('TABLENAME', str, None, 128, 128, 0, False)], [('T',)] if self.exists else []
+        if 'SYSIBM.SQLCOLUMNS' in statement:
+            columns = [('ID', 'INTEGER', 10, 0), ('NAME', 'VARCHAR', 10, 0), ('PAID', 'SMALLINT', 5, 0)]
+            rows = []
+            for name, type_name, precision, scale in columns:
+                row = [None] * 24
+                row[2], row[3], row[5], row[17], row[6], row[8] = 'T', name, type_name, 'YES', precision, scale
+                rows.append(tuple(row))
+            return [('C%d' % i, str, None, 128, 128, 0, True) for i in range(24)], rows
+        if statement.startswith('CALL SYSIBM.') or 'SYS.SYS' in statement:  # keys, indexes
+            return [('C%d' % i, str, None, 128, 128, 0, True) for i in range(14)], []
+        return super(DataFrameWriterTest, self).respond(statement, parameters)
+
+    def _inserts(self):
+        return [(statement, parameters, many) for statement, parameters, many in self.sent
+                if statement.startswith('INSERT')]
+
+    def test_table_columns(self):
+        eq_(dataframe.table_columns(self.t, ['ID', 'name']), [self.t.c.id, self.t.c.name])
+        assert_raises(exc.ArgumentError, dataframe.table_columns, self.t, ['id', 'missing'])
+
+    def test_choose_path(self):
+        dialect = base.dialect()  # no array binding
+        eq_(dataframe.choose_path(dialect, list(self.t.c), 10), 'values')
+        eq_(dataframe.choose_path(dialect, list(self.t.c), 10, staging_dir='/tmp', import_threshold=10), 'import')
+        eq_(dataframe.choose_path(dialect, list(self.t.c), 9, staging_dir='/tmp', import_threshold=10), 'values')
+        eq_(dataframe.choose_path(self.engine().dialect, list(self.t.c), 10), 'values')  # fast_executemany=False
+        eq_(dataframe.choose_path(self.engine(fast_executemany=True).dialect, list(self.t.c), 10), 'executemany')
+
+    def test_bind_column(self):
+        eq_(dataframe._bind_column([True, None, False], Boolean()), [1, None, 0])
+        eq_(dataframe._bind_column(['a', None], String(5)), [b'a', None])
+        eq_(dataframe._bind_column([1, None], Integer()), [1, None])
+
+    @skip_if(lambda: pandas is None, 'pandas is not installed')
+    def test_column_type(self):
+        frame = pandas.DataFrame({
+            'i32': numpy.array([1, 2], dtype='int32'), 'i64': [1, 2], 'f': [1.5, None], 'b': [True, False],
+            'ts': [pandas.Timestamp('2020-01-02'), pandas.NaT], 's': ['a', 'éé'], 'nulls': [None, None],
+            'dec': [decimal.Decimal('1.25'), decimal.Decimal('1.5')], 'd': [datetime.date(2020, 1, 1), None],
+            'long': ['x' * (dataframe.MAX_VARCHAR_LENGTH + 1), None]})
+        types = dict((column, dataframe.column_type(frame[column])) for column in frame.columns)
+        eq_(dict((column, type(type_)) for column, type_ in types.items()), {
+            'i32': Integer, 'i64': BigInteger, 'f': Float, 'b': Boolean, 'ts': DateTime, 's': String,
+            'nulls': String, 'dec': Numeric, 'd': Date, 'long': Text})
+        eq_((types['s'].length, types['nulls'].length), (4, 1))  # UTF-8 bytes
+        eq_((types['dec'].precision, types['dec'].scale), (31, 2))
+
+    @skip_if(lambda: pandas is None, 'pandas is not installed')
+    def test_frame_columns(self):
+        frame = pandas.DataFrame({'i': [1, 2], 'f': [1.5, None], 'b': [True, False], 's': ['a', None],
+                                  'ts': [pandas.Timestamp('2020-01-02 03:04:05.000006'), pandas.NaT]})
+        columns = dataframe.frame_columns(frame)
+        eq_(columns[:4], [[1, 2], [1.5, None], [1, 0], [b'a', None]])
+        eq_([type(value) for value in columns[0] + columns[2]], [int] * 4)
+        eq_(columns[4], [datetime.datetime(2020, 1, 2, 3, 4, 5, 6), None])
+
+    def test_insert_rows_batches(self):
+        rows = [(i, b'n', 1) for i in range(7)]
+        with self.engine().connect() as conn:
+            eq_(dataframe.insert_rows(conn, self.t, list(self.t.c), rows, batch_size=3), 7)
+            conn.dialect.max_insert_parameters = 6  # two rows of three columns
+            eq_(dataframe.insert_rows(conn, self.t, list(self.t.c), rows[:3], batch_size=3), 3)
+        three, two, one = ['INSERT INTO t (id, name, paid) VALUES ' + ', '.join(['(?, ?, ?)'] * count)
+                           for count in (3, 2, 1)]
+        eq_(self._inserts(), [
+            (three, [[0, b'n', 1, 1, b'n', 1, 2, b'n', 1], [3, b'n', 1, 4, b'n', 1, 5, b'n', 1]], True),
+            (one, [6, b'n', 1], False),
+            (two, [[0, b'n', 1, 1, b'n', 1]], True),
+            (one, [2, b'n', 1], False),
+        ])
+
+    def test_insert_rows_array(self):
+        rows = [(i, b'n', 1) for i in range(3)]
+        with self.engine(fast_executemany=True).connect() as conn:
+            eq_(dataframe.insert_rows(conn, self.t, list(self.t.c), rows), 3)
+        eq_(self._inserts(), [('INSERT INTO t (id, name, paid) VALUES (?, ?, ?)', [list(row) for row in rows], True)])
+
+    def test_insert_rows_without_array_binding(self):
+        rows = [(i, b'n', 1) for i in range(3)]
+        with self.engine().connect() as conn:
+            eq_(dataframe.insert_rows(conn, self.t, list(self.t.c), rows, path='executemany'), 3)
+        eq_(self._inserts(), [('INSERT INTO t (id, name, paid) VALUES (?, ?, ?)', [list(row) for row in rows], True)])
+
+    @skip_if(lambda: pandas is None, 'pandas is not installed')
+    def test_write(self):
+        frame = pandas.DataFrame({'id': [1, 2], 'name': ['a', 'b'], 'paid': [True, False]})
+        engine = self.engine()
+        eq_(dataframe.write(engine, frame, 't'), 2)
+        self.exists = True
+        assert_raises(ValueError, dataframe.write, engine, frame, 't')
+        eq_(dataframe.write(engine, frame, 't', if_exists='replace'), 2)
+        eq_(dataframe.write(engine, frame, 't', if_exists='append'), 2)
+        assert_raises(exc.ArgumentError, dataframe.write, engine, frame, 't', if_exists='truncate')
+
+        check = ', CHECK (paid IN (0, 1))' if base._cursor is None else ''  # no Boolean constraint by default on 1.4
+        create = 'CREATE TABLE t ( id BIGINT, name VARCHAR(1), paid SMALLINT%s )' % check
+        ddl = [' '.join(statement.split()) for statement, _, _ in self.sent
+               if statement.lstrip().startswith(('CREATE', 'DROP'))]
+        eq_(ddl, [create, 'DROP TABLE t', create])
+        eq_([parameters for _, parameters, _ in self._inserts()], [[1, b'a', 1, 2, b'b', 0]] * 3)